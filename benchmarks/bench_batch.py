@@ -0,0 +1,68 @@
+"""
+Benchmark resolving a round for many combats with the batch engine against one at a time
+
+Run with `python -m benchmarks.bench_batch`
+"""
+
+import random
+import time
+from types import SimpleNamespace
+
+from bot_heard_round.batch import CombatBatch
+from bot_heard_round.combat_status import CombatStatus, CombatRound
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.ship import ShipType
+
+COMBAT_COUNTS = [1000, 10000, 50000]
+ATTACKER = SimpleNamespace(mention='@attacker')
+DEFENDER = SimpleNamespace(mention='@defender')
+SHIPS_PER_FLEET = 12
+
+
+def make_fleet_str(rng: random.Random) -> str:
+    """
+    Make a random fleet with three columns deployed
+    :param rng:
+    :return:
+    """
+    return '<C:LMRWW>' + '|'.join(
+        f'{ship_type.to_char()}{ship_type.max_health}[{rng.randint(1, 5)},{i}]'
+        for i, ship_type in enumerate(rng.choices(list(ShipType), k=SHIPS_PER_FLEET))
+    )
+
+
+def main():
+    """
+    Time resolving one round with resolve_combat_round and with the batch engine
+    """
+    rng = random.Random(1)
+    print(f'{"combats":>8} {"one at a time ms":>17} {"batch ms":>9} {"encode ms":>10}')
+
+    for combat_count in COMBAT_COUNTS:
+        combats = [
+            CombatStatus(
+                (ATTACKER, FleetList.from_str(make_fleet_str(rng))),
+                (DEFENDER, FleetList.from_str(make_fleet_str(rng))),
+                CombatRound.MISSILE_ONE
+            )
+            for _ in range(combat_count)
+        ]
+
+        start = time.perf_counter()
+        batch = CombatBatch.from_combats(combats)
+        encode_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        batch.resolve_round()
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for combat in combats:
+            combat.resolve_combat_round()
+        single_ms = (time.perf_counter() - start) * 1000
+
+        print(f'{combat_count:>8} {single_ms:>17.1f} {batch_ms:>9.1f} {encode_ms:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
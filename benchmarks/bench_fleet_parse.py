@@ -0,0 +1,154 @@
+"""
+Benchmark FleetList.from_str against the old regex and dict literal parser
+
+Run with `python -m benchmarks.bench_fleet_parse`
+"""
+
+import random
+import re
+import timeit
+
+from bot_heard_round.fleet import CombatColumn, FleetColumn, FleetList
+from bot_heard_round.ship import Ship, ShipType
+
+FLEET_COUNT = 2000
+SHIPS_PER_FLEET = 12
+REPEATS = 5
+LARGE_FLEET_SIZES = [1000, 10000, 100000]
+
+old_regex = re.compile('(.+?)(\\d+)\\[(\\d+),(\\d+)]')
+old_combat_columns_regex = re.compile('<C:([WLMR]{5})>')
+
+
+def old_from_char(char: str) -> ShipType:
+    """
+    ShipType.from_char as it was, building the lookup dict on every call
+    :param char:
+    :return:
+    """
+    return {
+        'BS': ShipType.BATTLESHIP,
+        'BC': ShipType.BATTLECRUISER,
+        'HC': ShipType.HEAVY_CRUISER,
+        'LC': ShipType.LIGHT_CRUISER,
+        'F': ShipType.FRIGATE,
+        'D': ShipType.DESTROYER,
+        'C': ShipType.CORVETTE,
+        'SDB': ShipType.SYSTEM_DEFENCE_BOAT,
+        'FAC': ShipType.FAC_SQUADRON,
+        'AM': ShipType.ARMED_MERCHANT,
+        'SAS': ShipType.STEALTH_ATTACK_SHIP,
+        'PDC': ShipType.PD_CRUISER,
+        'ALS': ShipType.ASSAULT_LANDING_SHIP,
+        'FRS': ShipType.FAST_REPLENISHMENT_SHIP,
+        'PS': ShipType.PATROL_SHIP,
+        'SS': ShipType.SURVEY_SHIP,
+    }[char]
+
+
+def old_from_str(fleet_str: str) -> FleetList:
+    """
+    FleetList.from_str as it was, matching a regex against each entry and looking the char up
+    with old_from_char
+    :param fleet_str:
+    :return:
+    """
+    patrol_mode = fleet_str[0:3] == '<P>'
+    if patrol_mode:
+        fleet_str = fleet_str[3:]
+
+    combat_columns = old_combat_columns_regex.match(fleet_str)
+    if combat_columns:
+        fleet_str = fleet_str[combat_columns.end():]
+
+    columns = (
+        FleetColumn(1),
+        FleetColumn(2),
+        FleetColumn(3),
+        FleetColumn(4),
+        FleetColumn(5),
+    )
+
+    for ship_def in fleet_str.split('|'):
+        if ship_def == '':
+            continue
+
+        match = old_regex.match(ship_def)
+
+        if not match:
+            raise ValueError(f'`{ship_def}` in fleet is invalid')
+
+        ship = Ship(
+            current_health=int(match.group(2)),
+            ship_type=old_from_char(match.group(1))
+        )
+
+        columns[int(match.group(3)) - 1].add_ship(ship, int(match.group(4)))
+
+    if combat_columns:
+        for column, char in zip(columns, combat_columns.group(1)):
+            column.combat_column = CombatColumn.from_char(char)
+
+    return FleetList(columns, patrol_mode=patrol_mode)
+
+
+def make_fleet(rng: random.Random, ship_count: int) -> str:
+    """
+    Make a random fleet-list string, with the ships in a random order
+    :param rng:
+    :param ship_count:
+    :return:
+    """
+    ship_types = list(ShipType)
+    ships = [
+        f'{ship_type.to_char()}{rng.randint(1, ship_type.max_health)}'
+        f'[{rng.randint(1, 5)},{i}]'
+        for i, ship_type in enumerate(rng.choices(ship_types, k=ship_count))
+    ]
+    rng.shuffle(ships)
+
+    return '|'.join(ships)
+
+
+def make_fleets() -> list[str]:
+    """
+    Make random fleet-list strings
+    :return:
+    """
+    rng = random.Random(1)
+
+    return [make_fleet(rng, SHIPS_PER_FLEET) for _ in range(FLEET_COUNT)]
+
+
+def main():
+    """
+    Time the old and new FleetList.from_str on every fleet, then the new one on large pastes
+    """
+    fleets = make_fleets()
+
+    for fleet in fleets:
+        assert old_from_str(fleet) == FleetList.from_str(fleet), fleet
+
+    old_ms = timeit.timeit(
+        lambda: [old_from_str(fleet) for fleet in fleets], number=REPEATS
+    ) / REPEATS * 1000
+    new_ms = timeit.timeit(
+        lambda: [FleetList.from_str(fleet) for fleet in fleets], number=REPEATS
+    ) / REPEATS * 1000
+
+    print(f'{FLEET_COUNT} fleets of {SHIPS_PER_FLEET} ships')
+    print(f'old from_str: {old_ms:.2f}ms')
+    print(f'from_str:     {new_ms:.2f}ms')
+
+    print('\nOne large paste')
+    print(f'{"ships":>7} {"from_str ms":>12} {"us per ship":>12}')
+
+    for size in LARGE_FLEET_SIZES:
+        fleet = make_fleet(random.Random(size), size)
+        large_ms = timeit.timeit(lambda: FleetList.from_str(fleet), number=1) * 1000
+
+        print(f'{size:>7} {large_ms:>12.2f} {large_ms * 1000 / size:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark rendering the combat status for large fleets
+
+Run with `python -m benchmarks.bench_render`
+"""
+
+import timeit
+from unittest.mock import MagicMock
+
+from bot_heard_round.combat_status import CombatStatus, CombatRound
+from bot_heard_round.fleet import CombatColumn, FleetList
+
+SHIPS_PER_COLUMN = [10, 100, 500]
+REPEATS = 20
+
+
+def make_fleet(ships_per_column: int) -> FleetList:
+    """
+    Make a fleet with the given number of ships in every column, three of them active
+    :param ships_per_column:
+    :return:
+    """
+    fleet = FleetList.from_str('|'.join(
+        f'LC15[{column},{position}]'
+        for column in range(1, 6)
+        for position in range(ships_per_column)
+    ))
+
+    for column, combat_column in zip(fleet.columns, CombatColumn.active_columns()):
+        column.combat_column = combat_column
+
+    return fleet
+
+
+def main():
+    """
+    Time a cold render, a cached render, and a render after one ship takes damage
+    """
+    print(f'{"ships/column":>12} {"cold ms":>10} {"cached ms":>10} {"damaged ms":>11}')
+
+    for ships_per_column in SHIPS_PER_COLUMN:
+        combat_status = CombatStatus(
+            (MagicMock(display_name='ATTACKER'), make_fleet(ships_per_column)),
+            (MagicMock(display_name='DEFENDER'), make_fleet(ships_per_column)),
+            CombatRound.MISSILE_ONE
+        )
+
+        def cold():
+            combat_status.render_cache.clear()
+            str(combat_status)
+
+        def damaged():
+            combat_status.attacker_fleet.columns[0].ships[-1][0].current_health -= 1
+            str(combat_status)
+
+        cold_ms = timeit.timeit(cold, number=REPEATS) / REPEATS * 1000
+        cached_ms = timeit.timeit(lambda: str(combat_status), number=REPEATS) / REPEATS * 1000
+        damaged_ms = timeit.timeit(damaged, number=REPEATS) / REPEATS * 1000
+
+        print(f'{ships_per_column:>12} {cold_ms:>10.3f} {cached_ms:>10.3f} {damaged_ms:>11.3f}')
+
+
+if __name__ == '__main__':
+    main()
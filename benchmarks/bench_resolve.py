@@ -0,0 +1,61 @@
+"""
+Benchmark resolving a combat round between two copies of the same fleet
+
+Run with `python -m benchmarks.bench_resolve`
+"""
+
+import time
+import timeit
+from unittest.mock import MagicMock
+
+from bot_heard_round.combat_status import CombatStatus, CombatRound
+from bot_heard_round.fleet import FleetList
+
+SHIPS_PER_COLUMN = [10, 100, 1000]
+REPEATS = 20
+
+
+def make_fleet_str(ships_per_column: int) -> str:
+    """
+    Make a fleet with the given number of battleships in every column, three of them active
+    :param ships_per_column:
+    :return:
+    """
+    return '<C:LMRWW>' + '|'.join(
+        f'BS30[{column},{position}]'
+        for column in range(1, 6)
+        for position in range(ships_per_column)
+    )
+
+
+def main():
+    """
+    Time resolving a round, and the deep fleet comparison resolving used to do for every
+    column and side
+    """
+    print(f'{"ships/column":>12} {"resolve ms":>11} {"fleet == ms":>12}')
+
+    for ships_per_column in SHIPS_PER_COLUMN:
+        fleet_str = make_fleet_str(ships_per_column)
+        combats = [
+            CombatStatus(
+                (MagicMock(), FleetList.from_str(fleet_str)),
+                (MagicMock(), FleetList.from_str(fleet_str)),
+                CombatRound.MISSILE_ONE
+            )
+            for _ in range(REPEATS)
+        ]
+
+        start = time.perf_counter()
+        for combat in combats:
+            combat.resolve_combat_round()
+        resolve_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+        first, second = FleetList.from_str(fleet_str), FleetList.from_str(fleet_str)
+        compare_ms = timeit.timeit(lambda: first == second, number=REPEATS) / REPEATS * 1000
+
+        print(f'{ships_per_column:>12} {resolve_ms:>11.3f} {compare_ms:>12.3f}')
+
+
+if __name__ == '__main__':
+    main()
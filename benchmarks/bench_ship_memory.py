@@ -0,0 +1,61 @@
+"""
+Benchmark the memory and attack sum cost of large fleet columns
+
+Run with `python -m benchmarks.bench_ship_memory`
+"""
+
+import timeit
+import tracemalloc
+
+from bot_heard_round.fleet import FleetColumn, PackedFleetColumn
+from bot_heard_round.ship import Ship, ShipType
+
+SHIP_COUNT = 100_000
+REPEATS = 20
+
+
+def measure(build):
+    """
+    Build something and report how much memory it holds on to
+    :param build:
+    :return: The built object and its size in bytes
+    """
+    tracemalloc.start()
+    built = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return built, size
+
+
+def main():
+    """
+    Compare a fleet column of Ship objects with a packed fleet column
+    """
+    ship_types = list(ShipType)
+
+    fleet_column, column_size = measure(lambda: FleetColumn(1, ships=[
+        (Ship(5, ship_types[i % len(ship_types)]), i) for i in range(SHIP_COUNT)
+    ]))
+
+    def build_packed():
+        packed_column = PackedFleetColumn(1)
+
+        for i in range(SHIP_COUNT):
+            packed_column.add_ship(ship_types[i % len(ship_types)], 5)
+
+        return packed_column
+
+    packed, packed_size = measure(build_packed)
+
+    column_ms = timeit.timeit(lambda: fleet_column.attack, number=REPEATS) / REPEATS * 1000
+    packed_ms = timeit.timeit(lambda: packed.attack, number=REPEATS) / REPEATS * 1000
+
+    print(f'{SHIP_COUNT} ships')
+    print(f'{"":>18} {"memory MB":>10} {"attack ms":>10}')
+    print(f'{"FleetColumn":>18} {column_size / 1e6:>10.2f} {column_ms:>10.4f}')
+    print(f'{"PackedFleetColumn":>18} {packed_size / 1e6:>10.2f} {packed_ms:>10.4f}')
+
+
+if __name__ == '__main__':
+    main()
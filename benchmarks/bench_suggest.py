@@ -0,0 +1,54 @@
+"""
+Benchmark the deployment optimizer for full five column fleets
+
+Run with `python -m benchmarks.bench_suggest`
+"""
+
+import random
+import time
+
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.optimizer import suggest
+from bot_heard_round.ship import ShipType
+
+SHIPS_PER_COLUMN = [2, 5, 10, 20]
+REPEATS = 5
+
+
+def make_fleet(rng: random.Random, ships_per_column: int) -> FleetList:
+    """
+    Make a random fleet with ships in all five columns
+    :param rng:
+    :param ships_per_column:
+    :return:
+    """
+    return FleetList.from_str('|'.join(
+        f'{ship_type.to_char()}{ship_type.max_health}[{column},{position}]'
+        for column in range(1, 6)
+        for position, ship_type in enumerate(rng.choices(list(ShipType), k=ships_per_column))
+    ))
+
+
+def main():
+    """
+    Time suggesting deployments for random fleets of different sizes
+    """
+    rng = random.Random(1)
+    print(f'{"ships/column":>12} {"mean ms":>8} {"max ms":>8}')
+
+    for ships_per_column in SHIPS_PER_COLUMN:
+        times = []
+
+        for _ in range(REPEATS):
+            attacker = make_fleet(rng, ships_per_column)
+            defender = make_fleet(rng, ships_per_column)
+
+            start = time.perf_counter()
+            suggest(attacker, defender)
+            times.append((time.perf_counter() - start) * 1000)
+
+        print(f'{ships_per_column:>12} {sum(times) / len(times):>8.1f} {max(times):>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
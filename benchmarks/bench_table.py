@@ -0,0 +1,50 @@
+"""
+Benchmark the ship table renderer against tabulate
+
+Run with `python -m benchmarks.bench_table`, tabulate needs to be installed
+"""
+
+import timeit
+
+import tabulate
+
+from bot_heard_round.ship import Ship, ShipType
+from bot_heard_round.table import render_table
+
+HEADERS = ['Left', 'Middle', 'Right']
+ROW_COUNTS = [5, 50, 500]
+REPEATS = 50
+
+
+def main():
+    """
+    Time rendering tables of different sizes with both renderers
+    """
+    print(f'{"rows":>6} {"tabulate ms":>12} {"render_table ms":>16}')
+
+    for row_count in ROW_COUNTS:
+        rows = [
+            [str(Ship(10, ship_type)) for ship_type in list(ShipType)[i % 13:i % 13 + 3]]
+            for i in range(row_count)
+        ]
+        rows_as_dicts = [dict(zip(HEADERS, row)) for row in rows]
+
+        tabulate_ms = timeit.timeit(
+            lambda: tabulate.tabulate(
+                rows_as_dicts,
+                headers={header: header for header in HEADERS},
+                tablefmt='github',
+                stralign='center'
+            ),
+            number=REPEATS
+        ) / REPEATS * 1000
+        render_ms = timeit.timeit(
+            lambda: render_table(HEADERS, rows),
+            number=REPEATS
+        ) / REPEATS * 1000
+
+        print(f'{row_count:>6} {tabulate_ms:>12.3f} {render_ms:>16.3f}')
+
+
+if __name__ == '__main__':
+    main()
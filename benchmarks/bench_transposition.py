@@ -0,0 +1,87 @@
+"""
+Benchmark quiet combats with CombatStatus.fight_combat_round against the transposition table
+
+Run with `python -m benchmarks.bench_transposition`
+"""
+
+import random
+import time
+
+from bot_heard_round.combat_status import CombatStatus
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.ship import ShipType
+from bot_heard_round.simulator import ROUNDS, deploy, random_deployment
+from bot_heard_round.transposition import TranspositionTable, fight_combat_round
+
+SHIPS_PER_COLUMN = [2, 5, 20]
+COMBATS = 2000
+
+
+def make_fleet_str(rng: random.Random, ships_per_column: int) -> str:
+    """
+    Make a random fleet with ships in all five columns
+    :param rng:
+    :param ships_per_column:
+    :return:
+    """
+    return '|'.join(
+        f'{ship_type.to_char()}{ship_type.max_health}[{column},{position}]'
+        for column in range(1, 6)
+        for position, ship_type in enumerate(rng.choices(list(ShipType), k=ships_per_column))
+    )
+
+
+def run_combats(attacker_str: str,
+                defender_str: str,
+                transpositions: TranspositionTable = None) -> float:
+    """
+    Play out the three rounds of combats between the fleets with random deployments
+    :param attacker_str:
+    :param defender_str:
+    :param transpositions:
+    :return: How long resolving took in milliseconds
+    """
+    rng = random.Random(1)
+    elapsed = 0.0
+
+    for _ in range(COMBATS):
+        attacker = FleetList.from_str(attacker_str)
+        defender = FleetList.from_str(defender_str)
+        deploy(attacker, random_deployment(attacker, rng))
+        deploy(defender, random_deployment(defender, rng))
+        combat = CombatStatus((None, attacker), (None, defender))
+
+        start = time.perf_counter()
+        for combat_round in ROUNDS:
+            combat.combat_round = combat_round
+
+            if transpositions is None:
+                combat.fight_combat_round()
+            else:
+                fight_combat_round(combat, transpositions)
+        elapsed += time.perf_counter() - start
+
+    return elapsed * 1000
+
+
+def main():
+    """
+    Time the same combats with and without a table, and show how often the table hit
+    """
+    rng = random.Random(1)
+    print(f'{"ships/column":>12} {"plain ms":>9} {"table ms":>9} {"hit rate":>9}')
+
+    for ships_per_column in SHIPS_PER_COLUMN:
+        attacker_str = make_fleet_str(rng, ships_per_column)
+        defender_str = make_fleet_str(rng, ships_per_column)
+        table = TranspositionTable()
+
+        plain_ms = run_combats(attacker_str, defender_str)
+        table_ms = run_combats(attacker_str, defender_str, table)
+
+        print(f'{ships_per_column:>12} {plain_ms:>9.1f} {table_ms:>9.1f} '
+              f'{table.hit_rate():>9.1%}')
+
+
+if __name__ == '__main__':
+    main()
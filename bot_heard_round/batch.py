@@ -0,0 +1,214 @@
+"""
+Resolves combat rounds for many combats at once with NumPy, for balance analysis
+"""
+
+import numpy as np
+
+from bot_heard_round.combat_status import CombatStatus, CombatRound, Side
+from bot_heard_round.fleet import CombatColumn, FleetColumn, FleetList
+from bot_heard_round.ship import Ship, SHIP_TYPES, SHIP_TYPE_CODES, SHIP_CODE_ATTACKS, \
+    SHIP_CODE_DEFENCES
+
+# Codes for the combat column each fleet column is in
+COLUMN_CODES: dict[CombatColumn, int] = {
+    CombatColumn.WAITING: 0,
+    CombatColumn.LEFT: 1,
+    CombatColumn.MIDDLE: 2,
+    CombatColumn.RIGHT: 3,
+}
+COLUMNS_BY_CODE: tuple[CombatColumn, ...] = tuple(COLUMN_CODES)
+
+# Empty ship slots have a type code of -1, which picks the 0 on the end of these
+ATTACK_TABLE = np.array(SHIP_CODE_ATTACKS + (0,), dtype=np.int64)
+DEFENCE_TABLE = np.array(SHIP_CODE_DEFENCES + (0,), dtype=np.int64)
+
+SIDES = (Side.ATTACKER, Side.DEFENDER)
+
+
+class CombatBatch:
+    """
+    A batch of N combats stored as arrays, indexed [combat, side, fleet column, ship].
+
+    The side is 0 for the attacker and 1 for the defender. Ships in each fleet column are in
+    position order. Destroyed ships and unused slots have a type code of -1, and are left in
+    place rather than moving the ships behind them up
+    """
+
+    def __init__(self,
+                 codes: np.ndarray,
+                 health: np.ndarray,
+                 positions: np.ndarray,
+                 assignments: np.ndarray,
+                 patrol: np.ndarray,
+                 rounds: np.ndarray):
+        """
+        :param codes: Ship type codes, shape (N, 2, 5, ships)
+        :param health: Ship health, shape (N, 2, 5, ships)
+        :param positions: Ship positions, shape (N, 2, 5, ships)
+        :param assignments: The COLUMN_CODES of each fleet column, shape (N, 2, 5)
+        :param patrol: Whether each fleet is in patrol mode, shape (N, 2)
+        :param rounds: The CombatRound value of each combat, shape (N,)
+        """
+        self.codes = codes
+        self.health = health
+        self.positions = positions
+        self.assignments = assignments
+        self.patrol = patrol
+        self.rounds = rounds
+
+    def __len__(self):
+        return len(self.rounds)
+
+    @classmethod
+    def from_combats(cls, combats: list[CombatStatus]):
+        """
+        Encode the combats
+
+        :param combats:
+        :rtype: CombatBatch
+        """
+        fleets = [(x.attacker_fleet, x.defender_fleet) for x in combats]
+        max_ships = max(
+            [len(column.ships) for pair in fleets for fleet in pair for column in fleet.columns],
+            default=0
+        )
+        shape = (len(combats), 2, 5, max(max_ships, 1))
+
+        codes = np.full(shape, -1, dtype=np.int16)
+        health = np.zeros(shape, dtype=np.int64)
+        positions = np.zeros(shape, dtype=np.int64)
+        assignments = np.zeros(shape[:3], dtype=np.int8)
+        patrol = np.zeros(shape[:2], dtype=bool)
+        rounds = np.array([x.combat_round.value for x in combats], dtype=np.int8)
+
+        for i, pair in enumerate(fleets):
+            for side, fleet in enumerate(pair):
+                patrol[i, side] = fleet.patrol_mode
+
+                for j, column in enumerate(fleet.columns):
+                    assignments[i, side, j] = COLUMN_CODES[column.combat_column]
+
+                    for k, (ship, position) in enumerate(column.ships):
+                        codes[i, side, j, k] = SHIP_TYPE_CODES[ship.ship_type]
+                        health[i, side, j, k] = ship.current_health
+                        positions[i, side, j, k] = position
+
+        return CombatBatch(codes, health, positions, assignments, patrol, rounds)
+
+    def fleet_list(self, index: int, side: Side) -> FleetList:
+        """
+        Decode one fleet, leaving out destroyed ships
+
+        :param index: Which combat
+        :param side:
+        :return:
+        """
+        side_index = SIDES.index(side)
+        columns = []
+
+        for j in range(5):
+            codes = self.codes[index, side_index, j]
+            health = self.health[index, side_index, j]
+            positions = self.positions[index, side_index, j]
+
+            columns.append(FleetColumn(
+                j + 1,
+                COLUMNS_BY_CODE[self.assignments[index, side_index, j]],
+                ships=[
+                    (Ship(int(health[k]), SHIP_TYPES[codes[k]]), int(positions[k]))
+                    for k in np.flatnonzero(codes >= 0)
+                ]
+            ))
+
+        return FleetList(tuple(columns), patrol_mode=bool(self.patrol[index, side_index]))
+
+    def column_stats(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The attack and defence of every fleet column, with patrol mode and the rail gun
+        round applied
+
+        :return: The attack and defence, each shape (N, 2, 5)
+        """
+        attack = ATTACK_TABLE[self.codes].sum(axis=-1)
+        defence = DEFENCE_TABLE[self.codes].sum(axis=-1)
+
+        patrol = self.patrol[:, :, None]
+        attack = np.where(patrol, attack // 2, attack)
+        defence = np.where(patrol, defence // 2, defence)
+
+        defence[self.rounds == CombatRound.RAIL_GUN.value] = 0
+
+        return attack, defence
+
+    def take_damage(self, damage: np.ndarray) -> np.ndarray:
+        """
+        Apply damage to the front of every fleet column at once, the same way as
+        FleetColumn.take_damage.
+
+        A ship is destroyed if the damage reaches past the health of every ship up to and
+        including it, and hadn't already run out before it. The first ship the damage runs
+        out on takes what is left
+
+        :param damage: Damage for each fleet column, shape (N, 2, 5)
+        :return: The damage left over for each fleet column, shape (N, 2, 5)
+        """
+        alive = self.codes >= 0
+        health = np.where(alive, self.health, 0)
+        total = health.cumsum(axis=-1)
+        before = total - health
+        damage_left = damage[..., None]
+
+        reached = alive & (before < damage_left)
+        destroyed = reached & (total <= damage_left)
+        damaged = reached & (total > damage_left)
+
+        self.health = np.where(damaged, self.health - (damage_left - before), self.health)
+        self.health[destroyed] = 0
+        self.codes[destroyed] = -1
+
+        return np.maximum(damage - health.sum(axis=-1), 0)
+
+    def resolve_round(self):
+        """
+        Resolve the current round of every combat, giving the same fleets as
+        CombatStatus.resolve_combat_round.
+
+        All the stats are taken before any damage, as each combat column's fleet columns only
+        take damage from their own combat column until the carry over. Taking damage twice
+        leaves a column the same as taking the total at once, so all the carry over heading
+        to a fleet column is added up and applied together
+        """
+        combat_count = len(self)
+        attack, defence = self.column_stats()
+
+        combats = np.arange(combat_count)[:, None]
+        sides = np.arange(2)[None, :]
+
+        direct = np.zeros(self.assignments.shape, dtype=np.int64)
+        deployed = []
+
+        for combat_column in CombatColumn.active_columns():
+            in_column = self.assignments == COLUMN_CODES[combat_column]
+            has_column = in_column.any(axis=-1)
+            first = in_column.argmax(axis=-1)
+
+            column_attack = np.where(has_column, attack[combats, sides, first], 0)
+            column_defence = np.where(has_column, defence[combats, sides, first], 0)
+
+            # Each side takes the other side's attack less its own defence
+            damage = np.maximum(column_attack[:, ::-1] - column_defence, 0)
+            direct[combats, sides, first] += np.where(has_column, damage, 0)
+
+            deployed.append((combat_column, has_column, first, damage))
+
+        left_over = self.take_damage(direct)
+        carry_over = np.zeros(self.assignments.shape, dtype=np.int64)
+
+        for combat_column, has_column, first, damage in deployed:
+            carry = np.where(has_column, left_over[combats, sides, first], damage)
+
+            for adjacent in CombatColumn.adjacent_columns(combat_column):
+                in_adjacent = self.assignments == COLUMN_CODES[adjacent]
+                carry_over += np.where(in_adjacent, carry[:, :, None], 0)
+
+        self.take_damage(carry_over)
@@ -0,0 +1,914 @@
+"""
+The bot itself: its events, commands and the combat loop. Run with run.py
+"""
+import asyncio
+import functools
+import os
+import random
+
+import discord
+from discord.ext import commands
+from dotenv import load_dotenv
+
+from bot_heard_round import emoji
+from bot_heard_round.combat_status import CombatRound, CombatStatus, CombatStep
+from bot_heard_round.fleet import CombatColumn, FleetList
+from bot_heard_round.members import MemberIndex
+from bot_heard_round.optimizer import suggest
+from bot_heard_round.prompts import PromptRouter, ReactionSeeder
+from bot_heard_round.sharding import ShardSet
+from bot_heard_round.simulator import simulate, simulation_pool
+from bot_heard_round.store import CombatCheckpoint, SqliteCombatStore
+
+intents = discord.Intents.default()
+intents.members = True
+
+load_dotenv()
+TOKEN = os.getenv('DISCORD_TOKEN')
+
+COMMAND_PREFIX = os.getenv('COMMAND_PREFIX', '!')
+# Set by launch.py when the bot runs as several processes, each with some of the shards
+SHARDS = ShardSet.from_env(os.environ)
+
+if SHARDS.sharded:
+    bot = commands.AutoShardedBot(
+        command_prefix=COMMAND_PREFIX,
+        intents=intents,
+        shard_count=SHARDS.shard_count,
+        shard_ids=SHARDS.shard_ids
+    )
+else:
+    bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
+COMBAT_CATEGORY_NAME = 'combat'
+BOT_MASTER_ROLE = 'bot-master'
+
+store = SqliteCombatStore(os.getenv('COMBAT_STORE_PATH', 'combats.sqlite3'))
+running_combats = set()
+prompts = PromptRouter()
+reactions = ReactionSeeder()
+member_index = MemberIndex()
+# Fleets parsed while checking a message, keyed by (channel id, author id), so the fleet
+# import can use them instead of parsing the message again
+pending_imports: dict[tuple[int, int], FleetList] = {}
+
+
+@bot.event
+async def on_ready():
+    """
+
+    :return:
+    """
+    print(f'{bot.user.name} has connected to Discord!')
+
+    for combat_checkpoint in store.load_active():
+        if combat_checkpoint.channel_id in running_combats:
+            continue
+
+        # The store is shared between the workers, leave other workers' combats to them
+        if not SHARDS.owns_guild(combat_checkpoint.guild_id):
+            continue
+
+        running_combats.add(combat_checkpoint.channel_id)
+        bot.loop.create_task(resume_combat(combat_checkpoint))
+
+    for guild in bot.guilds:
+        member_index.add_guild(guild)
+        recover_combats(guild)
+
+
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    """
+    Advance the combat waiting on the reacted message, if there is one
+    :param payload:
+    :return:
+    """
+    prompts.dispatch(payload)
+
+
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    """
+    Index the new guild's members
+    :param guild:
+    :return:
+    """
+    member_index.add_guild(guild)
+
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    """
+    Forget the guild's members
+    :param guild:
+    :return:
+    """
+    member_index.remove_guild(guild)
+
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    """
+    Add the member to the index
+    :param member:
+    :return:
+    """
+    member_index.add(member)
+
+
+@bot.event
+async def on_member_update(_, after: discord.Member):
+    """
+    Keep the member's display name up to date in the index
+    :param after:
+    :return:
+    """
+    member_index.add(after)
+
+
+@bot.event
+async def on_user_update(_, after: discord.User):
+    """
+    Keep the display names of members without a nickname up to date in the index, as
+    changing their username does not fire on_member_update
+    :param after:
+    :return:
+    """
+    member_index.update_user(after)
+
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    """
+    Remove the member from the index
+    :param member:
+    :return:
+    """
+    member_index.remove(member)
+
+
+def checkpoint(combat_status: CombatStatus,
+               step: CombatStep,
+               step_index: int = 0,
+               retreated: bool = False):
+    """
+    Save where the combat is up to, so it can be resumed if the bot restarts
+    :param combat_status:
+    :param step:
+    :param step_index:
+    :param retreated:
+    :return:
+    """
+    running_combats.add(combat_status.message.channel.id)
+    store.save(CombatCheckpoint.from_combat(combat_status, step, step_index, retreated))
+
+
+def finish_combat(combat_status: CombatStatus):
+    """
+    Forget a combat that has finished
+    :param combat_status:
+    :return:
+    """
+    running_combats.discard(combat_status.message.channel.id)
+    store.delete(combat_status.message.channel.id)
+
+
+async def resume_combat(combat_checkpoint: CombatCheckpoint):
+    """
+    Pick a combat back up from the last checkpoint
+    :param combat_checkpoint:
+    :return:
+    """
+    channel = bot.get_channel(combat_checkpoint.channel_id)
+
+    if not channel:
+        running_combats.discard(combat_checkpoint.channel_id)
+        store.delete(combat_checkpoint.channel_id)
+        return
+
+    attacker = channel.guild.get_member(combat_checkpoint.attacker_id)
+    defender = channel.guild.get_member(combat_checkpoint.defender_id)
+
+    if not attacker or not defender:
+        print(f'Could not find the players for the combat in {channel.name}')
+        running_combats.discard(channel.id)
+        return
+
+    combat_status = combat_checkpoint.restore(
+        attacker,
+        defender,
+        channel.get_partial_message(combat_checkpoint.message_id)
+    )
+
+    await channel.send('The bot restarted, picking the combat back up...')
+
+    await continue_combat(
+        combat_status,
+        combat_checkpoint.step,
+        combat_checkpoint.step_index,
+        combat_checkpoint.retreated
+    )
+
+
+def recover_combats(guild: discord.Guild):
+    """
+    Pick up the combats in the guild that have no checkpoint, such as when the store has been
+    lost, from the state saved in their pinned status message
+    :param guild:
+    :return:
+    """
+    category = discord.utils.get(guild.categories, name=COMBAT_CATEGORY_NAME)
+
+    if not category:
+        return
+
+    for channel in category.text_channels:
+        if channel.id in running_combats:
+            continue
+
+        running_combats.add(channel.id)
+        bot.loop.create_task(recover_combat(channel))
+
+
+async def recover_combat(channel: discord.TextChannel):
+    """
+    Rebuild the combat in the channel from its pinned status message and carry on with it
+    :param channel:
+    :return:
+    """
+    for message in await channel.pins():
+        if message.author != bot.user:
+            continue
+
+        # Without the state the fleets are lost, leave combats from before it was saved alone
+        if not CombatStatus.find_state(message):
+            continue
+
+        try:
+            combat_status = await CombatStatus.from_message(message, member_index)
+        except ValueError as error:
+            print(error)
+            continue
+
+        step = combat_status.infer_step()
+
+        if not step:
+            break
+
+        await channel.send(
+            'The bot restarted, picking the combat back up from the start of this step...'
+        )
+        await continue_combat(combat_status, step)
+        return
+
+    running_combats.discard(channel.id)
+
+
+async def continue_combat(combat_status: CombatStatus,
+                          step: CombatStep,
+                          step_index: int = 0,
+                          retreated: bool = False):
+    """
+    Carry on with a combat from the given step
+    :param combat_status:
+    :param step:
+    :param step_index:
+    :param retreated:
+    :return:
+    """
+    if step in [CombatStep.ATTACKER_FLEET, CombatStep.DEFENDER_FLEET]:
+        await import_fleets(combat_status, step)
+        return
+
+    await start_combat_loop(combat_status, step, step_index, retreated)
+
+
+@bot.event
+async def on_command_error(ctx, error):
+    """
+
+    :param ctx:
+    :param error:
+    :return:
+    """
+    if isinstance(error, commands.errors.CheckFailure):
+        await ctx.send('You do not have the correct role for this command.')
+    elif isinstance(error, commands.errors.MissingRequiredArgument):
+        await ctx.send(error)
+    elif isinstance(error, commands.errors.CommandNotFound):
+        await ctx.send(
+            "Unknown command - try {0}help to see the available commands".format(COMMAND_PREFIX)
+        )
+    else:
+        control = discord.utils.get(ctx.guild.roles, name=BOT_MASTER_ROLE)
+
+        await ctx.send(
+            f'{control.mention} there was a problem running this command please investigate'
+        )
+        raise error
+
+
+CONTROL_ROLE_NAME = 'Control' if os.getenv('UPPERCASE_CONTROL') else 'control'
+PROMPT_TIMEOUT = float(os.getenv('PROMPT_TIMEOUT', str(24 * 60 * 60)))
+SIMULATION_MAX_TRIALS = int(os.getenv('SIMULATION_MAX_TRIALS', '20000'))
+SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', '2'))
+# One simulation at a time, in processes that are started once and kept for every simulation
+simulation_processes = simulation_pool(SIMULATION_WORKERS)
+simulation_lock = asyncio.Lock()
+
+
+@bot.command(
+    name='start-combat',
+)
+async def start_combat(ctx: commands.context.Context, target: str):
+    """
+
+    :param ctx:
+    :param target:
+    :return:
+    """
+    attacker = ctx.author
+
+    if len(ctx.message.mentions) == 0:
+        await ctx.reply("Please use the mention format (ie `@person-to-attack`)")
+        return
+
+    if len(ctx.message.mentions) > 1:
+        await ctx.reply("Only allowed to attack one person")
+        return
+
+    defender = ctx.message.mentions[0]
+
+    guild: discord.Guild = ctx.guild
+
+    await ctx.send(
+        'Starting combat, {} attacks {}...'.format(ctx.author.mention, target)
+    )
+
+    category: discord.CategoryChannel = discord.utils.get(guild.categories, name='combat')
+
+    control = discord.utils.get(guild.roles, name=CONTROL_ROLE_NAME)
+
+    if not category:
+        category = await guild.create_category(
+            COMBAT_CATEGORY_NAME,
+            overwrites={
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                control: discord.PermissionOverwrite(read_messages=True),
+            }
+        )
+
+    while True:
+        random_bytes = random.getrandbits(16)
+
+        channel_name = f"combat-{random_bytes}"
+        # Next, create the combat-* role
+        channel = discord.utils.get(guild.roles, name=channel_name, category=category)
+
+        if not channel:
+            channel = await guild.create_text_channel(
+                name=channel_name,
+                category=category,
+                overwrites={
+                    attacker: discord.PermissionOverwrite(read_messages=True),
+                    defender: discord.PermissionOverwrite(read_messages=True)
+                }
+            )
+            break
+
+    combat_status = CombatStatus(attacker, defender)
+
+    status = await combat_status.send_message(channel)
+    await status.pin()
+
+    await channel.send(
+        'Combat started, {} attacks {}'.format(
+            attacker.mention,
+            defender.mention
+        )
+    )
+
+    await import_fleets(combat_status, CombatStep.ATTACKER_FLEET)
+
+
+async def import_fleets(combat_status: CombatStatus, step: CombatStep):
+    """
+    Ask the players for their fleets, starting with the given step
+    :param combat_status:
+    :param step:
+    :return:
+    """
+    channel: discord.TextChannel = combat_status.message.channel
+
+    def check_for_message(author):
+        def check(message: discord.Message):
+            if message.channel != channel:
+                return False
+
+            if message.author != author:
+                return False
+
+            content = message.content
+
+            if not FleetList.looks_like_fleet_list(content):
+                return False
+
+            try:
+                pending_imports[(channel.id, author.id)] = FleetList.from_str(content)
+                return True
+            except ValueError as error:
+                print(error)
+                return False
+
+        return check
+
+    for fleet_step, for_attacker in [(CombatStep.ATTACKER_FLEET, True),
+                                     (CombatStep.DEFENDER_FLEET, False)]:
+        if step == CombatStep.DEFENDER_FLEET and for_attacker:
+            continue
+
+        checkpoint(combat_status, fleet_step)
+        user = combat_status.attacker if for_attacker else combat_status.defender
+
+        await channel.send(
+            '{} copy your `fleet-list` from your spreadsheet to import your fleet'.format(
+                user.mention
+            )
+        )
+
+        fleet_msg = await bot.wait_for(
+            'message',
+            check=check_for_message(user)
+        )
+
+        await fleet_msg.reply('Importing fleet now...')
+        combat_status.set_fleet_for(for_attacker, pending_imports.pop((channel.id, user.id)))
+
+        await combat_status.flush_message()
+
+    await start_combat_loop(combat_status)
+
+
+@bot.command(
+    name='clear-combat',
+)
+@commands.has_role(CONTROL_ROLE_NAME)
+async def clear_combat(ctx: commands.context.Context):
+    """
+
+    :param ctx:
+    :return:
+    """
+    guild = ctx.guild
+
+    category = discord.utils.get(guild.categories, name=COMBAT_CATEGORY_NAME)
+
+    if not category:
+        return
+
+    channels = category.text_channels
+    await ctx.reply(f'Deleting {len(channels)} channels, please wait...')
+
+    channel: discord.TextChannel
+    for channel in channels:
+        running_combats.discard(channel.id)
+        store.delete(channel.id)
+        await channel.delete()
+
+    await ctx.reply('Done!')
+
+
+@bot.command(
+    name='simulate',
+)
+async def simulate_combat(ctx: commands.context.Context,
+                          attacker_fleet: str,
+                          defender_fleet: str,
+                          trials: int = 1000):
+    """
+    Simulate combats between two `fleet-list`s with random deployments, patrol modes and
+    retreats, and report what won most often
+
+    :param ctx:
+    :param attacker_fleet:
+    :param defender_fleet:
+    :param trials:
+    :return:
+    """
+    trials = max(1, min(trials, SIMULATION_MAX_TRIALS))
+
+    try:
+        FleetList.from_str(attacker_fleet)
+        FleetList.from_str(defender_fleet)
+    except ValueError as error:
+        await ctx.reply(f'Could not read the fleets:\n{error}')
+        return
+
+    if simulation_lock.locked():
+        await ctx.reply('A simulation is already running, try again when it has finished')
+        return
+
+    async with simulation_lock:
+        await ctx.reply(f'Simulating {trials} combats, please wait...')
+
+        # The simulation runs in its own processes, wait for it on a thread so the bot keeps
+        # answering everything else
+        result = await asyncio.get_event_loop().run_in_executor(
+            None,
+            functools.partial(
+                simulate,
+                attacker_fleet,
+                defender_fleet,
+                trials,
+                workers=SIMULATION_WORKERS,
+                pool=simulation_processes
+            )
+        )
+
+    await ctx.reply(f'```\n{result}\n```')
+
+
+@bot.command(
+    name='suggest',
+)
+async def suggest_deployment(ctx: commands.context.Context,
+                             attacker_fleet: str,
+                             defender_fleet: str):
+    """
+    Suggest the deployment with the best worst case for each side of two `fleet-list`s
+
+    :param ctx:
+    :param attacker_fleet:
+    :param defender_fleet:
+    :return:
+    """
+    try:
+        attacker = FleetList.from_str(attacker_fleet)
+        defender = FleetList.from_str(defender_fleet)
+    except ValueError as error:
+        await ctx.reply(f'Could not read the fleets:\n{error}')
+        return
+
+    await ctx.reply(f'```\n{suggest(attacker, defender)}\n```')
+
+
+async def request_ships(combat_status: CombatStatus, apply_attackers: bool):
+    """
+
+    :param combat_status:
+    :param apply_attackers:
+    :return:
+    """
+    channel: discord.TextChannel = combat_status.message.channel
+    user_to_respond = combat_status.attacker if apply_attackers else combat_status.defender
+    fleet = combat_status.attacker_fleet if apply_attackers else combat_status.defender_fleet
+
+    ship_list = {}
+    ship_text = []
+
+    for fleet_column in fleet.where_column(CombatColumn.WAITING):
+        if not fleet_column.ships:
+            continue
+
+        emoji_to_send = emoji.POSSIBLE_EMOJI[fleet_column.column_number - 1]
+
+        ship_list[emoji_to_send] = fleet_column
+        ship_text.append(
+            "{}: Column {}: {}".format(emoji_to_send,
+                                       fleet_column.column_number,
+                                       fleet_column.ships_as_str
+                                       ))
+
+    if not ship_text:
+        await channel.send(
+            'No unassigned ships left in fleet, skipping {}'.format(user_to_respond.display_name)
+        )
+        return
+
+    ships_message = await channel.send(
+        "{}, please react to this with the ships you want to add.\n{}".format(
+            user_to_respond.mention,
+            "\n".join(ship_text)
+        )
+    )
+
+    reactions.seed(ships_message, ship_list)
+
+    reaction = await prompts.wait_for(ships_message, user_to_respond, ship_list)
+
+    fleet_column = ship_list[reaction]
+
+    column_message = await channel.send(
+        "{}, please react to this with which column you want to add fleet column {} to".format(
+            user_to_respond.mention,
+            fleet_column.column_number
+        )
+    )
+
+    columns = {
+        emoji.LEFT_EMOJI: CombatColumn.LEFT,
+        emoji.CENTRE_EMOJI: CombatColumn.MIDDLE,
+        emoji.RIGHT_EMOJI: CombatColumn.RIGHT
+    }
+
+    reactions.seed(
+        column_message,
+        [
+            emoji_to_send for emoji_to_send in columns
+            if not fleet.where_column(columns[emoji_to_send])
+        ]
+    )
+
+    reaction = await prompts.wait_for(column_message, user_to_respond, columns)
+
+    await channel.send(
+        "Moving fleet {} to column {}".format(
+            fleet_column.column_number,
+            columns[reaction].value
+        )
+    )
+
+    fleet_column.combat_column = columns[reaction]
+
+    await combat_status.update_message()
+
+
+async def start_combat_loop(combat_status: CombatStatus,
+                            step: CombatStep = CombatStep.ROUND_START,
+                            step_index: int = 0,
+                            retreated: bool = False):
+    """
+
+    :param combat_status:
+    :param step: The step to start from, when resuming a combat
+    :param step_index: How far through the step to start from
+    :param retreated: Whether a player retreated earlier in the current round
+    :return:
+    """
+    channel: discord.TextChannel = combat_status.message.channel
+
+    messages = {
+        CombatRound.MISSILE_ONE: 'COMBAT HAS STARTED!',
+        CombatRound.MISSILE_TWO:
+            'Second round of combat. If nobody retreats Railgun combat will start!',
+        CombatRound.RAIL_GUN: 'Final combat round. ALL DEFENCE WILL BE ZERO THIS ROUND',
+    }
+
+    apply_order = [
+        True,
+        False,
+        False,
+        True,
+        True,
+        False
+    ]
+
+    if combat_status.combat_round == CombatRound.PENDING:
+        combat_status.combat_round = CombatRound.MISSILE_ONE
+
+    while combat_status.combat_round in messages:
+        combat_round = combat_status.combat_round
+
+        if step == CombatStep.ROUND_START:
+            checkpoint(combat_status, step)
+
+            if combat_round != CombatRound.MISSILE_ONE:
+                await allow_fleet_switch(channel, combat_status)
+            else:
+                await handle_patrol_mode(channel, combat_status)
+
+            await combat_status.flush_message()
+            step = CombatStep.FIGHT_OR_RETREAT
+
+        if step == CombatStep.FIGHT_OR_RETREAT:
+            checkpoint(combat_status, step)
+
+            await channel.send(messages[combat_round])
+
+            react_message: discord.Message = await channel.send(
+                'React to this message with :crossed_swords: to fight, '
+                'or with :flag_white: to retreat'
+            )
+
+            reactions.seed(react_message, ['⚔', '🏳'])
+
+            attack_react, defend_react = await asyncio.gather(
+                prompts.wait_for(
+                    react_message,
+                    combat_status.attacker,
+                    ['⚔', '🏳'],
+                    PROMPT_TIMEOUT,
+                    '🏳'
+                ),
+                prompts.wait_for(
+                    react_message,
+                    combat_status.defender,
+                    ['⚔', '🏳'],
+                    PROMPT_TIMEOUT,
+                    '🏳'
+                )
+            )
+
+            if '⚔' not in [attack_react, defend_react]:
+                combat_status.combat_round = CombatRound.FINISHED
+                await combat_status.flush_message()
+                await channel.send('Both players have retreated, combat finished')
+                finish_combat(combat_status)
+                return
+
+            await channel.send('Combat will continue for another round')
+
+            retreated = '🏳' in [attack_react, defend_react]
+            step = CombatStep.DEPLOY \
+                if combat_round == CombatRound.MISSILE_ONE \
+                else CombatStep.RESOLVE
+
+        if step == CombatStep.DEPLOY:
+            for index in range(step_index, len(apply_order)):
+                checkpoint(combat_status, step, index, retreated)
+                await request_ships(combat_status, apply_order[index])
+
+            await combat_status.flush_message()
+
+        checkpoint(combat_status, CombatStep.RESOLVE, retreated=retreated)
+
+        for message in combat_status.play_combat_round():
+            await channel.send(message)
+
+            await combat_status.update_message()
+            await channel.send(str(combat_status))
+
+        await combat_status.flush_message()
+
+        if retreated:
+            await channel.send('A player has retreated, combat finished')
+
+        step = CombatStep.ROUND_START
+        step_index = 0
+        retreated = False
+
+    combat_status.combat_round = CombatRound.FINISHED
+    await combat_status.flush_message()
+    finish_combat(combat_status)
+
+
+async def handle_patrol_mode(channel: discord.TextChannel, combat_status: CombatStatus):
+    """
+    Handle patrol mode, asking both players at the same time
+    :param channel:
+    :param combat_status:
+    :return:
+    """
+    sides = [(combat_status.attacker, combat_status.attacker_fleet),
+             (combat_status.defender, combat_status.defender_fleet)]
+
+    patrol_modes = await asyncio.gather(*[
+        confirm_patrol_mode(channel, user_to_mention, fleet)
+        for user_to_mention, fleet in sides
+    ])
+
+    for (_, fleet), patrol_mode in zip(sides, patrol_modes):
+        fleet.patrol_mode = patrol_mode
+
+
+async def confirm_patrol_mode(channel: discord.TextChannel,
+                              user_to_mention: discord.Member,
+                              fleet: FleetList) -> bool:
+    """
+    Ask a player whether their fleet is in patrol mode
+    :param channel:
+    :param user_to_mention:
+    :param fleet:
+    :return: Whether the fleet is in patrol mode
+    """
+    message = await channel.send(
+        '{}, please confirm whether your fleet is in patrol mode or not'
+        '(Your spreadsheet says that it {})'
+        'If so, react with {} otherwise react with {}'.format(
+            user_to_mention.mention,
+            'is' if fleet.patrol_mode else 'is not',
+            emoji.TICK_EMOJI,
+            emoji.CROSS_EMOJI
+        )
+    )
+
+    reactions.seed(message, [emoji.TICK_EMOJI, emoji.CROSS_EMOJI])
+
+    react = await prompts.wait_for(
+        message,
+        user_to_mention,
+        [emoji.TICK_EMOJI, emoji.CROSS_EMOJI],
+        PROMPT_TIMEOUT,
+        emoji.TICK_EMOJI if fleet.patrol_mode else emoji.CROSS_EMOJI
+    )
+
+    return react == emoji.TICK_EMOJI
+
+
+async def allow_fleet_switch(channel: discord.TextChannel, combat_status: CombatStatus):
+    """
+    Let both players swap a fleet column at the same time, then apply the swaps in order
+
+    :param channel:
+    :param combat_status:
+    :return:
+    """
+    sides = [(combat_status.attacker, combat_status.attacker_fleet),
+             (combat_status.defender, combat_status.defender_fleet)]
+
+    swaps = await asyncio.gather(*[
+        choose_fleet_switch(channel, user_to_mention, fleet)
+        for user_to_mention, fleet in sides
+    ])
+
+    for (user_to_mention, fleet), swap in zip(sides, swaps):
+        if not swap:
+            continue
+
+        to_swap_out, to_swap_in = swap
+
+        fleet.swap_columns(to_swap_out, to_swap_in)
+        await channel.send(
+            '{} swapped {} with {}'.format(
+                user_to_mention.mention,
+                to_swap_out,
+                to_swap_in
+            )
+        )
+
+
+async def choose_fleet_switch(channel: discord.TextChannel,
+                              user_to_mention: discord.Member,
+                              fleet: FleetList):
+    """
+    Ask a player which fleet column they want to swap with a waiting fleet
+
+    :param channel:
+    :param user_to_mention:
+    :param fleet:
+    :return: The column numbers to swap out and in, or None to not swap
+    """
+    try:
+        emojis_to_add, waiting_fleet = fleet.swap_options()
+    except FleetList.NoWaitingFleetError:
+        await channel.send(
+            '{} has no waiting fleets, skipping fleet movement'.format(
+                user_to_mention.display_name
+            )
+        )
+        return None
+
+    message = await channel.send(
+        '{} if you wish to swap a fleet column with a waiting fleet, '
+        'react with the column you wish to move'.format(
+            user_to_mention.mention
+        )
+    )
+
+    reactions.seed(message, emojis_to_add)
+
+    react = await prompts.wait_for(
+        message,
+        user_to_mention,
+        emojis_to_add,
+        PROMPT_TIMEOUT,
+        emoji.CROSS_EMOJI
+    )
+
+    if not emojis_to_add[react]:
+        return None
+
+    if len(waiting_fleet) == 1:
+        _, to_swap_in = waiting_fleet.popitem()
+    else:
+        lines = ['React with which waiting fleet you wish to swap in']
+
+        for emoji_to_send in waiting_fleet:
+            lines.append(
+                "{}: Column {}: {}".format(
+                    emoji_to_send,
+                    waiting_fleet[emoji_to_send],
+                    fleet.where_number(waiting_fleet[emoji_to_send])
+                )
+            )
+
+        message = await channel.send(
+            "\n".join(lines)
+        )
+
+        reactions.seed(message, waiting_fleet)
+
+        swap_react = await prompts.wait_for(
+            message,
+            user_to_mention,
+            waiting_fleet,
+            PROMPT_TIMEOUT
+        )
+
+        if not swap_react:
+            return None
+
+        to_swap_in = waiting_fleet[swap_react]
+
+    return emojis_to_add[react], to_swap_in
+
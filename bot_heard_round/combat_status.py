@@ -2,21 +2,29 @@
 Module holding the combat status content
 """
 
+import asyncio
 import enum
 import re
 from typing import Optional
 
 import discord
-import tabulate
 from discord import WidgetMember
 
+from bot_heard_round.events import ColumnResolved, ColumnStats, DamageDealt, CarryOverQueued, \
+    CarryOverResolved, CarryOverDealt, render_combat_events
 from bot_heard_round.fleet import FleetList, CombatColumn, FleetColumn
+from bot_heard_round.members import MemberIndex
 from bot_heard_round.ship import Ship
+from bot_heard_round.table import render_table
 from bot_heard_round.utils import get_user_from_nick_or_name
 
 attack_defend_regex = re.compile('(Attacker|Defender): `(.+)`')
 round_regex = re.compile('`!!! Combat status( - round (\\d)| - finished)? !!!`')
 ship_regex = re.compile('`(.+?) \\((\\w+) (\\d+)/(\\d+)\\)`')
+state_regex = re.compile('`state v1;a=(\\d+);d=(\\d+);r=(\\d);af=([^;`]*);df=([^;`]*)`')
+
+# The longest embed description Discord accepts
+STATE_EMBED_LIMIT = 2048
 
 UserAndFleet = tuple[discord.WidgetMember, FleetList]
 
@@ -32,6 +40,34 @@ class CombatRound(enum.Enum):
     FINISHED = 4
 
 
+class CombatStep(enum.Enum):
+    """
+    Enum for the steps a combat goes through, so a combat can be resumed part way through
+    """
+    ATTACKER_FLEET = 'attacker_fleet'
+    DEFENDER_FLEET = 'defender_fleet'
+    ROUND_START = 'round_start'
+    FIGHT_OR_RETREAT = 'fight_or_retreat'
+    DEPLOY = 'deploy'
+    RESOLVE = 'resolve'
+
+
+class Side(enum.Enum):
+    """
+    Enum for the two sides of a combat
+    """
+    ATTACKER = 'Attacker'
+    DEFENDER = 'Defender'
+
+    @property
+    def opponent(self):
+        """
+        The other side
+        :rtype: Side
+        """
+        return Side.DEFENDER if self == Side.ATTACKER else Side.ATTACKER
+
+
 class CombatStatus:
     """
     Encapsulates the combat status for the current combat
@@ -41,6 +77,7 @@ class CombatStatus:
     defender: WidgetMember
     defender_fleet: FleetList
     message: discord.Message
+    edit_delay: float = 1.0
 
     def __init__(self,
                  attacker,
@@ -57,6 +94,11 @@ class CombatStatus:
         self.attacker_fleet = attacker[1]
         self.defender_fleet = defender[1]
         self.combat_round = combat_round
+        self.last_content: Optional[str] = None
+        self.last_state: Optional[str] = None
+        self.pending_edit: Optional[asyncio.Task] = None
+        self.edit_lock: Optional[asyncio.Lock] = None
+        self.render_cache: dict[str, tuple] = {}
 
         if message:
             self.message = message
@@ -64,30 +106,167 @@ class CombatStatus:
     def add_fleet_for(self, for_attacker: bool, fleet: str):
         """
 
+        :param for_attacker:
+        :param fleet:
+        """
+        self.set_fleet_for(for_attacker, FleetList.from_str(fleet))
+
+    def set_fleet_for(self, for_attacker: bool, fleet: FleetList):
+        """
+        Set a fleet that has already been parsed
         :param for_attacker:
         :param fleet:
         """
         if for_attacker:
-            self.attacker_fleet = FleetList.from_str(fleet)
+            self.attacker_fleet = fleet
         else:
-            self.defender_fleet = FleetList.from_str(fleet)
+            self.defender_fleet = fleet
+
+    def to_dict(self) -> dict:
+        """
+        Convert the round and both fleets to plain data, so they can be saved
+        :return:
+        """
+        return {
+            'combat_round': self.combat_round.value,
+            'attacker_fleet': self.attacker_fleet.to_str(),
+            'defender_fleet': self.defender_fleet.to_str(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, attacker, defender, message: discord.Message = None):
+        """
+        Rebuild a combat status from the output of to_dict
+
+        :param data:
+        :param attacker:
+        :param defender:
+        :param message:
+        :rtype: CombatStatus
+        """
+        return CombatStatus(
+            (attacker, FleetList.from_str(data['attacker_fleet'])),
+            (defender, FleetList.from_str(data['defender_fleet'])),
+            combat_round=CombatRound(data['combat_round']),
+            message=message
+        )
 
     def __str__(self):
         attacker = self.attacker.display_name
         defender = self.defender.display_name
+        attacker_version = self.attacker_fleet.version
+        defender_version = self.defender_fleet.version
+
+        rows = [
+            self.cached_render(
+                'header',
+                (self.combat_round, attacker, defender),
+                self.render_header
+            ),
+            self.cached_render(
+                'attacker_reserves',
+                attacker_version,
+                lambda: self.render_reserves(
+                    "Attacker ships in reserve:\n{}",
+                    self.attacker_fleet
+                )
+            ),
+            self.cached_render(
+                'defender_reserves',
+                defender_version,
+                lambda: self.render_reserves("Defender ships reserve:\n{}", self.defender_fleet)
+            ),
+            self.cached_render(
+                'ship_grid',
+                (attacker_version, defender_version),
+                self.render_ship_grid
+            ),
+        ]
 
-        attacker_fleet_waiting = self.attacker_fleet.where_column(CombatColumn.WAITING)
-        defender_fleet_waiting = self.defender_fleet.where_column(CombatColumn.WAITING)
+        return "\n".join([row for row in rows if row])
 
-        attacker_fleet_waiting.sort(
-            key=lambda x: x.column_number
+    def message_content(self) -> str:
+        """
+        The content of the pinned status message. The state is kept out of it, in
+        message_embed, so it does not count towards Discord's message length limit
+        :return:
+        """
+        return str(self)
+
+    def message_state(self) -> Optional[str]:
+        """
+        The state footer that from_message can rebuild the whole combat from
+        :return: The footer, or None if it is too long to send
+        """
+        footer = self.cached_render(
+            'footer',
+            (
+                self.combat_round,
+                self.attacker.id,
+                self.defender.id,
+                self.attacker_fleet.version,
+                self.defender_fleet.version
+            ),
+            self.render_state_footer
         )
 
-        defender_fleet_waiting.sort(
-            key=lambda x: x.column_number
+        if len(footer) > STATE_EMBED_LIMIT:
+            print(f'The combat state is {len(footer)} characters, too long to save in the '
+                  f'status message')
+            return None
+
+        return footer
+
+    @staticmethod
+    def state_embed(state: Optional[str]) -> Optional[discord.Embed]:
+        """
+        The embed holding the state footer, sent with the pinned status message
+        :param state: The output of message_state
+        :return: The embed, or None if there is no state to send
+        """
+        if state is None:
+            return None
+
+        return discord.Embed(description=state)
+
+    def render_state_footer(self) -> str:
+        """
+        Render the machine readable state: player ids, the round and both fleets
+        :return:
+        """
+        return '`state v1;a={};d={};r={};af={};df={}`'.format(
+            self.attacker.id,
+            self.defender.id,
+            self.combat_round.value,
+            self.attacker_fleet.to_str(),
+            self.defender_fleet.to_str()
         )
 
-        rows = [
+    def cached_render(self, part: str, key, render) -> str:
+        """
+        Render part of the status, reusing the last render if the key has not changed
+
+        :param part: The name of the part being rendered
+        :param key: Everything the part is rendered from, such as fleet versions
+        :param render: Function to render the part
+        :return:
+        """
+        cached = self.render_cache.get(part)
+
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        rendered = render()
+        self.render_cache[part] = (key, rendered)
+
+        return rendered
+
+    def render_header(self) -> str:
+        """
+        Render the round, attacker and defender
+        :return:
+        """
+        return "\n".join([
             {
                 CombatRound.PENDING: "`!!! Combat status !!!`",
                 CombatRound.MISSILE_ONE: "`!!! Combat status - round 1 !!!`",
@@ -95,24 +274,34 @@ class CombatStatus:
                 CombatRound.RAIL_GUN: "`!!! Combat status - round 3 !!!`",
                 CombatRound.FINISHED: "`!!! Combat status - finished !!!`",
             }[self.combat_round],
-            "Attacker: `{}`".format(attacker),
-            "Defender: `{}`".format(defender)
-        ]
+            "Attacker: `{}`".format(self.attacker.display_name),
+            "Defender: `{}`".format(self.defender.display_name)
+        ])
 
-        if attacker_fleet_waiting:
-            rows.append(
-                "Attacker ships in reserve:\n{}".format(
-                    '\n'.join(['{}'.format(str(x)) for x in attacker_fleet_waiting])
-                )
-            )
+    @classmethod
+    def render_reserves(cls, title: str, fleet: FleetList) -> str:
+        """
+        Render the fleet columns waiting in reserve
 
-        if defender_fleet_waiting:
-            rows.append(
-                "Defender ships reserve:\n{}".format(
-                    '\n'.join(['{}'.format(str(x)) for x in defender_fleet_waiting])
-                )
-            )
+        :param title:
+        :param fleet:
+        :return: The reserves, or an empty string if there are none
+        """
+        fleet_waiting = sorted(
+            fleet.where_column(CombatColumn.WAITING),
+            key=lambda x: x.column_number
+        )
+
+        if not fleet_waiting:
+            return ''
 
+        return title.format('\n'.join(['{}'.format(str(x)) for x in fleet_waiting]))
+
+    def render_ship_grid(self) -> str:
+        """
+        Render the table of ships in each active combat column
+        :return: The table, or an empty string if no ships are active
+        """
         attacker_fleet_activated: dict[CombatColumn, list[tuple[Ship, int]]] = {}
         defender_fleet_activated: dict[CombatColumn, list[tuple[Ship, int]]] = {}
 
@@ -131,7 +320,7 @@ class CombatStatus:
                 0,
                 -1
         ):
-            to_add = {}
+            to_add = []
 
             for column in CombatColumn.active_columns():
                 if i_attacker_pos > len(attacker_fleet_activated[column]):
@@ -139,18 +328,14 @@ class CombatStatus:
                 else:
                     ship = str(attacker_fleet_activated[column][i_attacker_pos - 1][0])
 
-                to_add[column] = ship
+                to_add.append(ship)
 
             ship_table.append(to_add)
 
-        ship_table.append({
-            CombatColumn.LEFT: '-----',
-            CombatColumn.MIDDLE: '-----',
-            CombatColumn.RIGHT: '-----'
-        })
+        ship_table.append(['-----', '-----', '-----'])
 
         for i in range(max(len(defender_fleet_activated[x]) for x in defender_fleet_activated)):
-            to_add = {}
+            to_add = []
 
             for column in CombatColumn.active_columns():
                 if i >= len(defender_fleet_activated[column]):
@@ -158,25 +343,37 @@ class CombatStatus:
                 else:
                     ship = str(defender_fleet_activated[column][i][0])
 
-                to_add[column] = ship
+                to_add.append(ship)
 
             ship_table.append(to_add)
 
-        if len(ship_table) != 1:
-            rows.append(
-                '```\n' + tabulate.tabulate(
-                    ship_table,
-                    headers={
-                        CombatColumn.LEFT: 'Left',
-                        CombatColumn.MIDDLE: 'Middle',
-                        CombatColumn.RIGHT: 'Right',
-                    },
-                    tablefmt='github',
-                    stralign='center'
-                ) + '\n```'
-            )
+        if len(ship_table) == 1:
+            return ''
+
+        return '```\n' + render_table(
+            [column.value for column in CombatColumn.active_columns()],
+            ship_table
+        ) + '\n```'
+
+    def infer_step(self) -> Optional[CombatStep]:
+        """
+        Work out the step to pick the combat back up from, when all that is known is the
+        status, such as after rebuilding it from the pinned message
+        :return: The step, or None if the combat has finished
+        """
+        if self.combat_round == CombatRound.FINISHED:
+            return None
+
+        if self.combat_round != CombatRound.PENDING:
+            return CombatStep.ROUND_START
+
+        if not any(column.ships for column in self.attacker_fleet.columns):
+            return CombatStep.ATTACKER_FLEET
 
-        return "\n".join(rows)
+        if not any(column.ships for column in self.defender_fleet.columns):
+            return CombatStep.DEFENDER_FLEET
+
+        return CombatStep.ROUND_START
 
     def ready_for_combat(self):
         """
@@ -199,20 +396,29 @@ class CombatStatus:
         return attacker and defender
 
     @classmethod
-    async def from_message(cls, message: discord.Message):
+    async def from_message(cls, message: discord.Message, member_index: MemberIndex = None):
         """
 
         :param message:
+        :param member_index: Index of the guild's members, so they do not need fetching
         :return:
         """
         content = message.content
+        state = cls.find_state(message)
+
+        if state:
+            return cls.from_state(state, message)
+
         attacker: Optional[discord.User] = None
         defender: Optional[discord.User] = None
         combat_round = None
         defender_ships = FleetList()
         attacker_ships = FleetList()
 
-        members = await message.guild.fetch_members().flatten()
+        members = member_index.for_guild(message.guild) if member_index else None
+
+        if members is None:
+            members = await message.guild.fetch_members().flatten()
 
         for line in content.split("\n"):
             match = round_regex.match(line)
@@ -241,7 +447,46 @@ class CombatStatus:
         return CombatStatus(
             (attacker, attacker_ships),
             (defender, defender_ships),
-            combat_round=combat_round
+            combat_round=combat_round,
+            message=message
+        )
+
+    @classmethod
+    def find_state(cls, message: discord.Message) -> Optional[re.Match]:
+        """
+        Find the state footer in a status message, in its embeds or, for older messages, its
+        content
+        :param message:
+        :return: The match, or None if the message has no state
+        """
+        state = state_regex.search(message.content)
+
+        for embed in message.embeds:
+            if state is None and isinstance(embed.description, str):
+                state = state_regex.search(embed.description)
+
+        return state
+
+    @classmethod
+    def from_state(cls, state: re.Match, message: discord.Message):
+        """
+        Rebuild the combat from the state footer of a status message, using the member cache
+
+        :param state:
+        :param message:
+        :rtype: CombatStatus
+        """
+        attacker = message.guild.get_member(int(state.group(1)))
+        defender = message.guild.get_member(int(state.group(2)))
+
+        if not attacker or not defender:
+            raise ValueError('Missing an attacker or defender in the pinned message?')
+
+        return CombatStatus(
+            (attacker, FleetList.from_str(state.group(4))),
+            (defender, FleetList.from_str(state.group(5))),
+            combat_round=CombatRound(int(state.group(3))),
+            message=message
         )
 
     @classmethod
@@ -270,97 +515,180 @@ class CombatStatus:
         :param channel:
         :return:
         """
-        message = await channel.send(str(self))
+        content = self.message_content()
+        state = self.message_state()
+        message = await channel.send(
+            content,
+            embed=self.state_embed(state)
+        )
         self.message = message
+        self.last_content = content
+        self.last_state = state
 
         return message
 
     async def update_message(self):
         """
-        Update the current message
+        Schedule an update of the current message. Updates within edit_delay seconds of each
+        other are coalesced into one edit, call flush_message to edit straight away
+        :return:
+        """
+        if self.pending_edit is None or self.pending_edit.done():
+            self.pending_edit = asyncio.ensure_future(self.delayed_edit())
+            self.pending_edit.add_done_callback(self.report_edit_error)
+
+    @staticmethod
+    def report_edit_error(task: asyncio.Task):
+        """
+        Print any error from a scheduled edit, as nothing waits on the task
+        :param task:
+        """
+        if not task.cancelled() and task.exception():
+            print(f'Could not update the combat status: {task.exception()}')
+
+    async def delayed_edit(self):
+        """
+        Edit the message once the edit delay has passed
+        :return:
+        """
+        await asyncio.sleep(self.edit_delay)
+        self.pending_edit = None
+        await self.edit_message()
+
+    async def flush_message(self):
+        """
+        Edit the message now, replacing any scheduled update
         :return:
         """
-        await self.message.edit(content=str(self))
+        if self.pending_edit is not None and not self.pending_edit.done():
+            self.pending_edit.cancel()
+
+        self.pending_edit = None
+        await self.edit_message()
 
-    def resolve_combat_round(self):
+    async def edit_message(self):
+        """
+        Edit the message, if the rendered status has changed since it was last sent
+        :return:
+        """
+        if self.edit_lock is None:
+            self.edit_lock = asyncio.Lock()
+
+        async with self.edit_lock:
+            content = self.message_content()
+            state = self.message_state()
+
+            if content == self.last_content and state == self.last_state:
+                return
+
+            await self.message.edit(
+                content=content,
+                embed=self.state_embed(state)
+            )
+            self.last_content = content
+            self.last_state = state
+
+    def resolve_combat_round(self, quiet: bool = False):
         """
         Resolves the current combat round
+        :param quiet: Skip writing the messages, for simulations that only want the fleets
         :return: list[Str]
         """
-        messages = []
+        if quiet:
+            self.fight_combat_round()
+            return []
+
+        events = []
+        self.fight_combat_round(events)
+
+        return render_combat_events(
+            events,
+            {Side.ATTACKER: self.attacker.mention, Side.DEFENDER: self.defender.mention}
+        )
+
+    def play_combat_round(self) -> list[str]:
+        """
+        Resolve the current combat round and move on to the next one, so the status is never
+        saved with the round's damage dealt but the round not moved on. Picking the combat back
+        up from that status would deal the damage again
+        :return: The messages describing the round
+        """
+        messages = self.resolve_combat_round()
+        self.combat_round = CombatRound(self.combat_round.value + 1)
+
+        return messages
+
+    def fight_combat_round(self, events: list = None):
+        """
+        Resolve the current combat round without writing any messages. Every combat column is
+        fought, then the carry over damage is dealt
+
+        :param events: Where to add the events for render_combat_events, or None to skip
+            making them
+        """
         carry_over = []
 
         for combat_column in CombatColumn.active_columns():
-            lines, new_carry_over = self.run_combat_column(combat_column)
-
-            carry_over += new_carry_over
-            messages.append('\n'.join(lines))
+            carry_over += self.run_combat_column(combat_column, events)
 
         for damage, fleets, combat_column, dealer in carry_over:
-            lines = []
-            for ships in fleets:
-                lines.append('{} deals {} carry over damage to {}'.format(
-                    dealer,
-                    damage,
-                    combat_column.value
-                ))
-                _, new_lines = ships.take_damage(damage)
-                lines += new_lines
+            if events is not None:
+                events.append(CarryOverResolved(dealer, combat_column, damage))
 
-            messages.append('\n'.join(lines))
+            for ships in fleets:
+                if events is not None:
+                    events.append(CarryOverDealt(dealer, combat_column, damage))
 
-        return messages
+                ships.deal_damage(damage, events)
 
     def run_combat_damage(self, attack_defence: tuple[int, int],
-                          ships: FleetColumn, fleet: FleetList,
-                          combat_column: CombatColumn) -> (
-            list[str], list[tuple[int, list[FleetColumn]], CombatColumn, str]):
+                          ships: FleetColumn, dealer: Side,
+                          combat_column: CombatColumn,
+                          events: list = None) -> list[
+                              tuple[int, list[FleetColumn], CombatColumn, Side]]:
         """
 
         :param attack_defence:
-        :param ships:
-        :param fleet:
+        :param ships: The ships taking the damage
+        :param dealer: The side dealing the damage
         :param combat_column:
-        :return:
+        :param events: Where to add the events, or None to skip making them
+        :return: The carry over damage for the adjacent combat columns
         """
         attack, defence = attack_defence
 
-        damage_dealer = 'Attacker' if self.defender_fleet == fleet else 'Defender'
-        damage_taker = 'defender' if self.defender_fleet == fleet else 'attacker'
-        lines = []
-        carry_over_damage = []
-
-        if attack > defence:
-            damage = attack - defence
-            lines.append('{} deals `{}` damage to {}'.format(damage_dealer, damage, damage_taker))
-            carry_over, new_lines = ships.take_damage(damage)
-            lines += new_lines
-
-            if carry_over > 0:
-                lines.append('{} CARRY OVER DAMAGE WILL HIT ADJACENT FLEETS'.format(carry_over))
-
-                for column in CombatColumn.adjacent_columns(combat_column):
-                    lines.append('{} will take {} damage'.format(column.value, carry_over))
-                    carry_over_damage.append(
-                        (
-                            carry_over,
-                            fleet.where_column(column),
-                            combat_column,
-                            damage_dealer
-                        )
-                    )
+        if attack <= defence:
+            return []
+
+        damage = attack - defence
+
+        if events is not None:
+            events.append(DamageDealt(dealer, damage))
+
+        carry_over, _ = ships.deal_damage(damage, events)
+
+        if carry_over <= 0:
+            return []
+
+        fleet = self.defender_fleet if dealer == Side.ATTACKER else self.attacker_fleet
+        adjacent = CombatColumn.adjacent_columns(combat_column)
 
-        return lines, carry_over_damage
+        if events is not None:
+            events.append(CarryOverQueued(dealer, combat_column, carry_over, adjacent))
 
-    def run_combat_column(self, combat_column: CombatColumn):
+        return [
+            (carry_over, fleet.where_column(column), combat_column, dealer)
+            for column in adjacent
+        ]
+
+    def run_combat_column(self, combat_column: CombatColumn, events: list = None):
         """
 
         :param combat_column:
-        :return:
+        :param events: Where to add the events, or None to skip making them
+        :return: The carry over damage for the adjacent combat columns
+        :rtype: list[tuple[int, list[FleetColumn], CombatColumn, Side]]
         """
-        carry_over = []
-        lines = ['PROCESSING {}'.format(combat_column.value)]
-
         attacker_ships = self.attacker_fleet.where_column(combat_column)
         defender_ships = self.defender_fleet.where_column(combat_column)
 
@@ -381,32 +709,20 @@ class CombatStatus:
         else:
             defence = (attacker_ships.defence, defender_ships.defence)
 
-        lines.append(
-            'Attacker {} has `{}` attack and `{}` defence'.format(
-                self.attacker.mention,
-                attack[0],
-                defence[0]
-            )
-        )
-        lines.append(
-            'Defender {} has `{}` attack and `{}` defence'.format(
-                self.defender.mention,
-                attack[1],
-                defence[1]
-            )
-        )
-
-        new_lines, new_carry_over = self.run_combat_damage((attack[0], defence[1]),
-                                                           defender_ships,
-                                                           self.defender_fleet,
-                                                           combat_column)
-        lines += new_lines
-        carry_over += new_carry_over
-        new_lines, new_carry_over = self.run_combat_damage((attack[1], defence[0]),
-                                                           attacker_ships,
-                                                           self.attacker_fleet,
-                                                           combat_column)
-        lines += new_lines
-        carry_over += new_carry_over
-
-        return lines, carry_over
+        if events is not None:
+            events.append(ColumnResolved(combat_column))
+            events.append(ColumnStats(Side.ATTACKER, attack[0], defence[0]))
+            events.append(ColumnStats(Side.DEFENDER, attack[1], defence[1]))
+
+        carry_over = self.run_combat_damage((attack[0], defence[1]),
+                                            defender_ships,
+                                            Side.ATTACKER,
+                                            combat_column,
+                                            events)
+        carry_over += self.run_combat_damage((attack[1], defence[0]),
+                                             attacker_ships,
+                                             Side.DEFENDER,
+                                             combat_column,
+                                             events)
+
+        return carry_over
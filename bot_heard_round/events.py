@@ -0,0 +1,230 @@
+"""
+Events the combat kernel reports as it resolves a round, and the renderer that turns them
+into the messages the bot posts
+"""
+
+from bot_heard_round import emoji
+from bot_heard_round.ship import Ship
+
+
+class ColumnResolved:
+    """
+    A combat column starts being resolved
+    """
+    __slots__ = ('combat_column',)
+
+    def __init__(self, combat_column):
+        """
+        :param CombatColumn combat_column:
+        """
+        self.combat_column = combat_column
+
+
+class ColumnStats:
+    """
+    The attack and defence one side fights a combat column with
+    """
+    __slots__ = ('side', 'attack', 'defence')
+
+    def __init__(self, side, attack: int, defence: int):
+        """
+        :param Side side:
+        :param attack:
+        :param defence: Zero in the rail gun round
+        """
+        self.side = side
+        self.attack = attack
+        self.defence = defence
+
+
+class DamageDealt:
+    """
+    One side deals damage to the other side's fleet column in the same combat column
+    """
+    __slots__ = ('dealer', 'damage')
+
+    def __init__(self, dealer, damage: int):
+        """
+        :param Side dealer: The side dealing the damage
+        :param damage:
+        """
+        self.dealer = dealer
+        self.damage = damage
+
+
+class ShipDestroyed:
+    """
+    A ship at the front of a fleet column is destroyed
+    """
+    __slots__ = ('ship', 'health')
+
+    def __init__(self, ship: Ship, health: int):
+        """
+        :param ship:
+        :param health: The health the ship had left
+        """
+        self.ship = ship
+        self.health = health
+
+
+class ShipDamaged:
+    """
+    A ship at the front of a fleet column takes damage and survives
+    """
+    __slots__ = ('ship', 'health', 'damage')
+
+    def __init__(self, ship: Ship, health: int, damage: int):
+        """
+        :param ship:
+        :param health: The health the ship had before the damage
+        :param damage:
+        """
+        self.ship = ship
+        self.health = health
+        self.damage = damage
+
+
+class CarryOverQueued:
+    """
+    Damage is left over after a fleet column is destroyed, and will hit the fleet columns in
+    the adjacent combat columns once every combat column has been resolved
+    """
+    __slots__ = ('dealer', 'combat_column', 'damage', 'targets')
+
+    def __init__(self, dealer, combat_column, damage: int, targets: list):
+        """
+        :param Side dealer: The side dealing the damage
+        :param CombatColumn combat_column: Where the damage was left over
+        :param damage:
+        :param list[CombatColumn] targets: The adjacent combat columns
+        """
+        self.dealer = dealer
+        self.combat_column = combat_column
+        self.damage = damage
+        self.targets = targets
+
+
+class CarryOverResolved:
+    """
+    Queued carry over damage starts being dealt
+    """
+    __slots__ = ('dealer', 'combat_column', 'damage')
+
+    def __init__(self, dealer, combat_column, damage: int):
+        """
+        :param Side dealer: The side dealing the damage
+        :param CombatColumn combat_column: Where the damage was left over
+        :param damage:
+        """
+        self.dealer = dealer
+        self.combat_column = combat_column
+        self.damage = damage
+
+
+class CarryOverDealt:
+    """
+    Carry over damage hits one fleet column
+    """
+    __slots__ = ('dealer', 'combat_column', 'damage')
+
+    def __init__(self, dealer, combat_column, damage: int):
+        """
+        :param Side dealer: The side dealing the damage
+        :param CombatColumn combat_column: Where the damage was left over
+        :param damage:
+        """
+        self.dealer = dealer
+        self.combat_column = combat_column
+        self.damage = damage
+
+
+def render_ship(ship: Ship, health: int) -> str:
+    """
+    Render a ship as it was when it had the given health, the same as str(ship)
+    :param ship:
+    :param health:
+    :return:
+    """
+    return '{} ({}/{})'.format(ship.ship_type, health, ship.max_health)
+
+
+def render_ship_event(event) -> str:
+    """
+    Render a ShipDestroyed or ShipDamaged event
+    :param ShipDestroyed|ShipDamaged event:
+    :return:
+    """
+    if isinstance(event, ShipDestroyed):
+        return "{} {} is destroyed!".format(
+            emoji.BOOM_EMOJI,
+            render_ship(event.ship, event.health)
+        )
+
+    return "{} takes {} damage".format(render_ship(event.ship, event.health), event.damage)
+
+
+def render_ship_events(events: list) -> list[str]:
+    """
+    Render the events from damaging a fleet column, the same messages as
+    FleetColumn.take_damage
+
+    :param events: ShipDestroyed and ShipDamaged events
+    :return: A line for each ship destroyed or damaged
+    """
+    return [render_ship_event(event) for event in events]
+
+
+def render_combat_events(events: list, mentions: dict) -> list[str]:
+    """
+    Render the events from resolving a round, the same messages as
+    CombatStatus.resolve_combat_round. Each combat column gets a message, then each lot of
+    carry over damage does
+
+    :param events:
+    :param dict[Side, str] mentions: How to mention each side
+    :return:
+    """
+    messages = []
+    lines = None
+
+    for event in events:
+        if isinstance(event, (ColumnResolved, CarryOverResolved)):
+            if lines is not None:
+                messages.append('\n'.join(lines))
+
+            lines = []
+
+        if isinstance(event, ColumnResolved):
+            lines.append('PROCESSING {}'.format(event.combat_column.value))
+        elif isinstance(event, ColumnStats):
+            lines.append('{} {} has `{}` attack and `{}` defence'.format(
+                event.side.value,
+                mentions[event.side],
+                event.attack,
+                event.defence
+            ))
+        elif isinstance(event, DamageDealt):
+            lines.append('{} deals `{}` damage to {}'.format(
+                event.dealer.value,
+                event.damage,
+                event.dealer.opponent.value.lower()
+            ))
+        elif isinstance(event, CarryOverQueued):
+            lines.append(
+                '{} CARRY OVER DAMAGE WILL HIT ADJACENT FLEETS'.format(event.damage)
+            )
+            for column in event.targets:
+                lines.append('{} will take {} damage'.format(column.value, event.damage))
+        elif isinstance(event, CarryOverDealt):
+            lines.append('{} deals {} carry over damage to {}'.format(
+                event.dealer.value,
+                event.damage,
+                event.combat_column.value
+            ))
+        elif isinstance(event, (ShipDestroyed, ShipDamaged)):
+            lines.append(render_ship_event(event))
+
+    if lines is not None:
+        messages.append('\n'.join(lines))
+
+    return messages
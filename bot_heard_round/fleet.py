@@ -4,14 +4,65 @@ Fleet module
 
 import enum
 import re
+from array import array
 
 from bot_heard_round import emoji
-from bot_heard_round.ship import Ship, ShipType
+from bot_heard_round.events import ShipDamaged, ShipDestroyed, render_ship_events
+from bot_heard_round.ship import Ship, ShipType, next_version, SHIP_TYPES, SHIP_TYPE_CODES, \
+    SHIP_CODE_ATTACKS, SHIP_CODE_DEFENCES, SHIP_TYPES_BY_CHAR
 
-add_fleet_ship_regex = re.compile('(.+?)(\\d+)\\[(\\d+),(\\d+)]')
 fleet_column_regex = re.compile('Fleet column (\\d+)')
 
 
+def read_number(string: str, start: int, end: int, terminator: str, name: str) -> tuple[int, int]:
+    """
+    Read the digits from start up to the terminator, without looking past end
+
+    :param string:
+    :param start:
+    :param end:
+    :param terminator: The character that has to follow the number
+    :param name: What the number is, for the error message
+    :return: The number and where the terminator ends
+    """
+    stop = string.find(terminator, start, end)
+
+    if stop == -1 or not string[start:stop].isdigit():
+        bad = start
+        while bad < end and '0' <= string[bad] <= '9':
+            bad += 1
+
+        if bad == start:
+            raise ValueError(f'expected the {name} at character {start}')
+
+        raise ValueError(f'expected `{terminator}` at character {bad}')
+
+    return int(string[start:stop]), stop + 1
+
+
+def describe_entry_error(fleet_str: str, start: int, end: int) -> str:
+    """
+    Work out what is wrong with a fleet-list entry that failed to parse, reading it a
+    character at a time so the error can say exactly where
+
+    :param fleet_str:
+    :param start: Where the entry starts
+    :param end: Where the entry ends
+    :return:
+    """
+    try:
+        _, i = ShipType.parse_char(fleet_str, start)
+        _, i = read_number(fleet_str, i, end, '[', 'health')
+        column_num, i = read_number(fleet_str, i, end, ',', 'column')
+        _, i = read_number(fleet_str, i, end, ']', 'position')
+    except ValueError as error:
+        return str(error)
+
+    if i < end:
+        return f'expected `|` at character {i}'
+
+    return f'column {column_num} is not between 1 and 5'
+
 
 class CombatColumn(enum.Enum):
     """
@@ -46,6 +97,28 @@ class CombatColumn(enum.Enum):
             cls.RIGHT,
         ]
 
+    def to_char(self) -> str:
+        """
+        Get the single character used for this column in fleet strings
+        :return:
+        """
+        return self.value[0].upper()
+
+    @classmethod
+    def from_char(cls, char: str):
+        """
+
+        :param char:
+        :rtype: CombatColumn
+        """
+        return {
+            'W': CombatColumn.WAITING,
+            'L': CombatColumn.LEFT,
+            'M': CombatColumn.MIDDLE,
+            'R': CombatColumn.RIGHT,
+        }[char]
+
+
 class FleetColumn:
     """
     Fleet column
@@ -61,9 +134,48 @@ class FleetColumn:
             ships = []
 
         self.column_number = column_number
+        self.fleet_list = fleet_list
         self.combat_column = combat_column
         self.ships = ships
-        self.fleet_list = fleet_list
+        self._version = next_version()
+
+    @property
+    def combat_column(self) -> CombatColumn:
+        """
+        The combat column this fleet column is in
+        :return:
+        """
+        return self._combat_column
+
+    @combat_column.setter
+    def combat_column(self, combat_column: CombatColumn):
+        self._combat_column = combat_column
+        self._version = next_version()
+
+        if self.fleet_list is not None:
+            self.fleet_list.column_moved(self)
+
+    @property
+    def ships(self) -> list[tuple[Ship, int]]:
+        """
+        The ships in this column and their positions, in position order
+        :return:
+        """
+        return self._ships
+
+    @ships.setter
+    def ships(self, ships: list[tuple[Ship, int]]):
+        self._ships = ships
+        self.attack_total = sum(x[0].attack for x in ships)
+        self.defence_total = sum(x[0].defence for x in ships)
+
+    @property
+    def version(self) -> int:
+        """
+        Version number that goes up whenever this column or any of its ships change
+        :return:
+        """
+        return max([self._version] + [x[0].version for x in self.ships])
 
     @property
     def defence(self):
@@ -71,9 +183,7 @@ class FleetColumn:
 
         :rtype: int
         """
-        defence = sum([x[0].defence for x in self.ships])
-
-        return defence if not self.patrol_mode else defence // 2
+        return self.defence_total if not self.patrol_mode else self.defence_total // 2
 
     @property
     def attack(self):
@@ -81,21 +191,61 @@ class FleetColumn:
 
         :rtype: int
         """
-        attack = sum([x[0].attack for x in self.ships])
+        return self.attack_total if not self.patrol_mode else self.attack_total // 2
 
-        return attack if not self.patrol_mode else attack // 2
+    def check_totals(self):
+        """
+        Check the running attack and defence totals match the ships in the column, for tests
+        :raises ValueError: If either total is wrong
+        """
+        attack = sum(x[0].attack for x in self.ships)
+        defence = sum(x[0].defence for x in self.ships)
+
+        if (self.attack_total, self.defence_total) != (attack, defence):
+            raise ValueError(
+                f'Column {self.column_number} has totals '
+                f'{self.attack_total}/{self.defence_total}, ships add up to {attack}/{defence}'
+            )
 
     def add_ship(self, ship: Ship, position: int):
         """
+        Insert the ship at its position, after any ships already at the same position
 
         :param ship:
         :param position:
         """
-        self.ships.append((ship, position))
+        ships = self.ships
+        low, high = 0, len(ships)
 
-        self.ships.sort(
-            key=lambda x: x[1]
-        )
+        while low < high:
+            middle = (low + high) // 2
+            if position < ships[middle][1]:
+                high = middle
+            else:
+                low = middle + 1
+
+        ships.insert(low, (ship, position))
+
+        self.attack_total += ship.attack
+        self.defence_total += ship.defence
+        self._version = next_version()
+
+    def add_ships(self, ships: list[tuple[Ship, int]]):
+        """
+        Add many ships at once, sorting the column once at the end instead of once per ship.
+        Ships at the same position keep the order they were given in
+
+        :param ships: The ships and their positions
+        """
+        if not ships:
+            return
+
+        self.ships.extend(ships)
+        self.ships.sort(key=lambda x: x[1])
+
+        self.attack_total += sum(x[0].attack for x in ships)
+        self.defence_total += sum(x[0].defence for x in ships)
+        self._version = next_version()
 
     @property
     def patrol_mode(self):
@@ -170,28 +320,209 @@ class FleetColumn:
 
         return True
 
-    def take_damage(self, damage):
+    def take_damage(self, damage: int, quiet: bool = False):
+        """
+        Apply damage to the front of the column, destroying ships until it runs out
+
+        :param damage:
+        :param quiet: Skip building the messages, for simulations that only want the numbers
+        :return: The damage left over and the messages, or the damage left over and the number
+            of ships destroyed if quiet
+        :rtype: tuple[int, list[str]]|tuple[int, int]
+        """
+        if quiet:
+            return self.deal_damage(damage)
+
+        events = []
+        damage, _ = self.deal_damage(damage, events)
+
+        return damage, render_ship_events(events)
+
+    def deal_damage(self, damage: int, events: list = None) -> tuple[int, int]:
+        """
+        Apply damage to the front of the column, destroying ships until it runs out
+
+        Destroyed ships are walked past with an index and cut from the front of the list in
+        one go at the end, instead of being removed one at a time
+
+        :param damage:
+        :param events: Where to add a ShipDestroyed or ShipDamaged event for each ship hit,
+            or None to skip making them
+        :return: The damage left over and the number of ships destroyed
+        """
+        ships = self.ships
+        head = 0
+
+        while damage > 0 and head < len(ships):
+            ship = ships[head][0]
+            if damage >= ship.current_health:
+                damage -= ship.current_health
+                if events is not None:
+                    events.append(ShipDestroyed(ship, ship.current_health))
+                self.attack_total -= ship.attack
+                self.defence_total -= ship.defence
+                head += 1
+            else:
+                if events is not None:
+                    events.append(ShipDamaged(ship, ship.current_health, damage))
+                ship.current_health -= damage
+                damage = 0
+
+        if head:
+            del ships[:head]
+            self._version = next_version()
+
+        return damage, head
+
+    @property
+    def transposition_key(self) -> tuple[int, int, tuple[int, ...], bool]:
+        """
+        Hashable key for everything a fight depends on: the attack and defence totals, the
+        health of each ship and patrol mode. Healths stay in position order, as damage hits
+        the front ship first
+        :return:
+        """
+        return (
+            self.attack_total,
+            self.defence_total,
+            tuple([ship.current_health for ship, _ in self.ships]),
+            bool(self.patrol_mode)
+        )
+
+    def apply_damage(self, destroyed: int, front_damage: int):
+        """
+        Apply damage that has already been worked out, such as from a transposition table
+
+        :param destroyed: How many ships to destroy from the front of the column
+        :param front_damage: The damage to the front ship left after that
+        """
+        ships = self.ships
+
+        if destroyed:
+            for ship, _ in ships[:destroyed]:
+                self.attack_total -= ship.attack
+                self.defence_total -= ship.defence
+
+            del ships[:destroyed]
+            self._version = next_version()
+
+        if front_damage:
+            ships[0][0].current_health -= front_damage
+
+
+class PackedFleetColumn:
+    """
+    Fleet column that stores its ships as type codes and health in arrays instead of Ship
+    objects, for simulating very large fleets. Ships are kept in position order, and the
+    attack and defence totals are kept as ships are added and destroyed
+    """
+    __slots__ = ('column_number', 'combat_column', 'patrol_mode', 'type_codes', 'health',
+                 'attack_total', 'defence_total')
+
+    def __init__(self,
+                 column_number: int,
+                 combat_column: CombatColumn = CombatColumn.WAITING,
+                 patrol_mode: bool = False):
+        self.column_number = column_number
+        self.combat_column = combat_column
+        self.patrol_mode = patrol_mode
+        self.type_codes = array('h')
+        self.health = array('h')
+        self.attack_total = 0
+        self.defence_total = 0
+
+    @classmethod
+    def from_column(cls, fleet_column: FleetColumn):
+        """
+        Pack a fleet column
+
+        :param fleet_column:
+        :rtype: PackedFleetColumn
+        """
+        packed = PackedFleetColumn(
+            fleet_column.column_number,
+            fleet_column.combat_column,
+            bool(fleet_column.patrol_mode)
+        )
+
+        for ship, _ in fleet_column.ships:
+            packed.add_ship(ship.ship_type, ship.current_health)
+
+        return packed
+
+    def to_column(self) -> FleetColumn:
+        """
+        Unpack into a fleet column, without a fleet list
+        :return:
+        """
+        return FleetColumn(
+            self.column_number,
+            self.combat_column,
+            ships=[
+                (Ship(health, SHIP_TYPES[code]), position)
+                for position, (code, health) in enumerate(zip(self.type_codes, self.health))
+            ]
+        )
+
+    def __len__(self):
+        return len(self.type_codes)
+
+    def add_ship(self, ship_type: ShipType, health: int):
         """
+        Add a ship behind the ships already in the column
 
-        :rtype: tuple[int, str]
+        :param ship_type:
+        :param health:
         """
-        message = []
+        code = SHIP_TYPE_CODES[ship_type]
 
-        while damage > 0:
-            if not self.ships:
-                break
+        self.type_codes.append(code)
+        self.health.append(health)
+        self.attack_total += SHIP_CODE_ATTACKS[code]
+        self.defence_total += SHIP_CODE_DEFENCES[code]
 
-            ship = self.ships[0]
-            if damage >= ship[0].current_health:
-                damage -= ship[0].current_health
-                message.append("{} {} is destroyed!".format(emoji.BOOM_EMOJI, ship[0]))
-                self.ships.remove(ship)
+    @property
+    def attack(self) -> int:
+        """
+
+        :rtype: int
+        """
+        return self.attack_total // 2 if self.patrol_mode else self.attack_total
+
+    @property
+    def defence(self) -> int:
+        """
+
+        :rtype: int
+        """
+        return self.defence_total // 2 if self.patrol_mode else self.defence_total
+
+    def take_damage(self, damage: int) -> tuple[int, int]:
+        """
+        Apply damage to the front of the column, the same way as FleetColumn.take_damage
+
+        :param damage:
+        :return: The carry over damage and the number of ships destroyed
+        """
+        health = self.health
+        destroyed = 0
+
+        while damage > 0 and destroyed < len(health):
+            if damage >= health[destroyed]:
+                damage -= health[destroyed]
+                code = self.type_codes[destroyed]
+                self.attack_total -= SHIP_CODE_ATTACKS[code]
+                self.defence_total -= SHIP_CODE_DEFENCES[code]
+                destroyed += 1
             else:
-                message.append("{} takes {} damage".format(ship[0], damage))
-                ship[0].current_health -= damage
+                health[destroyed] -= damage
                 damage = 0
 
-        return damage, message
+        if destroyed:
+            del self.type_codes[:destroyed]
+            del health[:destroyed]
+
+        return damage, destroyed
 
 
 class FleetList:
@@ -204,6 +535,21 @@ class FleetList:
         Error for if there are no waiting fleets
         """
 
+    class ParseError(ValueError):
+        """
+        Error for a `fleet-list` with malformed entries, listing every one of them
+        """
+
+        def __init__(self, errors: list[tuple[int, str]]):
+            """
+            :param errors: The character offset and description of each malformed entry
+            """
+            self.errors = errors
+
+            super().__init__('\n'.join(
+                f'Character {offset}: {error}' for offset, error in errors
+            ))
+
     def __init__(self,
                  columns: tuple[
                      FleetColumn,
@@ -223,23 +569,66 @@ class FleetList:
                 FleetColumn(5),
             )
 
+        self.columns = columns
+        self.patrol_mode = patrol_mode
+
+        self.by_combat_column: dict[CombatColumn, list[FleetColumn]] = {}
+        self.index_combat_columns()
+        self.by_number: dict[int, FleetColumn] = {}
+
         for column in columns:
+            self.by_number.setdefault(column.column_number, column)
             column.fleet_list = self
 
-        self.columns = columns
-        self.patrol_mode = patrol_mode
+    @property
+    def patrol_mode(self) -> bool:
+        """
+        Whether the fleet is in patrol mode
+        :return:
+        """
+        return self._patrol_mode
+
+    @patrol_mode.setter
+    def patrol_mode(self, patrol_mode: bool):
+        self._patrol_mode = patrol_mode
+        self._version = next_version()
+
+    @property
+    def version(self) -> int:
+        """
+        Version number that goes up whenever the fleet, its columns or their ships change
+        :return:
+        """
+        return max([self._version] + [x.version for x in self.columns])
 
     @classmethod
     def from_str(cls, fleet_str: str):
         """
+        Read a `fleet-list` from the spreadsheet in a single pass over the string, splitting each
+        entry on its separators instead of matching a regex.
 
+        A bad entry doesn't stop the parse. It is skipped, and every bad entry is reported
+        together with where it starts
+
+        :raises FleetList.ParseError: If any entry is malformed
         :rtype: FleetList
         """
-        patrol_mode = fleet_str[0:3] == '<P>'
-        if patrol_mode:
-            fleet_str = fleet_str[3:]
+        errors = []
+
+        patrol_mode = fleet_str.startswith('<P>')
+        i = 3 if patrol_mode else 0
+
+        combat_columns = None
+        if fleet_str.startswith('<C:', i):
+            chars = fleet_str[i + 3:i + 8]
 
-        fleet = fleet_str.split('|')
+            if fleet_str.startswith('>', i + 8) and all(x in 'WLMR' for x in chars):
+                combat_columns = [CombatColumn.from_char(x) for x in chars]
+            else:
+                errors.append((i, 'combat columns should be `<C:` then five of W, L, M or R'))
+
+            i = fleet_str.find('>', i)
+            i = len(fleet_str) if i == -1 else i + 1
 
         columns = (
             FleetColumn(1),
@@ -248,38 +637,134 @@ class FleetList:
             FleetColumn(4),
             FleetColumn(5),
         )
+        column_ships = ([], [], [], [], [])
 
-        for ship_def in fleet:
-            if ship_def == '':
-                continue
+        offset = i
+        for entry in fleet_str[i:].split('|'):
+            start = offset
+            offset += len(entry) + 1
 
-            match = add_fleet_ship_regex.match(ship_def)
+            ship_def = entry.strip()
+            if not ship_def:
+                continue
 
-            if not match:
-                raise ValueError(f'`{ship_def}` in fleet is invalid')
+            start += len(entry) - len(entry.lstrip())
+
+            head, bracket, rest = ship_def.partition('[')
+            char = head.rstrip('0123456789')
+            health = head[len(char):]
+            inner, close, tail = rest.partition(']')
+            column_num, comma, position = inner.partition(',')
+            ship_type = SHIP_TYPES_BY_CHAR.get(char)
+
+            if ship_type is None \
+                    or not (bracket and comma and close) or tail \
+                    or not health.isdecimal() \
+                    or not column_num.isdecimal() \
+                    or not position.isdecimal() \
+                    or not 1 <= int(column_num) <= len(columns):
+                error = describe_entry_error(fleet_str, start, start + len(ship_def))
+                errors.append((start, f'`{ship_def}`: {error}'))
+                continue
 
-            ship = Ship(
-                current_health=int(match.group(2)),
-                ship_type=ShipType.from_char(match.group(1))
+            column_ships[int(column_num) - 1].append(
+                (Ship(current_health=int(health), ship_type=ship_type), int(position))
             )
 
-            (column_num, position) = (int(match.group(3)), int(match.group(4)))
+        if errors:
+            raise FleetList.ParseError(errors)
 
-            column_num -= 1
+        for column, ships in zip(columns, column_ships):
+            column.add_ships(ships)
 
-            columns[column_num].add_ship(ship, position)
+        if combat_columns:
+            for column, combat_column in zip(columns, combat_columns):
+                column.combat_column = combat_column
 
         return FleetList(columns, patrol_mode=patrol_mode)
 
+    @classmethod
+    def looks_like_fleet_list(cls, content: str) -> bool:
+        """
+        Cheap check for whether a message could be a `fleet-list`, to skip chat messages without
+        parsing them. Only looks at the start and end of the message, so it can let through
+        messages that fail to parse, but never rejects a fleet with ships that would parse
+
+        :param content:
+        :return:
+        """
+        start = 3 if content.startswith('<P>') else 0
+
+        if content.startswith('<C:', start):
+            start += len('<C:WWWWW>')
+
+        # from_str skips whitespace and empty columns at either end, so this has to as well
+        while start < len(content) and (content[start].isspace() or content[start] == '|'):
+            start += 1
+
+        end = len(content) - 1
+        while end > start and (content[end].isspace() or content[end] == '|'):
+            end -= 1
+
+        return start < end \
+            and 'A' <= content[start] <= 'Z' \
+            and content[end] == ']'
+
+    def to_str(self) -> str:
+        """
+        Convert the fleet to the same format as from_str, with the combat column of each fleet
+        column in a `<C:...>` prefix so the whole fleet can be rebuilt
+        :return:
+        """
+        prefix = '<P>' if self.patrol_mode else ''
+        prefix += '<C:{}>'.format(''.join(x.combat_column.to_char() for x in self.columns))
+
+        return prefix + '|'.join(
+            '{}{}[{},{}]'.format(
+                ship.ship_type.to_char(),
+                ship.current_health,
+                column.column_number,
+                position
+            )
+            for column in self.columns
+            for ship, position in column.ships
+        )
+
     def where_column(self, combat_column: CombatColumn) -> list[FleetColumn]:
         """
+        Get the fleet columns in the combat column, in fleet order.
+
+        The list comes from the index, so don't change it. It is replaced rather than changed
+        when a column moves, so it is safe to move columns while looping over it
 
         :param combat_column:
         :return:
         """
-        return list(filter(lambda x: x.combat_column == combat_column, self.columns))
+        return self.by_combat_column[combat_column]
+
+    def column_moved(self, fleet_column: FleetColumn):
+        """
+        Update the combat column index after a fleet column has been moved, called by the
+        FleetColumn.combat_column setter
+        :param fleet_column:
+        """
+        if any(x is fleet_column for x in self.columns):
+            self.index_combat_columns()
+
+    def index_combat_columns(self):
+        """
+        Rebuild the combat column index. There are only five columns, so it is quicker to
+        rebuild it than to work out what changed, and it only happens when a column moves
+        """
+        self.by_combat_column = {
+            combat_column: [x for x in self.columns if x.combat_column == combat_column]
+            for combat_column in CombatColumn
+        }
 
     def __eq__(self, other):
+        if other is self:
+            return True
+
         if not isinstance(other, FleetList):
             return False
 
@@ -342,11 +827,10 @@ class FleetList:
         :param column_number:
         :return:
         """
-        for fleet in self.columns:
-            if fleet.column_number == column_number:
-                return fleet
-
-        raise IndexError
+        try:
+            return self.by_number[column_number]
+        except KeyError as error:
+            raise IndexError from error
 
     def swap_columns(self, to_swap_out: int, to_swap_in: int):
         """
@@ -0,0 +1,132 @@
+"""
+Index of guild members by display name
+"""
+
+from typing import Optional
+
+import discord
+
+
+class GuildMembers:
+    """
+    The members of one guild, looked up by display name or id
+    """
+
+    def __init__(self):
+        self.by_name: dict[str, dict[int, discord.Member]] = {}
+        self.by_id: dict[int, discord.Member] = {}
+        # The name each member is filed under, as the member's display name may already
+        # have changed by the time they are removed
+        self.names: dict[int, str] = {}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def add(self, member: discord.Member):
+        """
+        Add the member, replacing any older copy of them
+        :param member:
+        """
+        self.remove(member)
+
+        self.by_id[member.id] = member
+        self.names[member.id] = member.display_name
+        self.by_name.setdefault(member.display_name, {})[member.id] = member
+
+    def remove(self, member: discord.Member):
+        """
+        Remove the member, if they are in the index
+        :param member:
+        """
+        if self.by_id.pop(member.id, None) is None:
+            return
+
+        name = self.names.pop(member.id)
+        with_name = self.by_name[name]
+        del with_name[member.id]
+
+        if not with_name:
+            del self.by_name[name]
+
+    def get(self, display_name: str) -> Optional[discord.Member]:
+        """
+        Get a member with the display name
+        :param display_name:
+        :return: The member, or None if nobody has that display name
+        """
+        with_name = self.by_name.get(display_name)
+
+        if not with_name:
+            return None
+
+        return next(iter(with_name.values()))
+
+
+class MemberIndex:
+    """
+    Display name to member index for every guild, fed from the gateway member cache and kept
+    up to date from the member events
+    """
+
+    def __init__(self):
+        self.guilds: dict[int, GuildMembers] = {}
+
+    def add_guild(self, guild: discord.Guild):
+        """
+        Index every cached member of the guild
+        :param guild:
+        """
+        guild_members = GuildMembers()
+
+        for member in guild.members:
+            guild_members.add(member)
+
+        self.guilds[guild.id] = guild_members
+
+    def remove_guild(self, guild: discord.Guild):
+        """
+        Forget the guild
+        :param guild:
+        """
+        self.guilds.pop(guild.id, None)
+
+    def for_guild(self, guild: discord.Guild) -> Optional[GuildMembers]:
+        """
+        Get the members of the guild
+        :param guild:
+        :return: The guild's members, or None if the guild has not been indexed
+        """
+        return self.guilds.get(guild.id)
+
+    def add(self, member: discord.Member):
+        """
+        Add or update a member, for on_member_join and on_member_update
+        :param member:
+        """
+        guild_members = self.guilds.get(member.guild.id)
+
+        if guild_members is not None:
+            guild_members.add(member)
+
+    def update_user(self, user: discord.User):
+        """
+        Refile the user under their new display name in every guild that has them, for
+        on_user_update. Members without a nickname take their display name from the user,
+        and only on_user_update fires when the user changes their name
+        :param user:
+        """
+        for guild_members in self.guilds.values():
+            member = guild_members.by_id.get(user.id)
+
+            if member is not None:
+                guild_members.add(member)
+
+    def remove(self, member: discord.Member):
+        """
+        Remove a member, for on_member_remove
+        :param member:
+        """
+        guild_members = self.guilds.get(member.guild.id)
+
+        if guild_members is not None:
+            guild_members.remove(member)
@@ -0,0 +1,283 @@
+"""
+Finds the best deployment for each side by trying every deployment against every other
+"""
+
+import itertools
+
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.ship import SHIP_TYPE_CODES, SHIP_CODE_ATTACKS, SHIP_CODE_DEFENCES
+from bot_heard_round.simulator import Deployment, deployment_to_str
+
+# Which combat columns carry over damage goes to, by index into (left, middle, right)
+ADJACENT = ((1,), (0, 2), (1,))
+
+
+def deployments(fleet: FleetList) -> list[Deployment]:
+    """
+    Every deployment the bot would allow: a fleet column with ships in each combat column,
+    until the fleet runs out of them
+
+    :param fleet:
+    :return:
+    """
+    with_ships = [column.column_number for column in fleet.columns if column.ships]
+    empty = [0] * (3 - min(3, len(with_ships)))
+
+    return sorted(set(itertools.permutations(with_ships + empty, 3)))
+
+
+def mirror(deployment: Deployment) -> Deployment:
+    """
+    Swap the left and right combat columns
+    :param deployment:
+    :return:
+    """
+    return deployment[2], deployment[1], deployment[0]
+
+
+class Suggestion:
+    """
+    The minimax deployments for both sides
+    """
+
+    def __init__(self,
+                 attacker: Deployment,
+                 attacker_value: int,
+                 defender: Deployment,
+                 defender_value: int):
+        """
+        :param attacker: The attacker deployment with the best worst case
+        :param attacker_value: The least net damage the attacker deals with it
+        :param defender: The defender deployment with the best worst case
+        :param defender_value: The most net damage the attacker can deal against it
+        """
+        self.attacker = attacker
+        self.attacker_value = attacker_value
+        self.defender = defender
+        self.defender_value = defender_value
+
+    def __str__(self):
+        return '\n'.join([
+            'Attacker should deploy {}, dealing at least {} more damage than they take'.format(
+                deployment_to_str(self.attacker),
+                self.attacker_value
+            ),
+            'Defender should deploy {}, taking at most {} more damage than they deal'.format(
+                deployment_to_str(self.defender),
+                self.defender_value
+            ),
+        ])
+
+
+class DeploymentSolver:
+    """
+    Plays out every attacker deployment against every defender deployment for the three
+    rounds, with both sides fighting every round and keeping their deployment, and scores each
+    by the net damage the attacker deals.
+
+    Column contents are swapped for small integer ids, so the same contents are only ever
+    worked out once. Damage and column against column fights are remembered by id, and a
+    deployment against another gives the same score as both of them mirrored
+    """
+
+    def __init__(self, attacker_fleet: FleetList, defender_fleet: FleetList):
+        self.fleets = (attacker_fleet, defender_fleet)
+        self.states: dict[tuple[tuple[int, int], ...], int] = {}
+        self.state_ships: list[tuple[tuple[int, int], ...]] = []
+        self.state_health: list[int] = []
+        self.state_stats: tuple[list[int], list[int]] = ([], [])
+        self.damage_memo: dict[tuple[int, int], tuple[int, int]] = {}
+        self.fight_memo: dict[tuple[int, int, bool], tuple[int, int, int, int]] = {}
+        self.score_memo: dict[tuple[Deployment, Deployment], int] = {}
+
+        self.empty = self.state_id(())
+        self.column_states = [
+            {
+                column.column_number: self.state_id(tuple(
+                    (SHIP_TYPE_CODES[ship.ship_type], ship.current_health)
+                    for ship, _ in column.ships
+                ))
+                for column in fleet.columns
+            }
+            for fleet in self.fleets
+        ]
+
+        for states in self.column_states:
+            states[0] = self.empty
+
+    def state_id(self, ships: tuple[tuple[int, int], ...]) -> int:
+        """
+        Get the id for the column contents, adding it if it is new
+
+        :param ships: The type code and health of each ship, front first
+        :return:
+        """
+        state = self.states.get(ships)
+
+        if state is None:
+            state = len(self.state_ships)
+            self.states[ships] = state
+            self.state_ships.append(ships)
+            self.state_health.append(sum(health for _, health in ships))
+            self.state_stats[0].append(sum(SHIP_CODE_ATTACKS[code] for code, _ in ships))
+            self.state_stats[1].append(sum(SHIP_CODE_DEFENCES[code] for code, _ in ships))
+
+        return state
+
+    def take_damage(self, state: int, damage: int) -> tuple[int, int]:
+        """
+        Damage a column the same way as FleetColumn.take_damage
+
+        :param state:
+        :param damage:
+        :return: The id of the damaged column and the damage left over
+        """
+        key = (state, damage)
+        result = self.damage_memo.get(key)
+
+        if result is None:
+            ships = list(self.state_ships[state])
+            left = damage
+            head = 0
+
+            while left > 0 and head < len(ships):
+                code, health = ships[head]
+                if left >= health:
+                    left -= health
+                    head += 1
+                else:
+                    ships[head] = (code, health - left)
+                    left = 0
+
+            result = (self.state_id(tuple(ships[head:])), left)
+            self.damage_memo[key] = result
+
+        return result
+
+    def fight(self, attacker: int, defender: int, rail_gun: bool) -> tuple[int, int, int, int]:
+        """
+        Fight one combat column, the same way as CombatStatus.run_combat_column
+
+        :param attacker: The attacker's column in the combat column
+        :param defender: The defender's column in the combat column
+        :param rail_gun: Whether defence is zero this round
+        :return: The attacker's and defender's columns afterwards, then the carry over damage
+            heading to the attacker's and the defender's adjacent columns
+        """
+        key = (attacker, defender, rail_gun)
+        result = self.fight_memo.get(key)
+
+        if result is None:
+            attacks = []
+            defences = []
+
+            for fleet, state in zip(self.fleets, (attacker, defender)):
+                attack = self.state_stats[0][state]
+                defence = 0 if rail_gun else self.state_stats[1][state]
+
+                if fleet.patrol_mode:
+                    attack, defence = attack // 2, defence // 2
+
+                attacks.append(attack)
+                defences.append(defence)
+
+            carry = [0, 0]
+            states = [attacker, defender]
+
+            for taker in (0, 1):
+                damage = attacks[1 - taker] - defences[taker]
+
+                if damage > 0:
+                    states[taker], carry[taker] = self.take_damage(states[taker], damage)
+
+            result = (states[0], states[1], carry[0], carry[1])
+            self.fight_memo[key] = result
+
+        return result
+
+    def score(self, attacker: Deployment, defender: Deployment) -> int:
+        """
+        Play out the three rounds for the two deployments
+
+        :param attacker:
+        :param defender:
+        :return: The damage the attacker deals less the damage they take
+        """
+        key = (attacker, defender)
+        result = self.score_memo.get(key)
+
+        if result is not None:
+            return result
+
+        health = self.state_health
+        attacker_states = [self.column_states[0][x] for x in attacker]
+        defender_states = [self.column_states[1][x] for x in defender]
+        start = sum(health[x] for x in defender_states) - sum(health[x] for x in attacker_states)
+
+        for rail_gun in (False, False, True):
+            carry_over = ([0, 0, 0], [0, 0, 0])
+
+            for i in range(3):
+                (attacker_states[i], defender_states[i],
+                 attacker_carry, defender_carry) = self.fight(
+                     attacker_states[i], defender_states[i], rail_gun
+                 )
+
+                if attacker_carry:
+                    for adjacent in ADJACENT[i]:
+                        carry_over[0][adjacent] += attacker_carry
+
+                if defender_carry:
+                    for adjacent in ADJACENT[i]:
+                        carry_over[1][adjacent] += defender_carry
+
+            for states, carry in zip((attacker_states, defender_states), carry_over):
+                for i in range(3):
+                    if carry[i]:
+                        states[i], _ = self.take_damage(states[i], carry[i])
+
+        end = sum(health[x] for x in defender_states) - sum(health[x] for x in attacker_states)
+        result = start - end
+
+        self.score_memo[key] = result
+        self.score_memo[(mirror(attacker), mirror(defender))] = result
+
+        return result
+
+    def solve(self) -> Suggestion:
+        """
+        Find the attacker deployment with the best worst case, and the same for the defender
+
+        :return:
+        """
+        attacker_options = deployments(self.fleets[0])
+        defender_options = deployments(self.fleets[1])
+
+        scores = {
+            attacker: [self.score(attacker, defender) for defender in defender_options]
+            for attacker in attacker_options
+        }
+
+        best_attacker = max(attacker_options, key=lambda x: min(scores[x]))
+        best_defender = min(
+            range(len(defender_options)),
+            key=lambda i: max(row[i] for row in scores.values())
+        )
+
+        return Suggestion(
+            best_attacker,
+            min(scores[best_attacker]),
+            defender_options[best_defender],
+            max(row[best_defender] for row in scores.values())
+        )
+
+
+def suggest(attacker_fleet: FleetList, defender_fleet: FleetList) -> Suggestion:
+    """
+    Find the minimax deployments for both fleets
+
+    :param attacker_fleet:
+    :param defender_fleet:
+    :return:
+    """
+    return DeploymentSolver(attacker_fleet, defender_fleet).solve()
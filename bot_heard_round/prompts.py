@@ -0,0 +1,188 @@
+"""
+Routing of reactions to the combats waiting on them
+"""
+
+import asyncio
+
+import discord
+
+
+class Prompt:
+    """
+    A message that a combat is waiting for a player to react to
+    """
+
+    def __init__(self, message_id: int, user_id: int, emojis, future: asyncio.Future):
+        self.message_id = message_id
+        self.user_id = user_id
+        self.emojis = emojis
+        self.future = future
+
+    def accepts(self, user_id: int, emoji_name: str) -> bool:
+        """
+        Check if the reaction answers this prompt
+        :param user_id:
+        :param emoji_name:
+        :return:
+        """
+        return user_id == self.user_id \
+            and emoji_name in self.emojis \
+            and not self.future.done()
+
+
+class PromptRouter:
+    """
+    Keeps every open prompt keyed by message id, so a reaction can be routed to the combat
+    waiting on it with a dictionary lookup instead of checking every open prompt
+    """
+
+    def __init__(self):
+        self.prompts: dict[int, dict[int, Prompt]] = {}
+
+    def __len__(self):
+        return sum(len(prompts) for prompts in self.prompts.values())
+
+    def open(self, message: discord.Message, user, emojis) -> Prompt:
+        """
+        Start waiting for the user to react to the message with one of the emojis
+
+        :param message:
+        :param user:
+        :param emojis:
+        :return:
+        """
+        prompt = Prompt(
+            message.id,
+            user.id,
+            emojis,
+            asyncio.get_event_loop().create_future()
+        )
+        self.prompts.setdefault(message.id, {})[user.id] = prompt
+
+        return prompt
+
+    def close(self, prompt: Prompt):
+        """
+        Stop waiting on the prompt
+        :param prompt:
+        """
+        prompts = self.prompts.get(prompt.message_id)
+
+        if not prompts or prompts.get(prompt.user_id) is not prompt:
+            return
+
+        del prompts[prompt.user_id]
+
+        if not prompts:
+            del self.prompts[prompt.message_id]
+
+    async def wait_for(self,
+                       message: discord.Message,
+                       user,
+                       emojis,
+                       timeout: float = None,
+                       default: str = None) -> str:
+        """
+        Wait for the user to react to the message with one of the emojis
+
+        :param message:
+        :param user:
+        :param emojis:
+        :param timeout: How long to wait in seconds, or None to wait forever
+        :param default: The emoji to answer with if the user does not react in time
+        :return: The emoji the user reacted with
+        """
+        prompt = self.open(message, user, emojis)
+
+        try:
+            return await asyncio.wait_for(prompt.future, timeout)
+        except asyncio.TimeoutError:
+            return default
+        finally:
+            self.close(prompt)
+
+    def dispatch(self, payload: discord.RawReactionActionEvent) -> bool:
+        """
+        Pass a reaction to the prompt waiting on it, if there is one
+
+        :param payload:
+        :return: Whether the reaction answered a prompt
+        """
+        prompts = self.prompts.get(payload.message_id)
+
+        if not prompts:
+            return False
+
+        prompt = prompts.get(payload.user_id)
+
+        if not prompt or not prompt.accepts(payload.user_id, payload.emoji.name):
+            return False
+
+        prompt.future.set_result(payload.emoji.name)
+
+        return True
+
+
+class ReactionSeeder:
+    """
+    Adds the reactions for prompt messages in the background, a few at a time per channel.
+
+    Discord rate limits reactions per channel, so each channel gets its own semaphore, and
+    discord.py waits out any 429s for us. Reactions can finish in a different order to the
+    one they were requested in.
+    """
+
+    def __init__(self, concurrency: int = 2):
+        self.concurrency = concurrency
+        self.semaphores: dict[int, asyncio.Semaphore] = {}
+        self.active: dict[int, int] = {}
+
+    def seed(self, message: discord.Message, emojis) -> asyncio.Task:
+        """
+        Start adding the reactions to the message, without waiting for them to be added
+
+        :param message:
+        :param emojis:
+        :return: The task adding the reactions
+        """
+        task = asyncio.ensure_future(self.add_reactions(message, list(emojis)))
+        task.add_done_callback(self.report_error)
+
+        return task
+
+    async def add_reactions(self, message: discord.Message, emojis: list[str]):
+        """
+        Add the reactions to the message
+
+        :param message:
+        :param emojis:
+        """
+        channel_id = message.channel.id
+
+        if channel_id not in self.semaphores:
+            self.semaphores[channel_id] = asyncio.Semaphore(self.concurrency)
+
+        semaphore = self.semaphores[channel_id]
+        self.active[channel_id] = self.active.get(channel_id, 0) + 1
+
+        async def add_reaction(emoji_to_add):
+            async with semaphore:
+                await message.add_reaction(emoji_to_add)
+
+        try:
+            await asyncio.gather(*[add_reaction(emoji_to_add) for emoji_to_add in emojis])
+        finally:
+            self.active[channel_id] -= 1
+
+            if not self.active[channel_id]:
+                del self.active[channel_id]
+                del self.semaphores[channel_id]
+
+    @staticmethod
+    def report_error(task: asyncio.Task):
+        """
+        Print any error from adding reactions, as nothing waits on the task
+        :param task:
+        """
+        if not task.cancelled() and task.exception():
+            print(f'Could not add reactions: {task.exception()}')
@@ -0,0 +1,148 @@
+"""
+Splits the bot's shards between worker processes, and works out which worker owns a guild
+"""
+
+from typing import Optional
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """
+    The shard Discord sends a guild's events to
+    :param guild_id:
+    :param shard_count: How many shards the bot is split into
+    :return:
+    """
+    return (guild_id >> 22) % shard_count
+
+
+def assign_shards(shard_count: int, worker_count: int) -> list[list[int]]:
+    """
+    Deal the shards out between the workers, so every shard has exactly one worker and the
+    workers have as close to the same number of shards as they can
+
+    :param shard_count:
+    :param worker_count:
+    :raises ValueError: If there are no shards, or more workers than shards
+    :return: The shard ids for each worker
+    """
+    if shard_count < 1:
+        raise ValueError('There must be at least one shard')
+
+    if not 1 <= worker_count <= shard_count:
+        raise ValueError(f'There must be between 1 and {shard_count} workers')
+
+    return [list(range(worker, shard_count, worker_count)) for worker in range(worker_count)]
+
+
+def parse_shard_ids(value: str) -> list[int]:
+    """
+    Read shard ids such as `0,2,4` from an environment variable
+    :param value:
+    :raises ValueError: If an id is not a number
+    :return:
+    """
+    return [int(x) for x in value.split(',') if x.strip()]
+
+
+def shard_ids_to_str(shard_ids: list[int]) -> str:
+    """
+    Write shard ids the way parse_shard_ids reads them
+    :param shard_ids:
+    :return:
+    """
+    return ','.join(str(x) for x in shard_ids)
+
+
+class ShardSet:
+    """
+    The shards one worker process runs
+    """
+
+    def __init__(self, shard_count: Optional[int] = None, shard_ids: Optional[list[int]] = None):
+        """
+        :param shard_count: How many shards the bot is split into, or None when it is not
+            sharded
+        :param shard_ids: The shards this worker runs, or None for all of them
+        """
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+
+    @classmethod
+    def from_env(cls, environ: dict):
+        """
+        Read the shards from `SHARD_COUNT` and `SHARD_IDS`
+
+        :param environ: Such as os.environ
+        :raises ValueError: If either variable is malformed, or a shard id is out of range
+        :rtype: ShardSet
+        """
+        shard_count = environ.get('SHARD_COUNT')
+
+        if not shard_count:
+            return ShardSet()
+
+        shard_count = int(shard_count)
+        shard_ids = environ.get('SHARD_IDS')
+        shard_ids = parse_shard_ids(shard_ids) if shard_ids else None
+
+        if shard_ids is not None and not all(0 <= x < shard_count for x in shard_ids):
+            raise ValueError(f'SHARD_IDS must be between 0 and {shard_count - 1}')
+
+        return ShardSet(shard_count, shard_ids)
+
+    @property
+    def sharded(self) -> bool:
+        """
+        Whether the bot is split into shards
+        :return:
+        """
+        return self.shard_count is not None
+
+    def owns_guild(self, guild_id: int) -> bool:
+        """
+        Check if this worker gets the guild's events, so it should run the guild's combats
+        :param guild_id:
+        :return:
+        """
+        if self.shard_count is None or self.shard_ids is None:
+            return True
+
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+
+
+def worker_environments(environ: dict, shard_count: int, worker_count: int) -> list[dict]:
+    """
+    The environment for each worker process, a copy of the launcher's with the worker's
+    shards set
+
+    :param environ: The launcher's environment
+    :param shard_count:
+    :param worker_count:
+    :return:
+    """
+    return [
+        dict(environ, SHARD_COUNT=str(shard_count), SHARD_IDS=shard_ids_to_str(shard_ids))
+        for shard_ids in assign_shards(shard_count, worker_count)
+    ]
+
+
+def simulate_assignment(guild_ids: list[int],
+                        shard_count: int,
+                        worker_count: int) -> dict[int, list[int]]:
+    """
+    Work out which worker would run each guild, without connecting to Discord
+
+    :param guild_ids:
+    :param shard_count:
+    :param worker_count:
+    :return: The guild ids each worker would own, keyed by worker number
+    """
+    workers = [
+        ShardSet.from_env(environ)
+        for environ in worker_environments({}, shard_count, worker_count)
+    ]
+
+    return {
+        worker: [guild_id for guild_id in guild_ids if shard_set.owns_guild(guild_id)]
+        for worker, shard_set in enumerate(workers)
+    }
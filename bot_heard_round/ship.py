@@ -3,10 +3,25 @@ Ship module
 """
 
 import enum
+import itertools
 import re
+from types import MappingProxyType
 
 fleet_ship_regex = re.compile('(.+) \\((\\d+)/\\d+\\)')
 
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """
+    Get a new version number, larger than every version number handed out before.
+
+    Ships, fleet columns and fleet lists take a new version whenever they change, so
+    anything rendered from them can be cached until their version goes up
+    :return:
+    """
+    return next(_versions)
+
 
 class ShipType(enum.Enum):
     """
@@ -30,51 +45,13 @@ class ShipType(enum.Enum):
     SURVEY_SHIP = 'Survey Ship'
 
     def __str__(self):
-        str_rep = {
-            ShipType.BATTLESHIP: 'Battleship',
-            ShipType.BATTLECRUISER: 'Battlecruiser',
-            ShipType.HEAVY_CRUISER: 'Heavy Cruiser',
-            ShipType.LIGHT_CRUISER: 'Light Cruiser',
-            ShipType.FRIGATE: 'Frigate',
-            ShipType.DESTROYER: 'Destroyer',
-            ShipType.CORVETTE: 'Corvette',
-            ShipType.SYSTEM_DEFENCE_BOAT: 'System Defence Boat',
-            ShipType.FAC_SQUADRON: 'FAC Squadron',
-            ShipType.ARMED_MERCHANT: 'Armed Merchant',
-            ShipType.STEALTH_ATTACK_SHIP: 'Stealth Attack Ship',
-            ShipType.PD_CRUISER: 'PD Cruiser',
-            ShipType.ASSAULT_LANDING_SHIP: 'Assault Landing Ship',
-            ShipType.FAST_REPLENISHMENT_SHIP: 'Fast Replenishment Ship',
-            ShipType.PATROL_SHIP: 'Patrol Ship',
-            ShipType.SURVEY_SHIP: 'Survey Ship',
-        }
-
-        return str_rep[self]
+        return SHIP_TYPE_NAMES[self]
 
     def to_char(self):
         """
         :return:
         """
-        str_rep = {
-            ShipType.BATTLESHIP: 'BS',
-            ShipType.BATTLECRUISER: 'BC',
-            ShipType.HEAVY_CRUISER: 'HC',
-            ShipType.LIGHT_CRUISER: 'LC',
-            ShipType.FRIGATE: 'F',
-            ShipType.DESTROYER: 'D',
-            ShipType.CORVETTE: 'C',
-            ShipType.SYSTEM_DEFENCE_BOAT: 'SDB',
-            ShipType.FAC_SQUADRON: 'FAC',
-            ShipType.ARMED_MERCHANT: 'AM',
-            ShipType.STEALTH_ATTACK_SHIP: 'SAS',
-            ShipType.PD_CRUISER: 'PDC',
-            ShipType.ASSAULT_LANDING_SHIP: 'ALS',
-            ShipType.FAST_REPLENISHMENT_SHIP: 'FRS',
-            ShipType.PATROL_SHIP: 'PS',
-            ShipType.SURVEY_SHIP: 'SS',
-        }
-
-        return str_rep[self]
+        return SHIP_TYPE_CHARS[self]
 
     @classmethod
     def from_char(cls, char: str):
@@ -83,26 +60,7 @@ class ShipType(enum.Enum):
         :param char:
         :return:
         """
-        str_rep = {
-            'BS': ShipType.BATTLESHIP,
-            'BC': ShipType.BATTLECRUISER,
-            'HC': ShipType.HEAVY_CRUISER,
-            'LC': ShipType.LIGHT_CRUISER,
-            'F': ShipType.FRIGATE,
-            'D': ShipType.DESTROYER,
-            'C': ShipType.CORVETTE,
-            'SDB': ShipType.SYSTEM_DEFENCE_BOAT,
-            'FAC': ShipType.FAC_SQUADRON,
-            'AM': ShipType.ARMED_MERCHANT,
-            'SAS': ShipType.STEALTH_ATTACK_SHIP,
-            'PDC': ShipType.PD_CRUISER,
-            'ALS': ShipType.ASSAULT_LANDING_SHIP,
-            'FRS': ShipType.FAST_REPLENISHMENT_SHIP,
-            'PS': ShipType.PATROL_SHIP,
-            'SS': ShipType.SURVEY_SHIP,
-        }
-
-        return str_rep[char]
+        return SHIP_TYPES_BY_CHAR[char]
 
     @classmethod
     def from_str(cls, from_str: str):
@@ -111,26 +69,34 @@ class ShipType(enum.Enum):
         :param from_str:
         :return:
         """
-        str_rep = {
-            'Battleship': ShipType.BATTLESHIP,
-            'Battlecruiser': ShipType.BATTLECRUISER,
-            'Heavy Cruiser': ShipType.HEAVY_CRUISER,
-            'Light Cruiser': ShipType.LIGHT_CRUISER,
-            'Frigate': ShipType.FRIGATE,
-            'Destroyer': ShipType.DESTROYER,
-            'Corvette': ShipType.CORVETTE,
-            'System Defence Boat': ShipType.SYSTEM_DEFENCE_BOAT,
-            'FAC Squadron': ShipType.FAC_SQUADRON,
-            'Armed Merchant': ShipType.ARMED_MERCHANT,
-            'Stealth Attack Ship': ShipType.STEALTH_ATTACK_SHIP,
-            'PD Cruiser': ShipType.PD_CRUISER,
-            'Assault Landing Ship': ShipType.ASSAULT_LANDING_SHIP,
-            'Fast Replenishment Ship': ShipType.FAST_REPLENISHMENT_SHIP,
-            'Patrol Ship': ShipType.PATROL_SHIP,
-            'Survey Ship': ShipType.SURVEY_SHIP,
-        }
-
-        return str_rep[from_str]
+        return SHIP_TYPES_BY_NAME[from_str]
+
+    @classmethod
+    def parse_char(cls, string: str, start: int = 0):
+        """
+        Read the ship type char at the start of a fleet-list entry, such as the `BS` in
+        `BS30[1,0]`. Chars are all capital letters and are always followed by the health, so
+        reading up to the first non capital letter gives the whole char
+
+        :param string:
+        :param start: Where in the string the char starts
+        :return: The ship type and where the char ends
+        """
+        end = start
+        length = len(string)
+
+        while end < length and 'A' <= string[end] <= 'Z':
+            end += 1
+
+        ship_type = SHIP_TYPES_BY_CHAR.get(string[start:end])
+
+        if ship_type is None and end == start:
+            raise ValueError(f'expected a ship type at character {start}')
+
+        if ship_type is None:
+            raise ValueError(f'`{string[start:end]}` is not a ship type')
+
+        return ship_type, end
 
     @property
     def max_health(self) -> int:
@@ -157,14 +123,86 @@ class ShipType(enum.Enum):
         return SHIP_DEFENCES[self]
 
 
+SHIP_TYPE_NAMES = MappingProxyType({
+    ShipType.BATTLESHIP: 'Battleship',
+    ShipType.BATTLECRUISER: 'Battlecruiser',
+    ShipType.HEAVY_CRUISER: 'Heavy Cruiser',
+    ShipType.LIGHT_CRUISER: 'Light Cruiser',
+    ShipType.FRIGATE: 'Frigate',
+    ShipType.DESTROYER: 'Destroyer',
+    ShipType.CORVETTE: 'Corvette',
+    ShipType.SYSTEM_DEFENCE_BOAT: 'System Defence Boat',
+    ShipType.FAC_SQUADRON: 'FAC Squadron',
+    ShipType.ARMED_MERCHANT: 'Armed Merchant',
+    ShipType.STEALTH_ATTACK_SHIP: 'Stealth Attack Ship',
+    ShipType.PD_CRUISER: 'PD Cruiser',
+    ShipType.ASSAULT_LANDING_SHIP: 'Assault Landing Ship',
+    ShipType.FAST_REPLENISHMENT_SHIP: 'Fast Replenishment Ship',
+    ShipType.PATROL_SHIP: 'Patrol Ship',
+    ShipType.SURVEY_SHIP: 'Survey Ship',
+})
+
+SHIP_TYPE_CHARS = MappingProxyType({
+    ShipType.BATTLESHIP: 'BS',
+    ShipType.BATTLECRUISER: 'BC',
+    ShipType.HEAVY_CRUISER: 'HC',
+    ShipType.LIGHT_CRUISER: 'LC',
+    ShipType.FRIGATE: 'F',
+    ShipType.DESTROYER: 'D',
+    ShipType.CORVETTE: 'C',
+    ShipType.SYSTEM_DEFENCE_BOAT: 'SDB',
+    ShipType.FAC_SQUADRON: 'FAC',
+    ShipType.ARMED_MERCHANT: 'AM',
+    ShipType.STEALTH_ATTACK_SHIP: 'SAS',
+    ShipType.PD_CRUISER: 'PDC',
+    ShipType.ASSAULT_LANDING_SHIP: 'ALS',
+    ShipType.FAST_REPLENISHMENT_SHIP: 'FRS',
+    ShipType.PATROL_SHIP: 'PS',
+    ShipType.SURVEY_SHIP: 'SS',
+})
+
+SHIP_TYPES_BY_NAME = MappingProxyType({name: x for x, name in SHIP_TYPE_NAMES.items()})
+SHIP_TYPES_BY_CHAR = MappingProxyType({char: x for x, char in SHIP_TYPE_CHARS.items()})
+
+
 class Ship:
     """
-    Class to represent a ship
+    Class to represent a ship.
+
+    Uses slots, and copies the ship type's stats onto the ship when the type is set, so reading
+    attack, defence and max health is a plain attribute read
     """
+    __slots__ = ('_ship_type', '_current_health', 'version', 'max_health', 'attack', 'defence')
 
     def __init__(self, current_health: int, ship_type: ShipType):
-        self.current_health = current_health
         self.ship_type = ship_type
+        self.current_health = current_health
+
+    @property
+    def ship_type(self) -> ShipType:
+        """
+        The type of ship
+        :return:
+        """
+        return self._ship_type
+
+    @ship_type.setter
+    def ship_type(self, ship_type: ShipType):
+        self._ship_type = ship_type
+        self.max_health, self.attack, self.defence = SHIP_STATS[ship_type]
+
+    @property
+    def current_health(self) -> int:
+        """
+        The ship's current health
+        :return:
+        """
+        return self._current_health
+
+    @current_health.setter
+    def current_health(self, current_health: int):
+        self._current_health = current_health
+        self.version = next_version()
 
     def __str__(self):
         return '{} ({}/{})'.format(
@@ -173,14 +211,6 @@ class Ship:
             self.max_health
         )
 
-    def __getattr__(self, attr):
-        """
-        Proxy calls down to the ship type
-        :param attr:
-        :return:
-        """
-        return getattr(self.ship_type, attr)
-
     @classmethod
     def from_str(cls, ship_str: str):
         """
@@ -258,3 +288,17 @@ SHIP_ATTACKS = {
     ShipType.PATROL_SHIP: 1,
     ShipType.SURVEY_SHIP: 0,
 }
+
+SHIP_TYPES: tuple[ShipType, ...] = tuple(ShipType)
+
+SHIP_TYPE_CODES: dict[ShipType, int] = {
+    ship_type: code for code, ship_type in enumerate(SHIP_TYPES)
+}
+
+SHIP_STATS: dict[ShipType, tuple[int, int, int]] = {
+    ship_type: (SHIP_MAX_HEALTHS[ship_type], SHIP_ATTACKS[ship_type], SHIP_DEFENCES[ship_type])
+    for ship_type in SHIP_TYPES
+}
+
+SHIP_CODE_ATTACKS: tuple[int, ...] = tuple(SHIP_ATTACKS[x] for x in SHIP_TYPES)
+SHIP_CODE_DEFENCES: tuple[int, ...] = tuple(SHIP_DEFENCES[x] for x in SHIP_TYPES)
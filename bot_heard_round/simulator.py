@@ -0,0 +1,378 @@
+"""
+Headless Monte Carlo simulation of combats, for finding the deployments that win most often
+"""
+
+import enum
+import multiprocessing
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional
+
+from bot_heard_round.combat_status import CombatStatus, CombatRound, Side
+from bot_heard_round.fleet import CombatColumn, FleetList
+
+ROUNDS = (CombatRound.MISSILE_ONE, CombatRound.MISSILE_TWO, CombatRound.RAIL_GUN)
+
+Deployment = tuple[int, int, int]
+
+
+class RetreatPolicy(enum.Enum):
+    """
+    Enum for when a simulated player retreats, checked at the start of every round
+    """
+    NEVER = 'never'
+    WHEN_BEHIND = 'when behind'
+    RANDOM = 'random'
+
+    def retreats(self, own_health: int, other_health: int, rng: random.Random) -> bool:
+        """
+        Check if the player retreats this round
+
+        :param own_health: The health the player has left
+        :param other_health: The health the other player has left
+        :param rng:
+        :return:
+        """
+        if self == RetreatPolicy.WHEN_BEHIND:
+            return own_health < other_health
+
+        if self == RetreatPolicy.RANDOM:
+            return rng.random() < 1 / 3
+
+        return False
+
+
+def fleet_health(fleet: FleetList) -> int:
+    """
+    The total health of every ship left in the fleet
+    :param fleet:
+    :return:
+    """
+    return sum(ship.current_health for column in fleet.columns for ship, _ in column.ships)
+
+
+def random_deployment(fleet: FleetList, rng: random.Random) -> Deployment:
+    """
+    Pick a deployment the bot would allow. Players deploy a fleet column with ships for each
+    combat column until they run out, so it is as many columns as they can up to three
+
+    :param fleet:
+    :param rng:
+    :return: The fleet column number in the left, middle and right combat columns, or 0 if
+        the combat column is left empty
+    """
+    with_ships = [column.column_number for column in fleet.columns if column.ships]
+    chosen = rng.sample(with_ships, min(3, len(with_ships)))
+    slots = rng.sample(range(3), len(chosen))
+
+    deployment = [0, 0, 0]
+    for slot, column_number in zip(slots, chosen):
+        deployment[slot] = column_number
+
+    return tuple(deployment)
+
+
+def deploy(fleet: FleetList, deployment: Deployment):
+    """
+    Move the fleet columns into their combat columns
+    :param fleet:
+    :param deployment:
+    """
+    for combat_column, column_number in zip(CombatColumn.active_columns(), deployment):
+        if column_number:
+            fleet.where_number(column_number).combat_column = combat_column
+
+
+def deployment_to_str(deployment: Deployment) -> str:
+    """
+    Describe a deployment, such as `L1 M3 R-`
+    :param deployment:
+    :return:
+    """
+    return ' '.join(
+        '{}{}'.format(combat_column.to_char(), column_number or '-')
+        for combat_column, column_number in zip(CombatColumn.active_columns(), deployment)
+    )
+
+
+class SimulationResult:
+    """
+    Totals from simulated combats, overall and for each choice each side made
+    """
+
+    def __init__(self):
+        self.trials = 0
+        self.draws = 0
+        self.wins = {Side.ATTACKER: 0, Side.DEFENDER: 0}
+        self.health = {Side.ATTACKER: 0, Side.DEFENDER: 0}
+        self.choices: dict[tuple[Side, str, str], list[int]] = {}
+
+    def add(self,
+            choices: dict[Side, dict[str, str]],
+            winner: Optional[Side],
+            health: dict[Side, int]):
+        """
+        Count one combat
+
+        :param choices: What each side chose, such as `{'patrol': 'yes'}`
+        :param winner: The side that won, or None for a draw
+        :param health: The health each side had left
+        """
+        self.trials += 1
+
+        if winner is None:
+            self.draws += 1
+        else:
+            self.wins[winner] += 1
+
+        for side in Side:
+            self.health[side] += health[side]
+
+            for kind, choice in choices[side].items():
+                totals = self.choices.setdefault((side, kind, choice), [0, 0, 0])
+                totals[0] += 1
+                totals[1] += winner == side
+                totals[2] += health[side]
+
+    def merge(self, other):
+        """
+        Add the totals from another result
+        :param SimulationResult other:
+        """
+        self.trials += other.trials
+        self.draws += other.draws
+
+        for side in Side:
+            self.wins[side] += other.wins[side]
+            self.health[side] += other.health[side]
+
+        for key, other_totals in other.choices.items():
+            totals = self.choices.setdefault(key, [0, 0, 0])
+            for i, value in enumerate(other_totals):
+                totals[i] += value
+
+    def win_rate(self, side: Side) -> float:
+        """
+        :param side:
+        :return: The share of combats the side won
+        """
+        return self.wins[side] / self.trials if self.trials else 0.0
+
+    def expected_health(self, side: Side) -> float:
+        """
+        :param side:
+        :return: The average health the side had left
+        """
+        return self.health[side] / self.trials if self.trials else 0.0
+
+    def best(self, side: Side, kind: str, count: int = 3) -> list[tuple[str, float, float]]:
+        """
+        The choices that won most often for the side
+
+        :param side:
+        :param kind: `deployment`, `patrol` or `retreat`
+        :param count: How many to return
+        :return: Each choice with its win rate and average health left
+        """
+        ranked = sorted(
+            (
+                (choice, totals[1] / totals[0], totals[2] / totals[0])
+                for (choice_side, choice_kind, choice), totals in self.choices.items()
+                if choice_side == side and choice_kind == kind
+            ),
+            key=lambda x: (-x[1], -x[2], x[0])
+        )
+
+        return ranked[:count]
+
+    def __str__(self):
+        lines = [
+            '{} combats, {} drawn'.format(self.trials, self.draws),
+        ]
+
+        for side in Side:
+            lines.append('')
+            lines.append('{} wins {:.1%}, {:.1f} health left on average'.format(
+                side.value,
+                self.win_rate(side),
+                self.expected_health(side)
+            ))
+
+            for kind in ['deployment', 'patrol', 'retreat']:
+                for choice, win_rate, health in self.best(side, kind):
+                    lines.append('  {} {}: wins {:.1%}, {:.1f} health left'.format(
+                        kind,
+                        choice,
+                        win_rate,
+                        health
+                    ))
+
+        return '\n'.join(lines)
+
+
+def run_trial(attacker_str: str,
+              defender_str: str,
+              patrol_options: tuple[bool, ...],
+              retreat_options: tuple[RetreatPolicy, ...],
+              rng: random.Random,
+              result: SimulationResult):
+    """
+    Simulate one combat with random choices for both sides, following the bot's rounds: patrol
+    mode, then fight or retreat, deployment in the first round, and resolving the round.
+    Fleet switches between rounds are not simulated
+
+    The side with the bigger share of its starting health left wins
+
+    :param attacker_str:
+    :param defender_str:
+    :param patrol_options: The patrol modes to pick from
+    :param retreat_options: The retreat policies to pick from
+    :param rng:
+    :param result: Where to count the combat
+    """
+    fleets = {
+        Side.ATTACKER: FleetList.from_str(attacker_str),
+        Side.DEFENDER: FleetList.from_str(defender_str),
+    }
+    combat_status = CombatStatus(
+        (None, fleets[Side.ATTACKER]),
+        (None, fleets[Side.DEFENDER])
+    )
+    starting_health = {side: fleet_health(fleet) for side, fleet in fleets.items()}
+    choices = {}
+    policies = {}
+
+    for side, fleet in fleets.items():
+        fleet.patrol_mode = rng.choice(patrol_options)
+        policies[side] = rng.choice(retreat_options)
+        choices[side] = {
+            'patrol': 'yes' if fleet.patrol_mode else 'no',
+            'retreat': policies[side].value,
+        }
+
+    health = dict(starting_health)
+
+    for combat_round in ROUNDS:
+        combat_status.combat_round = combat_round
+        retreats = [
+            policies[side].retreats(health[side], health[side.opponent], rng)
+            for side in Side
+        ]
+
+        if all(retreats):
+            break
+
+        if combat_round == CombatRound.MISSILE_ONE:
+            for side, fleet in fleets.items():
+                deployment = random_deployment(fleet, rng)
+                deploy(fleet, deployment)
+                choices[side]['deployment'] = deployment_to_str(deployment)
+
+        combat_status.fight_combat_round()
+        health = {side: fleet_health(fleet) for side, fleet in fleets.items()}
+
+        if any(retreats):
+            break
+
+    for side in Side:
+        choices[side].setdefault('deployment', 'retreated')
+
+    shares = {
+        side: health[side] / starting_health[side] if starting_health[side] else 0.0
+        for side in Side
+    }
+
+    if shares[Side.ATTACKER] == shares[Side.DEFENDER]:
+        winner = None
+    else:
+        winner = max(Side, key=lambda x: shares[x])
+
+    result.add(choices, winner, health)
+
+
+def run_trials(attacker_str: str,
+               defender_str: str,
+               trials: int,
+               patrol_options: tuple[bool, ...],
+               retreat_options: tuple[RetreatPolicy, ...],
+               seed: int) -> SimulationResult:
+    """
+    Simulate a number of combats, run in each worker process
+
+    :param attacker_str:
+    :param defender_str:
+    :param trials:
+    :param patrol_options:
+    :param retreat_options:
+    :param seed:
+    :return:
+    """
+    rng = random.Random(seed)
+    result = SimulationResult()
+
+    for _ in range(trials):
+        run_trial(attacker_str, defender_str, patrol_options, retreat_options, rng, result)
+
+    return result
+
+
+def simulation_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    A pool of processes to share between simulations. The processes are spawned rather than
+    forked, so they do not get a copy of the bot's connections and state
+
+    :param workers: How many processes to start
+    :return:
+    """
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def simulate(attacker_str: str,
+             defender_str: str,
+             trials: int = 1000,
+             patrol_options: tuple[bool, ...] = (False, True),
+             retreat_options: tuple[RetreatPolicy, ...] = tuple(RetreatPolicy),
+             workers: int = None,
+             seed: int = None,
+             pool: Optional[Executor] = None) -> SimulationResult:
+    """
+    Simulate combats between the two fleets with random deployments, patrol modes and retreat
+    policies, split across a pool of processes
+
+    :param attacker_str: The attacker's `fleet-list`
+    :param defender_str: The defender's `fleet-list`
+    :param trials: How many combats to simulate
+    :param patrol_options: The patrol modes to try
+    :param retreat_options: The retreat policies to try
+    :param workers: How many processes to use, every core by default
+    :param seed: Seed for repeatable results
+    :param pool: The pool to run in, such as one from simulation_pool. A pool is started for
+        this simulation if not given
+    :raises FleetList.ParseError: If either fleet is malformed
+    :return:
+    """
+    FleetList.from_str(attacker_str)
+    FleetList.from_str(defender_str)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, trials))
+    seeds = random.Random(seed).sample(range(2 ** 32), workers)
+    chunks = [trials // workers + (i < trials % workers) for i in range(workers)]
+    args = [
+        (attacker_str, defender_str, chunk, patrol_options, retreat_options, chunk_seed)
+        for chunk, chunk_seed in zip(chunks, seeds)
+    ]
+
+    if workers == 1:
+        results = [run_trials(*args[0])]
+    elif pool is not None:
+        results = list(pool.map(run_trials, *zip(*args)))
+    else:
+        with simulation_pool(workers) as own_pool:
+            results = list(own_pool.map(run_trials, *zip(*args)))
+
+    result = SimulationResult()
+    for chunk_result in results:
+        result.merge(chunk_result)
+
+    return result
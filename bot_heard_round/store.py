@@ -0,0 +1,173 @@
+"""
+Persistent storage for in-flight combats, so they survive the bot restarting
+"""
+
+import abc
+import json
+import sqlite3
+
+import discord
+
+from bot_heard_round.combat_status import CombatStatus, CombatStep
+
+
+class CombatCheckpoint:
+    """
+    A saved point in a combat that the combat can be resumed from
+    """
+
+    def __init__(self,
+                 channel_id: int,
+                 guild_id: int,
+                 message_id: int,
+                 attacker_id: int,
+                 defender_id: int,
+                 state: dict,
+                 step: CombatStep,
+                 step_index: int = 0,
+                 retreated: bool = False):
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.message_id = message_id
+        self.attacker_id = attacker_id
+        self.defender_id = defender_id
+        self.state = state
+        self.step = step
+        self.step_index = step_index
+        self.retreated = retreated
+
+    @classmethod
+    def from_combat(cls,
+                    combat_status: CombatStatus,
+                    step: CombatStep,
+                    step_index: int = 0,
+                    retreated: bool = False):
+        """
+        Take a checkpoint of the given combat
+
+        :param combat_status:
+        :param step: The step the combat is about to run
+        :param step_index: How far through the step the combat is
+        :param retreated: Whether a player has retreated this round
+        :rtype: CombatCheckpoint
+        """
+        message = combat_status.message
+
+        return CombatCheckpoint(
+            channel_id=message.channel.id,
+            guild_id=message.channel.guild.id,
+            message_id=message.id,
+            attacker_id=combat_status.attacker.id,
+            defender_id=combat_status.defender.id,
+            state=combat_status.to_dict(),
+            step=step,
+            step_index=step_index,
+            retreated=retreated
+        )
+
+    def restore(self, attacker, defender, message: discord.Message = None) -> CombatStatus:
+        """
+        Rebuild the combat status from this checkpoint
+
+        :param attacker:
+        :param defender:
+        :param message:
+        :return:
+        """
+        return CombatStatus.from_dict(self.state, attacker, defender, message=message)
+
+
+class CombatStore(abc.ABC):
+    """
+    Base class for combat stores, extend this to save combats somewhere else
+    """
+
+    @abc.abstractmethod
+    def save(self, checkpoint: CombatCheckpoint):
+        """
+        Save the checkpoint, replacing any previous checkpoint for the same combat
+        :param checkpoint:
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def load_active(self) -> list[CombatCheckpoint]:
+        """
+        Load the latest checkpoint for every combat that has not finished
+        :return:
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, channel_id: int):
+        """
+        Forget the combat in the given channel
+        :param channel_id:
+        """
+        raise NotImplementedError
+
+
+class SqliteCombatStore(CombatStore):
+    """
+    Combat store backed by a local SQLite database
+    """
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS combats ('
+                'channel_id INTEGER PRIMARY KEY, '
+                'guild_id INTEGER NOT NULL, '
+                'message_id INTEGER NOT NULL, '
+                'attacker_id INTEGER NOT NULL, '
+                'defender_id INTEGER NOT NULL, '
+                'state TEXT NOT NULL, '
+                'step TEXT NOT NULL, '
+                'step_index INTEGER NOT NULL, '
+                'retreated INTEGER NOT NULL'
+                ')'
+            )
+
+    def save(self, checkpoint: CombatCheckpoint):
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO combats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    checkpoint.channel_id,
+                    checkpoint.guild_id,
+                    checkpoint.message_id,
+                    checkpoint.attacker_id,
+                    checkpoint.defender_id,
+                    json.dumps(checkpoint.state),
+                    checkpoint.step.value,
+                    checkpoint.step_index,
+                    int(checkpoint.retreated),
+                )
+            )
+
+    def load_active(self) -> list[CombatCheckpoint]:
+        rows = self.connection.execute(
+            'SELECT channel_id, guild_id, message_id, attacker_id, defender_id, '
+            'state, step, step_index, retreated FROM combats'
+        )
+
+        return [
+            CombatCheckpoint(
+                channel_id=row[0],
+                guild_id=row[1],
+                message_id=row[2],
+                attacker_id=row[3],
+                defender_id=row[4],
+                state=json.loads(row[5]),
+                step=CombatStep(row[6]),
+                step_index=row[7],
+                retreated=bool(row[8])
+            )
+            for row in rows
+        ]
+
+    def delete(self, channel_id: int):
+        with self.connection:
+            self.connection.execute('DELETE FROM combats WHERE channel_id = ?', (channel_id,))
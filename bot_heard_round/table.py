@@ -0,0 +1,42 @@
+"""
+Renders the ship table in the combat status
+"""
+
+MIN_PADDING = 2
+
+
+def render_table(headers: list[str], rows: list[list[str]]) -> str:
+    """
+    Render a GitHub style table with every cell centred.
+
+    Gives the same output as tabulate with tablefmt='github' and stralign='center' for
+    string cells, without tabulate's type detection
+
+    :param headers:
+    :param rows:
+    :return:
+    """
+    widths = [len(header) + MIN_PADDING for header in headers]
+
+    for row in rows:
+        for i, cell in enumerate(row):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+
+    formats = ['{:^%d}' % width for width in widths]
+
+    lines = [
+        '| ' + ' | '.join(
+            cell_format.format(header) for cell_format, header in zip(formats, headers)
+        ) + ' |',
+        '|' + '|'.join('-' * (width + 2) for width in widths) + '|',
+    ]
+
+    for row in rows:
+        lines.append(
+            '| ' + ' | '.join(
+                cell_format.format(cell) for cell_format, cell in zip(formats, row)
+            ) + ' |'
+        )
+
+    return '\n'.join(lines)
@@ -0,0 +1,241 @@
+"""
+Transposition table of column against column fights, so the same match-up is only worked out
+once however many times simulations and suggestions meet it
+"""
+
+from collections import OrderedDict
+from typing import Optional
+
+from bot_heard_round.combat_status import CombatRound, CombatStatus, Side
+from bot_heard_round.fleet import CombatColumn, FleetColumn
+
+# The attack and defence totals, the health of each ship in position order, then whether
+# the column is in patrol mode
+ColumnKey = tuple[int, int, tuple[int, ...], bool]
+
+# The attacker's column, the defender's column, and whether it is the rail gun round
+FightKey = tuple[ColumnKey, ColumnKey, bool]
+
+
+class ColumnOutcome:
+    """
+    What happens to both fleet columns in one combat column. Each field is a pair, the
+    attacker's column first and the defender's second
+    """
+    __slots__ = ('damage', 'carry_over', 'destroyed', 'front_damage')
+
+    def __init__(self,
+                 damage: tuple[int, int],
+                 carry_over: tuple[int, int],
+                 destroyed: tuple[int, int],
+                 front_damage: tuple[int, int]):
+        """
+        :param damage: The damage each column takes
+        :param carry_over: The damage left over after each column is destroyed, which goes
+            on to the adjacent combat columns
+        :param destroyed: How many ships are destroyed from the front of each column
+        :param front_damage: The damage to the front ship left in each column
+        """
+        self.damage = damage
+        self.carry_over = carry_over
+        self.destroyed = destroyed
+        self.front_damage = front_damage
+
+
+def column_stats(column: ColumnKey, rail_gun: bool) -> tuple[int, int]:
+    """
+    The attack and defence of a column, the same way as FleetColumn.attack and defence
+
+    :param column:
+    :param rail_gun: Whether defence is zero this round
+    :return:
+    """
+    attack, defence, _, patrol_mode = column
+
+    if rail_gun:
+        defence = 0
+
+    if patrol_mode:
+        return attack // 2, defence // 2
+
+    return attack, defence
+
+
+def damage_column(column: ColumnKey, damage: int) -> tuple[int, int, int]:
+    """
+    Work out damage to the front of a column, the same way as FleetColumn.take_damage
+
+    :param column:
+    :param damage:
+    :return: The damage left over, the ships destroyed and the damage to the front ship left
+    """
+    healths = column[2]
+    destroyed = 0
+
+    while damage > 0 and destroyed < len(healths):
+        health = healths[destroyed]
+
+        if damage < health:
+            return 0, destroyed, damage
+
+        damage -= health
+        destroyed += 1
+
+    return damage, destroyed, 0
+
+
+def resolve_columns(attacker: ColumnKey, defender: ColumnKey, rail_gun: bool) -> ColumnOutcome:
+    """
+    Fight one combat column, the same way as CombatStatus.run_combat_column
+
+    :param attacker: The attacker's column in the combat column
+    :param defender: The defender's column in the combat column
+    :param rail_gun: Whether it is the rail gun round
+    :return:
+    """
+    columns = (attacker, defender)
+    stats = [column_stats(column, rail_gun) for column in columns]
+    damage = []
+    carry_over = []
+    destroyed = []
+    front_damage = []
+
+    for taker, column in enumerate(columns):
+        taken = max(stats[1 - taker][0] - stats[taker][1], 0)
+        left, column_destroyed, column_front_damage = damage_column(column, taken)
+
+        damage.append(taken)
+        carry_over.append(left)
+        destroyed.append(column_destroyed)
+        front_damage.append(column_front_damage)
+
+    return ColumnOutcome(tuple(damage), tuple(carry_over), tuple(destroyed), tuple(front_damage))
+
+
+class TranspositionTable:
+    """
+    Least recently used cache of column against column outcomes, counting hits and misses
+    """
+
+    def __init__(self, max_size: int = 65536):
+        """
+        :param max_size: How many outcomes to keep before dropping the least recently used
+        """
+        self.max_size = max_size
+        self.outcomes: OrderedDict[FightKey, ColumnOutcome] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    def get(self, key: FightKey) -> Optional[ColumnOutcome]:
+        """
+        Look up an outcome, counting the hit or miss
+        :param key:
+        :return: The outcome, or None if it is not in the table
+        """
+        outcome = self.outcomes.get(key)
+
+        if outcome is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.outcomes.move_to_end(key)
+
+        return outcome
+
+    def put(self, key: FightKey, outcome: ColumnOutcome):
+        """
+        Store an outcome, dropping the least recently used one if the table is full
+        :param key:
+        :param outcome:
+        """
+        self.outcomes[key] = outcome
+        self.outcomes.move_to_end(key)
+
+        if len(self.outcomes) > self.max_size:
+            self.outcomes.popitem(last=False)
+
+    def resolve(self, attacker: ColumnKey, defender: ColumnKey, rail_gun: bool) -> ColumnOutcome:
+        """
+        Get the outcome of a fight, working it out and storing it if it is not in the table
+
+        :param attacker:
+        :param defender:
+        :param rail_gun:
+        :return:
+        """
+        key = (attacker, defender, rail_gun)
+        outcome = self.get(key)
+
+        if outcome is None:
+            outcome = resolve_columns(attacker, defender, rail_gun)
+            self.put(key, outcome)
+
+        return outcome
+
+    def hit_rate(self) -> float:
+        """
+        :return: The share of lookups that were hits
+        """
+        lookups = self.hits + self.misses
+
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """
+        Empty the table and reset the counters
+        """
+        self.outcomes.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def fight_combat_round(combat_status: CombatStatus, table: TranspositionTable):
+    """
+    Fight the combat's current round quietly, the same way as CombatStatus.fight_combat_round
+    but taking each combat column's outcome from the table
+
+    This is kept out of CombatStatus. Fleet columns keep running attack and defence totals, so
+    fighting a column is only a few steps, and building the keys for a lookup costs more than
+    that. Nearly every fight damages the columns it was keyed on, so their keys cannot be
+    reused either
+
+    :param combat_status:
+    :param table:
+    """
+    rail_gun = combat_status.combat_round == CombatRound.RAIL_GUN
+    carry_over = []
+
+    for combat_column in CombatColumn.active_columns():
+        columns = []
+
+        for fleet in [combat_status.attacker_fleet, combat_status.defender_fleet]:
+            in_column = fleet.where_column(combat_column)
+            columns.append(in_column[0] if in_column else FleetColumn(-1))
+
+        attacker_ships, defender_ships = columns
+        outcome = table.resolve(
+            attacker_ships.transposition_key,
+            defender_ships.transposition_key,
+            rail_gun
+        )
+
+        # Same order as CombatStatus.run_combat_column: the attacker deals damage first
+        for taker, ships, dealer, fleet in [
+                (1, defender_ships, Side.ATTACKER, combat_status.defender_fleet),
+                (0, attacker_ships, Side.DEFENDER, combat_status.attacker_fleet),
+        ]:
+            ships.apply_damage(outcome.destroyed[taker], outcome.front_damage[taker])
+
+            if outcome.carry_over[taker] > 0:
+                for column in CombatColumn.adjacent_columns(combat_column):
+                    carry_over.append(
+                        (outcome.carry_over[taker], fleet.where_column(column))
+                    )
+
+    for damage, fleets in carry_over:
+        for ships in fleets:
+            ships.deal_damage(damage)
@@ -2,15 +2,23 @@
 Utility methods
 """
 
+from typing import Union
+
 import discord
 
+from bot_heard_round.members import GuildMembers
+
 
-def get_user_from_nick_or_name(name_nick: str, members: list[discord.User]) -> discord.User:
+def get_user_from_nick_or_name(name_nick: str,
+                               members: Union[GuildMembers, list[discord.User]]) -> discord.User:
     """
     :param name_nick:
-    :param members:
+    :param members: The indexed guild members, or a list of members to search
     :return: The discord user, otherwise none
     """
+    if isinstance(members, GuildMembers):
+        return members.get(name_nick)
+
     user = discord.utils.get(members, display_name=name_nick)
     # if not user:
     #     user = discord.utils.get(members, name=name_nick)
@@ -0,0 +1,72 @@
+"""
+Runs the bot as several worker processes, each with its own share of the shards
+
+Run with `python launch.py`, or `python launch.py --dry-run [guild id ...]` to print which
+worker would run each shard and guild without connecting to Discord
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from bot_heard_round.sharding import assign_shards, shard_for_guild, simulate_assignment, \
+    worker_environments
+
+load_dotenv()
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '2'))
+WORKER_COUNT = int(os.getenv('WORKER_COUNT', str(SHARD_COUNT)))
+# Found next to this file, so the launcher works from any directory
+RUN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'run.py')
+
+
+def dry_run(guild_ids: list[int]):
+    """
+    Print the shards each worker would run, and which worker would run each guild
+    :param guild_ids:
+    """
+    owners = simulate_assignment(guild_ids, SHARD_COUNT, WORKER_COUNT)
+
+    for worker, shard_ids in enumerate(assign_shards(SHARD_COUNT, WORKER_COUNT)):
+        print(f'Worker {worker}: shards {shard_ids}')
+
+        for guild_id in owners[worker]:
+            print(f'  guild {guild_id} (shard {shard_for_guild(guild_id, SHARD_COUNT)})')
+
+
+def main():
+    """
+    Start a worker for each share of the shards, and stop them all when any of them stops
+    """
+    if sys.argv[1:2] == ['--dry-run']:
+        dry_run([int(x) for x in sys.argv[2:]])
+        return
+
+    workers = [
+        subprocess.Popen([sys.executable, RUN_PATH], env=environ)
+        for environ in worker_environments(dict(os.environ), SHARD_COUNT, WORKER_COUNT)
+    ]
+
+    stopped = None
+
+    try:
+        while stopped is None:
+            time.sleep(1)
+            stopped = next((worker for worker in workers if worker.poll() is not None), None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+
+        for worker in workers:
+            worker.wait()
+
+    sys.exit(stopped.returncode if stopped else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Random fleets for the tests that check the combat engines agree with each other
+"""
+import random
+
+from bot_heard_round.ship import ShipType
+
+
+def random_fleet_str(rng: random.Random,
+                     max_ships: int = 15,
+                     patrol_chance: float = 0.3,
+                     min_ships: int = 1,
+                     min_health: int = 1,
+                     combat_columns: bool = False) -> str:
+    """
+    Make a random `fleet-list`, sometimes in patrol mode
+
+    :param rng:
+    :param max_ships: The most ships the fleet can have
+    :param patrol_chance: How often the fleet is in patrol mode
+    :param min_ships: The fewest ships the fleet can have
+    :param min_health: The lowest health a ship can have, 0 to include destroyed ships
+    :param combat_columns: Whether to put the fleet columns in random combat columns, some of
+        them sharing a combat column
+    :return:
+    """
+    prefix = '<P>' if rng.random() < patrol_chance else ''
+
+    if combat_columns:
+        prefix += '<C:{}>'.format(''.join(rng.choice('WLMR') for _ in range(5)))
+
+    return prefix + '|'.join(
+        f'{ship_type.to_char()}{rng.randint(min_health, ship_type.max_health)}'
+        f'[{rng.randint(1, 5)},{rng.randint(0, 3)}]'
+        for ship_type in rng.choices(list(ShipType), k=rng.randint(min_ships, max_ships))
+    )
@@ -0,0 +1,147 @@
+"""
+Unit tests for the batch combat engine
+"""
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from bot_heard_round.batch import CombatBatch
+from bot_heard_round.combat_status import CombatStatus, CombatRound, Side
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.ship import ShipType
+from test.fleets import random_fleet_str
+
+
+def random_fleet(rng: random.Random) -> FleetList:
+    """
+    Make a random fleet with destroyed ships and random combat columns
+    :param rng:
+    :return:
+    """
+    return FleetList.from_str(random_fleet_str(
+        rng,
+        max_ships=25,
+        patrol_chance=0.2,
+        min_ships=0,
+        min_health=0,
+        combat_columns=True
+    ))
+
+
+class TestCombatBatch(unittest.TestCase):
+    """
+    Tests for the batch combat engine
+    """
+
+    def test_encoding_round_trips(self):
+        """
+        Test fleets come back out of the batch the same as they went in
+        """
+        rng = random.Random(1)
+        combats = [
+            CombatStatus((MagicMock(), random_fleet(rng)), (MagicMock(), random_fleet(rng)))
+            for _ in range(20)
+        ]
+
+        batch = CombatBatch.from_combats(combats)
+
+        for i, combat in enumerate(combats):
+            with self.subTest(combat=i):
+                self.assertEqual(combat.attacker_fleet, batch.fleet_list(i, Side.ATTACKER))
+                self.assertEqual(combat.defender_fleet, batch.fleet_list(i, Side.DEFENDER))
+
+    def test_matches_resolve_combat_round(self):
+        """
+        Test the batch gives the same fleets as resolving each combat on its own, for every
+        round
+        """
+        rng = random.Random(2)
+        fleet_strs = [
+            (random_fleet(rng), random_fleet(rng))
+            for _ in range(300)
+        ]
+
+        for combat_round in [CombatRound.MISSILE_ONE, CombatRound.RAIL_GUN]:
+            combats = [
+                CombatStatus(
+                    (MagicMock(), FleetList.from_str(attacker.to_str())),
+                    (MagicMock(), FleetList.from_str(defender.to_str())),
+                    combat_round
+                )
+                for attacker, defender in fleet_strs
+            ]
+
+            batch = CombatBatch.from_combats(combats)
+            batch.resolve_round()
+
+            for i, combat in enumerate(combats):
+                combat.resolve_combat_round()
+
+                with self.subTest(combat_round=combat_round, combat=i):
+                    self.assertEqual(combat.attacker_fleet, batch.fleet_list(i, Side.ATTACKER))
+                    self.assertEqual(combat.defender_fleet, batch.fleet_list(i, Side.DEFENDER))
+
+    def test_several_rounds(self):
+        """
+        Test resolving one round after another stays the same as resolving each combat
+        """
+        rng = random.Random(3)
+        combats = [
+            CombatStatus(
+                (MagicMock(), random_fleet(rng)),
+                (MagicMock(), random_fleet(rng)),
+                CombatRound.MISSILE_ONE
+            )
+            for _ in range(100)
+        ]
+        batch = CombatBatch.from_combats(combats)
+
+        for combat_round in [CombatRound.MISSILE_ONE, CombatRound.MISSILE_TWO,
+                             CombatRound.RAIL_GUN]:
+            batch.rounds[:] = combat_round.value
+            batch.resolve_round()
+
+            for combat in combats:
+                combat.combat_round = combat_round
+                combat.resolve_combat_round()
+
+        for i, combat in enumerate(combats):
+            with self.subTest(combat=i):
+                self.assertEqual(combat.attacker_fleet, batch.fleet_list(i, Side.ATTACKER))
+                self.assertEqual(combat.defender_fleet, batch.fleet_list(i, Side.DEFENDER))
+
+    def test_empty_batch(self):
+        """
+        Test a batch of fleets without ships
+        """
+        batch = CombatBatch.from_combats([
+            CombatStatus((MagicMock(), FleetList()), (MagicMock(), FleetList()))
+        ])
+        batch.resolve_round()
+
+        self.assertEqual(FleetList(), batch.fleet_list(0, Side.ATTACKER))
+
+    def test_carry_over_hits_every_adjacent_column(self):
+        """
+        Test carry over damage goes to every fleet column in the adjacent combat columns
+        """
+        attacker = FleetList.from_str('<C:MWWWW>BS30[1,0]|BS30[1,1]')
+        defender = FleetList.from_str('<C:MLLRW>C1[1,0]|F10[2,0]|F10[3,0]|F10[4,0]')
+
+        batch = CombatBatch.from_combats([
+            CombatStatus((MagicMock(), attacker), (MagicMock(), defender), CombatRound.RAIL_GUN)
+        ])
+        batch.resolve_round()
+
+        carry = 2 * ShipType.BATTLESHIP.attack - 1
+        expected = FleetList.from_str(
+            '<C:MLLRW>' + '|'.join(
+                f'F{10 - carry}[{column},0]' for column in [2, 3, 4] if carry < 10
+            )
+        )
+
+        self.assertEqual(expected, batch.fleet_list(0, Side.DEFENDER))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -36,6 +36,15 @@ class CombatColumnTestCase(unittest.TestCase):
             with self.subTest(passed=passed, expected=expected):
                 self.assertListEqual(CombatColumn.adjacent_columns(passed), expected)
 
+    def test_can_be_created_from_char(self):
+        """
+        Test converting to and back from a char
+        :return:
+        """
+        for column in CombatColumn:
+            with self.subTest(column=column):
+                self.assertEqual(column, CombatColumn.from_char(column.to_char()))
+
 
 if __name__ == '__main__':
     unittest.main()
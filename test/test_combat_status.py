@@ -1,11 +1,14 @@
 """
 Test combat status
 """
+import asyncio
 import unittest
-from unittest.mock import MagicMock
+import unittest.mock
+from unittest.mock import AsyncMock, MagicMock
 
-from bot_heard_round.combat_status import CombatStatus, CombatRound
+from bot_heard_round.combat_status import CombatStatus, CombatRound, CombatStep, Side
 from bot_heard_round.fleet import FleetList, FleetColumn, CombatColumn
+from bot_heard_round.members import MemberIndex
 from bot_heard_round.ship import Ship, ShipType
 
 
@@ -278,6 +281,63 @@ class TestCombatStatus(unittest.TestCase):
                 expected_defender_fleet, '\n'.join(message))
         )
 
+    def test_mirror_fleets_credit_the_right_side(self):
+        """
+        Test that when both fleets are equal each side is still named correctly
+        :return:
+        """
+        fleet_str = '<C:RMLWW>LC10[1,0]|LC10[1,1]|LC10[2,0]|LC10[3,0]'
+        combat = CombatStatus(
+            (MagicMock(), FleetList.from_str(fleet_str)),
+            (MagicMock(), FleetList.from_str(fleet_str)),
+            CombatRound.RAIL_GUN
+        )
+
+        self.assertEqual(combat.attacker_fleet, combat.defender_fleet)
+
+        messages = '\n'.join(combat.resolve_combat_round())
+
+        for combat_column in CombatColumn.active_columns():
+            with self.subTest(combat_column=combat_column):
+                self.assertEqual(
+                    1,
+                    messages.count(
+                        'PROCESSING {}\n'.format(combat_column.value)
+                    )
+                )
+
+        self.assertEqual(3, messages.count('Attacker deals `'), messages)
+        self.assertEqual(3, messages.count('damage to defender'), messages)
+        self.assertEqual(3, messages.count('Defender deals `'), messages)
+        self.assertEqual(3, messages.count('damage to attacker'), messages)
+        self.assertEqual(combat.attacker_fleet, combat.defender_fleet)
+
+    def test_set_fleet_for(self):
+        """
+        Test setting an already parsed fleet for each side
+        :return:
+        """
+        combat = CombatStatus((MagicMock(), FleetList()), (MagicMock(), FleetList()))
+        attacker_fleet = FleetList.from_str('F10[1,0]')
+        defender_fleet = FleetList.from_str('BS30[2,0]')
+
+        combat.set_fleet_for(True, attacker_fleet)
+        combat.set_fleet_for(False, defender_fleet)
+
+        self.assertIs(attacker_fleet, combat.attacker_fleet)
+        self.assertIs(defender_fleet, combat.defender_fleet)
+
+        combat.add_fleet_for(False, 'F10[1,0]')
+        self.assertEqual(attacker_fleet, combat.defender_fleet)
+
+    def test_side_opponent(self):
+        """
+        Test each side's opponent is the other side
+        :return:
+        """
+        self.assertEqual(Side.DEFENDER, Side.ATTACKER.opponent)
+        self.assertEqual(Side.ATTACKER, Side.DEFENDER.opponent)
+
     def test_string_representation(self):
         """
 
@@ -351,6 +411,273 @@ Ships: `Light Cruiser (1/15)`, `Light Cruiser (1/15)`
             str(combat_status)
         )
 
+    def test_string_representation_is_cached_until_fleet_changes(self):
+        """
+        Test the status is only re-rendered after something changes
+        """
+        attacker_fleet = FleetList.from_str('F10[1,0]|F10[1,1]')
+        attacker_fleet.columns[0].combat_column = CombatColumn.LEFT
+        defender_fleet = FleetList.from_str('LC15[1,0]')
+        defender_fleet.columns[0].combat_column = CombatColumn.LEFT
+
+        combat_status = CombatStatus(
+            (MagicMock(display_name='ATTACKER'), attacker_fleet),
+            (MagicMock(display_name='DEFENDER'), defender_fleet),
+            CombatRound.MISSILE_ONE
+        )
+
+        rendered = str(combat_status)
+
+        with unittest.mock.patch.object(combat_status, 'render_ship_grid') as render_ship_grid:
+            self.assertEqual(rendered, str(combat_status))
+            render_ship_grid.assert_not_called()
+
+        attacker_fleet.columns[0].take_damage(5)
+
+        self.assertNotEqual(rendered, str(combat_status))
+        self.assertIn('Frigate (5/10)', str(combat_status))
+
+    def test_infers_step_from_status(self):
+        """
+        Test the step to carry on from is worked out from the round and fleets
+        """
+        fleet = 'F10[1,0]'
+        cases = [
+            (CombatRound.PENDING, '', '', CombatStep.ATTACKER_FLEET),
+            (CombatRound.PENDING, fleet, '', CombatStep.DEFENDER_FLEET),
+            (CombatRound.PENDING, fleet, fleet, CombatStep.ROUND_START),
+            (CombatRound.MISSILE_TWO, fleet, fleet, CombatStep.ROUND_START),
+            (CombatRound.FINISHED, fleet, fleet, None),
+        ]
+
+        for combat_round, attacker_fleet, defender_fleet, expected in cases:
+            with self.subTest(combat_round=combat_round,
+                              attacker_fleet=attacker_fleet,
+                              defender_fleet=defender_fleet):
+                combat_status = CombatStatus(
+                    (MagicMock(), FleetList.from_str(attacker_fleet)),
+                    (MagicMock(), FleetList.from_str(defender_fleet)),
+                    combat_round
+                )
+
+                self.assertEqual(expected, combat_status.infer_step())
+
+
+class TestCombatStatusMessage(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for keeping the combat status message up to date
+    """
+
+    async def asyncSetUp(self) -> None:
+        """
+        Set up a combat with a sent message
+        """
+        self.channel = MagicMock()
+        self.channel.send = AsyncMock(return_value=MagicMock(edit=AsyncMock()))
+
+        self.combat_status = CombatStatus(
+            (MagicMock(display_name='ATTACKER', id=1), FleetList.from_str('F10[1,0]')),
+            (MagicMock(display_name='DEFENDER', id=2), FleetList.from_str('<P>F10[1,0]')),
+        )
+        self.combat_status.edit_delay = 0.01
+        await self.combat_status.send_message(self.channel)
+
+    def assert_edited_once(self):
+        """
+        Assert the message was edited once, to the current status and state
+        """
+        self.combat_status.message.edit.assert_awaited_once()
+        kwargs = self.combat_status.message.edit.await_args.kwargs
+
+        self.assertEqual(self.combat_status.message_content(), kwargs['content'])
+        self.assertEqual(self.combat_status.message_state(), kwargs['embed'].description)
+
+    async def test_updates_are_coalesced(self):
+        """
+        Test several updates close together only edit the message once
+        """
+        for combat_round in [CombatRound.MISSILE_ONE, CombatRound.MISSILE_TWO]:
+            self.combat_status.combat_round = combat_round
+            await self.combat_status.update_message()
+
+        await asyncio.sleep(0.05)
+
+        self.assert_edited_once()
+
+    async def test_unchanged_status_is_not_edited(self):
+        """
+        Test the message is not edited if nothing changed
+        """
+        await self.combat_status.update_message()
+        await asyncio.sleep(0.05)
+        await self.combat_status.flush_message()
+
+        self.combat_status.message.edit.assert_not_awaited()
+
+    async def test_flush_edits_straight_away(self):
+        """
+        Test flushing replaces a scheduled update with an immediate edit
+        """
+        self.combat_status.edit_delay = 60
+        self.combat_status.combat_round = CombatRound.FINISHED
+        await self.combat_status.update_message()
+        await self.combat_status.flush_message()
+
+        self.assert_edited_once()
+        self.assertIsNone(self.combat_status.pending_edit)
+
+    async def test_failed_update_is_reported(self):
+        """
+        Test an error from a scheduled edit is printed, as nothing waits on it
+        """
+        self.combat_status.message.edit.side_effect = RuntimeError('edit failed')
+        self.combat_status.combat_round = CombatRound.FINISHED
+
+        with unittest.mock.patch('builtins.print') as mock_print:
+            await self.combat_status.update_message()
+            await asyncio.sleep(0.05)
+
+        mock_print.assert_called_once_with('Could not update the combat status: edit failed')
+
+    async def test_from_message_uses_member_index(self):
+        """
+        Test rebuilding from a message looks players up in the index instead of fetching
+        """
+        guild = MagicMock()
+        guild.id = 1
+        guild.members = [self.combat_status.attacker, self.combat_status.defender]
+        for member in guild.members:
+            member.guild = guild
+
+        member_index = MemberIndex()
+        member_index.add_guild(guild)
+
+        message = MagicMock()
+        message.guild = guild
+        message.content = str(self.combat_status)
+
+        combat_status = await CombatStatus.from_message(message, member_index)
+
+        self.assertIs(self.combat_status.attacker, combat_status.attacker)
+        self.assertIs(self.combat_status.defender, combat_status.defender)
+        self.assertEqual(CombatRound.PENDING, combat_status.combat_round)
+        guild.fetch_members.assert_not_called()
+
+    async def test_pinned_message_without_footer(self):
+        """
+        Test a status from before the state was saved has no state to recover from, and is
+        still rebuilt with its message
+        """
+        members = [self.combat_status.attacker, self.combat_status.defender]
+        message = MagicMock()
+        message.guild.fetch_members.return_value.flatten = AsyncMock(return_value=members)
+        message.content = str(self.combat_status)
+        message.embeds = []
+
+        self.assertIsNone(CombatStatus.find_state(message))
+
+        combat_status = await CombatStatus.from_message(message)
+
+        self.assertIs(message, combat_status.message)
+        self.assertIs(self.combat_status.attacker, combat_status.attacker)
+
+    async def test_from_message_uses_state_footer(self):
+        """
+        Test the whole combat, including both fleets, is rebuilt from the state footer
+        """
+        self.combat_status.combat_round = CombatRound.MISSILE_TWO
+        self.combat_status.attacker_fleet.columns[0].combat_column = CombatColumn.MIDDLE
+        self.combat_status.defender_fleet.columns[0].take_damage(3)
+
+        members = {1: self.combat_status.attacker, 2: self.combat_status.defender}
+        message = MagicMock()
+        message.guild.get_member = members.get
+        message.content = self.combat_status.message_content()
+        message.embeds = [self.combat_status.state_embed(self.combat_status.message_state())]
+
+        combat_status = await CombatStatus.from_message(message)
+
+        self.assertIs(self.combat_status.attacker, combat_status.attacker)
+        self.assertIs(self.combat_status.defender, combat_status.defender)
+        self.assertEqual(CombatRound.MISSILE_TWO, combat_status.combat_round)
+        self.assertEqual(self.combat_status.attacker_fleet, combat_status.attacker_fleet)
+        self.assertEqual(self.combat_status.defender_fleet, combat_status.defender_fleet)
+        message.guild.fetch_members.assert_not_called()
+
+    async def test_large_fleets_fit_in_a_message(self):
+        """
+        Test the state of two fleets with 5 ships in each of 5 columns is kept out of the
+        message content, so the status stays under Discord's 2000 character limit
+        """
+        fleet_str = '<C:LMRWW>' + '|'.join(
+            f'{ship_type}{column}[{column},{position}]'
+            for column in range(1, 6)
+            for position, ship_type in enumerate(['BS', 'BC', 'HC', 'PDC', 'FRS'])
+        )
+        self.combat_status.attacker_fleet = FleetList.from_str(fleet_str)
+        self.combat_status.defender_fleet = FleetList.from_str(fleet_str)
+
+        await self.combat_status.flush_message()
+
+        kwargs = self.combat_status.message.edit.await_args.kwargs
+        self.assertLessEqual(len(kwargs['content']), 2000)
+        self.assertNotIn('`state v1', kwargs['content'])
+
+        members = {1: self.combat_status.attacker, 2: self.combat_status.defender}
+        message = MagicMock()
+        message.guild.get_member = members.get
+        message.content = kwargs['content']
+        message.embeds = [kwargs['embed']]
+
+        combat_status = await CombatStatus.from_message(message)
+
+        self.assertEqual(self.combat_status.attacker_fleet, combat_status.attacker_fleet)
+        self.assertEqual(self.combat_status.defender_fleet, combat_status.defender_fleet)
+
+    async def test_state_too_long_is_dropped(self):
+        """
+        Test a state too long for the embed is left out with a warning instead of failing
+        the edit
+        """
+        self.combat_status.attacker_fleet = FleetList.from_str('|'.join(
+            f'BS30[1,{position}]' for position in range(300)
+        ))
+
+        with unittest.mock.patch('builtins.print') as mock_print:
+            await self.combat_status.flush_message()
+
+        kwargs = self.combat_status.message.edit.await_args.kwargs
+        self.assertEqual(self.combat_status.message_content(), kwargs['content'])
+        self.assertIsNone(kwargs['embed'])
+        mock_print.assert_called_once()
+
+    async def test_recovers_from_state_pinned_after_resolving(self):
+        """
+        Test the state pinned as soon as a round is resolved already has the next round, so
+        picking the combat back up does not deal the round's damage a second time
+        """
+        self.combat_status.combat_round = CombatRound.MISSILE_ONE
+        self.combat_status.attacker_fleet = FleetList.from_str('<C:MWWWW>BS30[1,0]')
+        self.combat_status.defender_fleet = FleetList.from_str('<C:MWWWW>F10[1,0]|F10[1,1]')
+
+        self.combat_status.play_combat_round()
+        await self.combat_status.flush_message()
+
+        kwargs = self.combat_status.message.edit.await_args.kwargs
+        members = {1: self.combat_status.attacker, 2: self.combat_status.defender}
+        message = MagicMock()
+        message.guild.get_member = members.get
+        message.content = kwargs['content']
+        message.embeds = [kwargs['embed']]
+
+        combat_status = await CombatStatus.from_message(message)
+
+        self.assertEqual(CombatRound.MISSILE_TWO, combat_status.combat_round)
+        self.assertEqual(CombatStep.ROUND_START, combat_status.infer_step())
+        self.assertNotEqual(FleetList.from_str('<C:MWWWW>F10[1,0]|F10[1,1]'),
+                            combat_status.defender_fleet)
+        self.assertEqual(self.combat_status.defender_fleet, combat_status.defender_fleet)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the combat events and their renderer
+"""
+import random
+import unittest
+from types import SimpleNamespace
+
+from bot_heard_round import emoji
+from bot_heard_round.combat_status import CombatStatus, CombatRound, Side
+from bot_heard_round.events import ColumnResolved, ColumnStats, DamageDealt, ShipDestroyed, \
+    ShipDamaged, CarryOverQueued, CarryOverResolved, CarryOverDealt, render_combat_events
+from bot_heard_round.fleet import FleetList, CombatColumn
+from bot_heard_round.ship import Ship, ShipType
+from bot_heard_round.simulator import ROUNDS, deploy, random_deployment
+from test.fleets import random_fleet_str
+
+
+class TestEvents(unittest.TestCase):
+    """
+    Tests for the combat events
+    """
+
+    def test_render_combat_events(self):
+        """
+        Test each event renders as the message resolving a round has always written
+        """
+        ship = Ship(4, ShipType.FRIGATE)
+        events = [
+            ColumnResolved(CombatColumn.MIDDLE),
+            ColumnStats(Side.ATTACKER, 12, 3),
+            ColumnStats(Side.DEFENDER, 2, 5),
+            DamageDealt(Side.ATTACKER, 7),
+            ShipDestroyed(ship, 4),
+            CarryOverQueued(Side.ATTACKER, CombatColumn.MIDDLE, 3,
+                            [CombatColumn.LEFT, CombatColumn.RIGHT]),
+            CarryOverResolved(Side.ATTACKER, CombatColumn.MIDDLE, 3),
+            CarryOverDealt(Side.ATTACKER, CombatColumn.MIDDLE, 3),
+            ShipDamaged(ship, 10, 3),
+            CarryOverResolved(Side.ATTACKER, CombatColumn.MIDDLE, 3),
+        ]
+
+        self.assertEqual(
+            [
+                '\n'.join([
+                    'PROCESSING Middle',
+                    'Attacker <@1> has `12` attack and `3` defence',
+                    'Defender <@2> has `2` attack and `5` defence',
+                    'Attacker deals `7` damage to defender',
+                    f'{emoji.BOOM_EMOJI} Frigate (4/{ship.max_health}) is destroyed!',
+                    '3 CARRY OVER DAMAGE WILL HIT ADJACENT FLEETS',
+                    'Left will take 3 damage',
+                    'Right will take 3 damage',
+                ]),
+                '\n'.join([
+                    'Attacker deals 3 carry over damage to Middle',
+                    f'Frigate (10/{ship.max_health}) takes 3 damage',
+                ]),
+                '',
+            ],
+            render_combat_events(events, {Side.ATTACKER: '<@1>', Side.DEFENDER: '<@2>'})
+        )
+        self.assertEqual([], render_combat_events([], {}))
+
+    def test_kernel_does_not_need_players(self):
+        """
+        Test a round can be fought without anyone to mention, and gives the same fleets as
+        resolving it with the messages
+        """
+        rng = random.Random(3)
+
+        for _ in range(30):
+            attacker_str = random_fleet_str(rng)
+            defender_str = random_fleet_str(rng)
+            seed = rng.random()
+            results = []
+            events = []
+
+            for players in [(None, None), (SimpleNamespace(mention='<@1>'),
+                                           SimpleNamespace(mention='<@2>'))]:
+                deploy_rng = random.Random(seed)
+                attacker = FleetList.from_str(attacker_str)
+                defender = FleetList.from_str(defender_str)
+                deploy(attacker, random_deployment(attacker, deploy_rng))
+                deploy(defender, random_deployment(defender, deploy_rng))
+                combat = CombatStatus((players[0], attacker), (players[1], defender))
+
+                for combat_round in ROUNDS:
+                    combat.combat_round = combat_round
+                    if players[0] is None:
+                        combat.fight_combat_round(events)
+                    else:
+                        combat.resolve_combat_round()
+
+                results.append((attacker.to_str(), defender.to_str()))
+
+            with self.subTest(attacker=attacker_str, defender=defender_str):
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(9, sum(isinstance(x, ColumnResolved) for x in events))
+
+    def test_events_render_to_resolve_messages(self):
+        """
+        Test fighting a round then rendering the events writes the same messages as resolving
+        """
+        fleet_str = '<C:LMRWW>BS30[1,0]|F4[1,1]|LC10[2,0]|C1[3,0]|F10[4,0]'
+        players = (SimpleNamespace(mention='<@1>'), SimpleNamespace(mention='<@2>'))
+        fought = CombatStatus(
+            (players[0], FleetList.from_str(fleet_str)),
+            (players[1], FleetList.from_str('<C:RLMWW>' + fleet_str[9:])),
+            CombatRound.RAIL_GUN
+        )
+        resolved = CombatStatus(
+            (players[0], FleetList.from_str(fleet_str)),
+            (players[1], FleetList.from_str('<C:RLMWW>' + fleet_str[9:])),
+            CombatRound.RAIL_GUN
+        )
+        events = []
+
+        fought.fight_combat_round(events)
+
+        self.assertEqual(
+            resolved.resolve_combat_round(),
+            render_combat_events(events, {Side.ATTACKER: '<@1>', Side.DEFENDER: '<@2>'})
+        )
+        self.assertTrue(any(isinstance(x, CarryOverQueued) for x in events))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,10 @@ Unit tests for fleet column
 """
 
 import unittest
-from unittest.mock import MagicMock, create_autospec, PropertyMock
+from unittest.mock import MagicMock, create_autospec, patch
 
-from bot_heard_round.fleet import FleetColumn, FleetList
+from bot_heard_round.events import ShipDamaged, ShipDestroyed
+from bot_heard_round.fleet import FleetColumn, FleetList, CombatColumn
 from bot_heard_round.ship import Ship, ShipType
 
 
@@ -52,6 +53,42 @@ class FleetColumnTestCase(unittest.TestCase):
 
         self.assertListEqual([(ship_1, 1), (ship_2, 2)], self.fleet_column.ships)
 
+    def test_keeps_adding_order_for_same_position(self):
+        """
+        Test that ships at the same position stay in the order they were added
+        """
+        ships = [Ship(10, ShipType.FRIGATE) for _ in range(4)]
+
+        self.fleet_column.add_ship(ships[0], 1)
+        self.fleet_column.add_ship(ships[1], 0)
+        self.fleet_column.add_ship(ships[2], 1)
+        self.fleet_column.add_ship(ships[3], 0)
+
+        self.assertListEqual(
+            [(ships[1], 0), (ships[3], 0), (ships[0], 1), (ships[2], 1)],
+            self.fleet_column.ships
+        )
+
+    def test_can_add_many_ships(self):
+        """
+        Test adding ships in bulk orders them the same way as adding them one at a time
+        """
+        ships = [
+            (Ship(10, ShipType.FRIGATE), 3),
+            (Ship(30, ShipType.BATTLESHIP), 0),
+            (Ship(6, ShipType.CORVETTE), 3),
+            (Ship(10, ShipType.DESTROYER), 1),
+        ]
+        one_at_a_time = FleetColumn(1)
+
+        for ship, position in ships:
+            one_at_a_time.add_ship(ship, position)
+
+        self.fleet_column.add_ships(ships)
+
+        self.assertListEqual(one_at_a_time.ships, self.fleet_column.ships)
+        self.fleet_column.check_totals()
+
     def test_can_be_stringified(self):
         """
         Test that we can stringify a fleet column
@@ -210,21 +247,125 @@ class FleetColumnTestCase(unittest.TestCase):
                 self.assertEqual(base, expected)
                 self.assertEqual(carry_over, actual_carry)
 
+    def test_taking_damage_quietly(self):
+        """
+        Test quiet damage gives the carry over and number destroyed, and changes the column
+        the same way as normal damage
+        """
+        for damage, destroyed, carry_over in [(5, 0, 0), (10, 1, 0), (25, 2, 0), (40, 3, 5)]:
+            with self.subTest(damage=damage):
+                loud = FleetColumn(-1, ships=[
+                    (Ship(10, ShipType.FRIGATE), 0),
+                    (Ship(15, ShipType.FRIGATE), 1),
+                    (Ship(10, ShipType.FRIGATE), 2),
+                ])
+                quiet = FleetColumn(-1, ships=[
+                    (Ship(10, ShipType.FRIGATE), 0),
+                    (Ship(15, ShipType.FRIGATE), 1),
+                    (Ship(10, ShipType.FRIGATE), 2),
+                ])
+
+                loud_carry, messages = loud.take_damage(damage)
+
+                self.assertEqual((carry_over, destroyed), quiet.take_damage(damage, quiet=True))
+                self.assertEqual(loud_carry, carry_over)
+                self.assertEqual(destroyed, len([x for x in messages if 'destroyed' in x]))
+                self.assertEqual(loud, quiet)
+                quiet.check_totals()
+
+    def test_dealing_damage_reports_events(self):
+        """
+        Test dealing damage reports each ship hit with the health it had at the time
+        """
+        first = Ship(10, ShipType.FRIGATE)
+        second = Ship(15, ShipType.FRIGATE)
+        fleet_column = FleetColumn(-1, ships=[(first, 0), (second, 1)])
+        events = []
+
+        self.assertEqual((0, 1), fleet_column.deal_damage(14, events))
+        self.assertEqual(
+            [(ShipDestroyed, first, 10), (ShipDamaged, second, 15)],
+            [(type(x), x.ship, x.health) for x in events]
+        )
+        self.assertEqual(4, events[1].damage)
+        self.assertEqual(11, second.current_health)
+
+    def test_totals_follow_changes(self):
+        """
+        Test the attack and defence totals stay right as ships are added and destroyed
+        """
+        fleet_column = FleetColumn(1, ships=[(Ship(10, ShipType.FRIGATE), 0)])
+        fleet_column.check_totals()
+
+        fleet_column.add_ship(Ship(30, ShipType.BATTLESHIP), 1)
+        fleet_column.add_ship(Ship(6, ShipType.CORVETTE), 2)
+        fleet_column.check_totals()
+        self.assertEqual(
+            ShipType.FRIGATE.attack + ShipType.BATTLESHIP.attack + ShipType.CORVETTE.attack,
+            fleet_column.attack
+        )
+
+        fleet_column.take_damage(15)
+        fleet_column.check_totals()
+        self.assertEqual(
+            ShipType.BATTLESHIP.defence + ShipType.CORVETTE.defence,
+            fleet_column.defence
+        )
+
+        fleet_column.take_damage(100)
+        fleet_column.check_totals()
+        self.assertEqual((0, 0), (fleet_column.attack, fleet_column.defence))
+
+        fleet_column.ships = [(Ship(10, ShipType.FRIGATE), 0)]
+        fleet_column.check_totals()
+
+    def test_check_totals_finds_stale_totals(self):
+        """
+        Test the consistency check fails when the ships are changed behind the column's back
+        """
+        fleet_column = FleetColumn(1, ships=[(Ship(10, ShipType.FRIGATE), 0)])
+        fleet_column.ships.append((Ship(30, ShipType.BATTLESHIP), 1))
+
+        with self.assertRaises(ValueError):
+            fleet_column.check_totals()
+
+    def test_version_goes_up_on_change(self):
+        """
+        Test the version changes whenever the column or its ships change
+        """
+        fleet_column = FleetColumn(1, ships=[(Ship(10, ShipType.FRIGATE), 0)])
+        versions = [fleet_column.version]
+
+        fleet_column.add_ship(Ship(10, ShipType.FRIGATE), 1)
+        versions.append(fleet_column.version)
+
+        fleet_column.take_damage(5)
+        versions.append(fleet_column.version)
+
+        fleet_column.take_damage(5)
+        versions.append(fleet_column.version)
+
+        fleet_column.combat_column = CombatColumn.LEFT
+        versions.append(fleet_column.version)
+
+        self.assertListEqual(sorted(set(versions)), versions)
+
     def test_attack_defence_values(self):
         """
 
         :return:
         """
         for prop in ['attack', 'defence']:
-            proxy_val_two = MagicMock(ShipType)
-            property_mock = PropertyMock(return_value=2)
-            setattr(type(proxy_val_two), prop, property_mock)
-            ship_with_two = Ship(1, proxy_val_two)
-
-            proxy_val_two = MagicMock(ShipType)
-            property_mock = PropertyMock(return_value=1)
-            setattr(type(proxy_val_two), prop, property_mock)
-            ship_val_one = Ship(1, proxy_val_two)
+            type_with_two = MagicMock(ShipType)
+            type_with_one = MagicMock(ShipType)
+            stats = {
+                type_with_two: (10, 2, 0) if prop == 'attack' else (10, 0, 2),
+                type_with_one: (10, 1, 0) if prop == 'attack' else (10, 0, 1),
+            }
+
+            with patch.dict('bot_heard_round.ship.SHIP_STATS', stats):
+                ship_with_two = Ship(1, type_with_two)
+                ship_val_one = Ship(1, type_with_one)
 
             patrol_fleet_list = FleetList(patrol_mode=True)
 
@@ -33,6 +33,47 @@ class FleetListTest(unittest.TestCase):
 
         self.assertListEqual(columns, fleet.where_column(CombatColumn.WAITING))
 
+    def test_column_index_follows_swaps(self):
+        """
+        Test where_column and where_number stay right as columns are moved and swapped
+        :return:
+        """
+        fleet = FleetList.from_str('<C:LMRWW>F10[1,0]|F10[4,0]')
+        waiting = fleet.where_column(CombatColumn.WAITING)
+
+        self.assertIs(waiting, fleet.where_column(CombatColumn.WAITING))
+        self.assertIs(fleet.columns[3], fleet.where_number(4))
+
+        fleet.swap_columns(1, 4)
+
+        self.assertListEqual([fleet.columns[3]], fleet.where_column(CombatColumn.LEFT))
+        self.assertListEqual(
+            [fleet.columns[0], fleet.columns[4]],
+            fleet.where_column(CombatColumn.WAITING)
+        )
+        self.assertListEqual(
+            [fleet.columns[3], fleet.columns[4]],
+            waiting,
+            'Lists handed out before the swap are not changed'
+        )
+
+        for column in fleet.where_column(CombatColumn.WAITING):
+            column.combat_column = CombatColumn.RIGHT
+
+        self.assertListEqual([], fleet.where_column(CombatColumn.WAITING))
+        self.assertListEqual(
+            [fleet.columns[0], fleet.columns[2], fleet.columns[4]],
+            fleet.where_column(CombatColumn.RIGHT)
+        )
+
+    def test_where_number_with_missing_number(self):
+        """
+        Test asking for a column number that is not in the fleet
+        :return:
+        """
+        with self.assertRaises(IndexError):
+            FleetList().where_number(6)
+
     def test_from_str(self):
         """
         Test providing a string does the right thing
@@ -112,6 +153,105 @@ class FleetListTest(unittest.TestCase):
                 expected.columns[0].add_ship(Ship(10, member), 1)
                 self.assertEqual(expected, FleetList.from_str(f'{base_ship}[1,0]|{base_ship}[1,1]'))
 
+    def test_from_str_reports_every_bad_entry(self):
+        """
+        Test a fleet with bad entries lists all of them with where they start
+        """
+        fleet_str = 'F10[1,0]|XY3[1,1]|F10[7,0]|F10[1,0]x|BS|F10[1,1]'
+
+        with self.assertRaises(FleetList.ParseError) as context:
+            FleetList.from_str(fleet_str)
+
+        self.assertListEqual(
+            [
+                fleet_str.index('XY'),
+                fleet_str.index('F10[7'),
+                fleet_str.index('F10[1,0]x'),
+                fleet_str.index('BS'),
+            ],
+            [offset for offset, _ in context.exception.errors]
+        )
+        self.assertIsInstance(context.exception, ValueError)
+
+    def test_from_str_errors(self):
+        """
+        Test the different ways an entry can be malformed
+        """
+        test_cases = [
+            ('12[1,0]', 'expected a ship type at character 0'),
+            ('XY12[1,0]', '`XY` is not a ship type'),
+            ('F[1,0]', 'expected the health at character 1'),
+            ('F10(1,0)', 'expected `[` at character 3'),
+            ('F10[1;0]', 'expected `,` at character 5'),
+            ('F10[1,]', 'expected the position at character 6'),
+            ('F10[1,0', 'expected `]` at character 7'),
+            ('F10[0,0]', 'column 0 is not between 1 and 5'),
+            ('<C:LMX>F10[1,0]', 'combat columns should be'),
+        ]
+
+        for fleet_str, error in test_cases:
+            with self.subTest(fleet_str=fleet_str):
+                with self.assertRaises(FleetList.ParseError) as context:
+                    FleetList.from_str(fleet_str)
+
+                self.assertIn(error, str(context.exception))
+
+    def test_from_str_allows_whitespace_between_entries(self):
+        """
+        Test spaces and newlines around entries are skipped
+        """
+        self.assertEqual(
+            FleetList.from_str('F10[1,0]|F10[2,0]'),
+            FleetList.from_str(' F10[1,0] |\nF10[2,0]\n')
+        )
+
+    def test_looks_like_fleet_list(self):
+        """
+        Test the quick check for fleet lists
+        """
+        test_cases = [
+            ('F10[1,0]', True),
+            ('F10[1,0]|BS30[2,1]\n', True),
+            (' F10[1,0]', True),
+            ('<P>F10[1,0]', True),
+            ('<P><C:LMRWW>F10[1,0]', True),
+            ('BS30[1,0]|', True),
+            ('|BS30[1,0]', True),
+            ('BS30[1,0] |', True),
+            ('<P>| BS30[1,0]', True),
+            ('|', False),
+            ('', False),
+            ('<C:WWWWW>', False),
+            ('hello there', False),
+            ('Ready when you are [1]', True),
+            ('ok', False),
+        ]
+
+        for content, expected in test_cases:
+            with self.subTest(content=content):
+                self.assertEqual(expected, FleetList.looks_like_fleet_list(content))
+
+        for member in ShipType:
+            with self.subTest(ship_type=member):
+                self.assertTrue(
+                    FleetList.looks_like_fleet_list(f'{member.to_char()}10[1,0]')
+                )
+
+    def test_can_convert_to_str_and_back(self):
+        """
+        Test to_str keeps the combat columns and patrol mode through from_str
+        :return:
+        """
+        fleet = FleetList.from_str('<P>BS30[1,0]|F8[1,1]|LC15[2,0]|SS2[5,3]')
+        fleet.columns[1].combat_column = CombatColumn.RIGHT
+        fleet.columns[4].combat_column = CombatColumn.LEFT
+
+        self.assertEqual('<P><C:WRWWL>BS30[1,0]|F8[1,1]|LC15[2,0]|SS2[5,3]', fleet.to_str())
+        self.assertEqual(fleet, FleetList.from_str(fleet.to_str()))
+
+        fleet.patrol_mode = False
+        self.assertEqual(fleet, FleetList.from_str(fleet.to_str()))
+
     def test_can_ask_for_options_for_fleet_swap(self):
         """
         Test fleet swap
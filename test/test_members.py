@@ -0,0 +1,119 @@
+"""
+Tests for the member index
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from bot_heard_round.members import MemberIndex
+from bot_heard_round.utils import get_user_from_nick_or_name
+
+
+def make_member(member_id: int, display_name: str, guild_id: int = 1):
+    """
+    Make a fake guild member
+    """
+    member = MagicMock()
+    member.id = member_id
+    member.display_name = display_name
+    member.guild.id = guild_id
+
+    return member
+
+
+class MemberIndexTest(unittest.TestCase):
+    """
+    Tests for the member index
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up an index with one guild
+        """
+        self.guild = MagicMock()
+        self.guild.id = 1
+        self.alice = make_member(10, 'Alice')
+        self.bob = make_member(11, 'Bob')
+        self.guild.members = [self.alice, self.bob]
+
+        self.index = MemberIndex()
+        self.index.add_guild(self.guild)
+
+    def test_finds_members_by_display_name(self):
+        """
+        Test members can be found by display name
+        """
+        members = self.index.for_guild(self.guild)
+
+        self.assertIs(self.alice, get_user_from_nick_or_name('Alice', members))
+        self.assertIs(self.bob, get_user_from_nick_or_name('Bob', members))
+        self.assertIsNone(get_user_from_nick_or_name('Carol', members))
+
+    def test_follows_display_name_changes(self):
+        """
+        Test a member's old display name is forgotten when it changes
+        """
+        self.index.add(make_member(10, 'Alicia'))
+        members = self.index.for_guild(self.guild)
+
+        self.assertIsNone(members.get('Alice'))
+        self.assertEqual(10, members.get('Alicia').id)
+        self.assertEqual(2, len(members))
+
+    def test_joining_and_leaving(self):
+        """
+        Test members are added and removed
+        """
+        carol = make_member(12, 'Carol')
+        self.index.add(carol)
+        self.index.remove(self.alice)
+        members = self.index.for_guild(self.guild)
+
+        self.assertIs(carol, members.get('Carol'))
+        self.assertIsNone(members.get('Alice'))
+
+    def test_shared_display_names(self):
+        """
+        Test removing one member does not lose another with the same display name
+        """
+        other_bob = make_member(13, 'Bob')
+        self.index.add(other_bob)
+        self.index.remove(self.bob)
+
+        self.assertIs(other_bob, self.index.for_guild(self.guild).get('Bob'))
+
+    def test_follows_username_changes(self):
+        """
+        Test a member without a nickname is refiled in every guild when their username
+        changes, even though their cached member already has the new name
+        """
+        other_guild = MagicMock()
+        other_guild.id = 2
+        other_guild.members = [make_member(10, 'Alice', guild_id=2)]
+        self.index.add_guild(other_guild)
+
+        self.alice.display_name = 'Alicia'
+        other_guild.members[0].display_name = 'Alicia'
+        user = MagicMock()
+        user.id = 10
+
+        self.index.update_user(user)
+
+        for guild in [self.guild, other_guild]:
+            with self.subTest(guild=guild.id):
+                members = self.index.for_guild(guild)
+
+                self.assertIsNone(members.get('Alice'))
+                self.assertEqual(10, members.get('Alicia').id)
+
+        self.index.remove(self.alice)
+        self.assertIsNone(self.index.for_guild(self.guild).get('Alicia'))
+
+    def test_list_of_members_still_supported(self):
+        """
+        Test a plain list of members can still be searched
+        """
+        self.assertIs(self.bob, get_user_from_nick_or_name('Bob', [self.alice, self.bob]))
+
+
+if __name__ == '__main__':
+    unittest.main()
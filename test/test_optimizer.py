@@ -0,0 +1,121 @@
+"""
+Unit tests for the deployment optimizer
+"""
+import random
+import unittest
+
+from bot_heard_round.combat_status import CombatStatus, CombatRound
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.optimizer import DeploymentSolver, deployments, mirror, suggest
+from bot_heard_round.simulator import deploy, fleet_health
+from test.fleets import random_fleet_str
+
+
+class TestOptimizer(unittest.TestCase):
+    """
+    Tests for the deployment optimizer
+    """
+
+    def test_deployments(self):
+        """
+        Test every allowed deployment is listed once
+        """
+        test_cases = [
+            ('F10[1,0]|F10[2,0]|F10[3,0]|F10[4,0]|F10[5,0]', 60),
+            ('F10[1,0]|F10[2,0]|F10[3,0]', 6),
+            ('F10[1,0]|F10[4,0]', 6),
+            ('F10[5,0]', 3),
+            ('', 1),
+        ]
+
+        for fleet_str, count in test_cases:
+            with self.subTest(fleet_str=fleet_str):
+                options = deployments(FleetList.from_str(fleet_str))
+
+                self.assertEqual(count, len(options))
+                self.assertEqual(count, len(set(options)))
+
+    def test_score_matches_resolve_combat_round(self):
+        """
+        Test the solver plays out deployments the same way as resolving the combat
+        """
+        rng = random.Random(1)
+
+        for _ in range(40):
+            attacker_str = random_fleet_str(rng, max_ships=20, patrol_chance=0.2)
+            defender_str = random_fleet_str(rng, max_ships=20, patrol_chance=0.2)
+            solver = DeploymentSolver(
+                FleetList.from_str(attacker_str),
+                FleetList.from_str(defender_str)
+            )
+
+            attacker_deployment = rng.choice(deployments(solver.fleets[0]))
+            defender_deployment = rng.choice(deployments(solver.fleets[1]))
+
+            attacker = FleetList.from_str(attacker_str)
+            defender = FleetList.from_str(defender_str)
+            deploy(attacker, attacker_deployment)
+            deploy(defender, defender_deployment)
+            start = fleet_health(defender) - fleet_health(attacker)
+
+            combat = CombatStatus((None, attacker), (None, defender))
+            for combat_round in [CombatRound.MISSILE_ONE, CombatRound.MISSILE_TWO,
+                                 CombatRound.RAIL_GUN]:
+                combat.combat_round = combat_round
+                combat.resolve_combat_round(quiet=True)
+
+            with self.subTest(attacker=attacker_str, defender=defender_str):
+                self.assertEqual(
+                    start - (fleet_health(defender) - fleet_health(attacker)),
+                    solver.score(attacker_deployment, defender_deployment)
+                )
+                self.assertEqual(
+                    solver.score(attacker_deployment, defender_deployment),
+                    DeploymentSolver(solver.fleets[0], solver.fleets[1]).score(
+                        mirror(attacker_deployment),
+                        mirror(defender_deployment)
+                    )
+                )
+
+    def test_suggest_is_minimax(self):
+        """
+        Test the suggested deployments have the best worst case
+        """
+        rng = random.Random(2)
+        attacker = FleetList.from_str(random_fleet_str(rng, max_ships=20, patrol_chance=0.2))
+        defender = FleetList.from_str(random_fleet_str(rng, max_ships=20, patrol_chance=0.2))
+
+        suggestion = suggest(attacker, defender)
+        solver = DeploymentSolver(attacker, defender)
+        attacker_options = deployments(attacker)
+        defender_options = deployments(defender)
+
+        self.assertEqual(
+            max(min(solver.score(a, d) for d in defender_options) for a in attacker_options),
+            suggestion.attacker_value
+        )
+        self.assertEqual(
+            suggestion.attacker_value,
+            min(solver.score(suggestion.attacker, d) for d in defender_options)
+        )
+        self.assertEqual(
+            min(max(solver.score(a, d) for a in attacker_options) for d in defender_options),
+            suggestion.defender_value
+        )
+        self.assertIn('Attacker should deploy', str(suggestion))
+
+    def test_stronger_column_goes_against_weaker(self):
+        """
+        Test an obvious case, where only one placement lets the attacker's battleships through
+        """
+        attacker = FleetList.from_str('BS30[1,0]|BS30[1,1]|BS30[1,2]')
+        defender = FleetList.from_str('BS30[1,0]|BS30[1,1]|BS30[1,2]|C1[2,0]|C1[3,0]')
+
+        suggestion = suggest(attacker, defender)
+
+        self.assertEqual(1, sum(1 for x in suggestion.attacker if x))
+        self.assertEqual(3, sum(1 for x in suggestion.defender if x))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for the packed fleet column
+"""
+import random
+import unittest
+
+from bot_heard_round.fleet import FleetColumn, FleetList, PackedFleetColumn, CombatColumn
+from bot_heard_round.ship import Ship, ShipType
+
+
+class PackedFleetColumnTestCase(unittest.TestCase):
+    """
+    Tests for the packed fleet column
+    """
+
+    def test_can_pack_and_unpack(self):
+        """
+        Test a fleet column survives being packed
+        """
+        fleet_column = FleetColumn(2, CombatColumn.LEFT, ships=[
+            (Ship(30, ShipType.BATTLESHIP), 0),
+            (Ship(4, ShipType.FRIGATE), 1),
+        ])
+
+        packed = PackedFleetColumn.from_column(fleet_column)
+
+        self.assertEqual(2, len(packed))
+        self.assertEqual(fleet_column, packed.to_column())
+        self.assertEqual(fleet_column.attack, packed.attack)
+        self.assertEqual(fleet_column.defence, packed.defence)
+
+    def test_matches_fleet_column(self):
+        """
+        Test attack, defence and damage match a normal fleet column
+        """
+        generator = random.Random(1)
+        ship_types = list(ShipType)
+
+        for case in range(100):
+            fleet_column = FleetColumn(1, ships=[
+                (Ship(generator.randint(1, 30), generator.choice(ship_types)), position)
+                for position in range(generator.randint(0, 10))
+            ])
+            FleetList((fleet_column,), patrol_mode=generator.random() < 0.5)
+            packed = PackedFleetColumn.from_column(fleet_column)
+
+            with self.subTest(case=case):
+                self.assertEqual(fleet_column.patrol_mode, packed.patrol_mode)
+
+                for damage in [generator.randint(0, 60) for _ in range(3)]:
+                    carry_over, _ = fleet_column.take_damage(damage)
+
+                    self.assertEqual(carry_over, packed.take_damage(damage)[0])
+                    self.assertEqual(fleet_column.attack, packed.attack)
+                    self.assertEqual(fleet_column.defence, packed.defence)
+                    self.assertListEqual(
+                        [ship.current_health for ship, _ in fleet_column.ships],
+                        list(packed.health)
+                    )
+
+    def test_counts_destroyed_ships(self):
+        """
+        Test taking damage reports the ships destroyed
+        """
+        packed = PackedFleetColumn(1)
+        packed.add_ship(ShipType.FRIGATE, 10)
+        packed.add_ship(ShipType.FRIGATE, 10)
+
+        self.assertEqual((5, 2), packed.take_damage(25))
+        self.assertEqual(0, len(packed))
+        self.assertEqual(0, packed.attack)
+
+
+if __name__ == '__main__':
+    unittest.main()
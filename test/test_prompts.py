@@ -0,0 +1,147 @@
+"""
+Tests for the prompt router
+"""
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+
+from bot_heard_round.prompts import PromptRouter, ReactionSeeder
+
+
+def make_payload(message_id: int, user_id: int, emoji_name: str):
+    """
+    Make a fake raw reaction event
+    """
+    payload = MagicMock()
+    payload.message_id = message_id
+    payload.user_id = user_id
+    payload.emoji.name = emoji_name
+
+    return payload
+
+
+class PromptRouterTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for the prompt router
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up a router, a message and a user
+        """
+        self.router = PromptRouter()
+        self.message = MagicMock()
+        self.message.id = 100
+        self.user = MagicMock()
+        self.user.id = 1
+
+    async def test_reaction_answers_prompt(self):
+        """
+        Test a matching reaction resolves the waiting prompt
+        """
+        waiting = asyncio.ensure_future(self.router.wait_for(self.message, self.user, ['A', 'B']))
+        await asyncio.sleep(0)
+
+        self.assertTrue(self.router.dispatch(make_payload(100, 1, 'B')))
+        self.assertEqual('B', await waiting)
+        self.assertEqual(0, len(self.router))
+
+    async def test_ignores_other_reactions(self):
+        """
+        Test reactions from the wrong user, message or emoji are ignored
+        """
+        waiting = asyncio.ensure_future(self.router.wait_for(self.message, self.user, ['A']))
+        await asyncio.sleep(0)
+
+        for payload in [make_payload(101, 1, 'A'),
+                        make_payload(100, 2, 'A'),
+                        make_payload(100, 1, 'C')]:
+            with self.subTest(message_id=payload.message_id,
+                              user_id=payload.user_id,
+                              emoji=payload.emoji.name):
+                self.assertFalse(self.router.dispatch(payload))
+
+        self.assertFalse(waiting.done())
+        waiting.cancel()
+
+    async def test_two_users_can_wait_on_one_message(self):
+        """
+        Test both players can answer the same prompt message
+        """
+        other_user = MagicMock()
+        other_user.id = 2
+
+        first = asyncio.ensure_future(self.router.wait_for(self.message, self.user, ['A', 'B']))
+        second = asyncio.ensure_future(self.router.wait_for(self.message, other_user, ['A', 'B']))
+        await asyncio.sleep(0)
+
+        self.router.dispatch(make_payload(100, 2, 'A'))
+        self.router.dispatch(make_payload(100, 1, 'B'))
+
+        self.assertEqual(['B', 'A'], list(await asyncio.gather(first, second)))
+
+    async def test_timeout_returns_default(self):
+        """
+        Test the default answer is used if the user does not react in time
+        """
+        react = await self.router.wait_for(self.message, self.user, ['A', 'B'], 0.01, 'B')
+
+        self.assertEqual('B', react)
+        self.assertEqual(0, len(self.router))
+
+    async def test_cancelled_prompt_is_removed(self):
+        """
+        Test a prompt is cleaned up if the combat stops waiting on it
+        """
+        waiting = asyncio.ensure_future(self.router.wait_for(self.message, self.user, ['A']))
+        await asyncio.sleep(0)
+        waiting.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+
+        self.assertEqual(0, len(self.router))
+
+
+class ReactionSeederTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for the reaction seeder
+    """
+
+    async def test_adds_every_reaction_with_bounded_concurrency(self):
+        """
+        Test all the reactions are added, but never more than the limit at once per channel
+        """
+        in_flight = 0
+        most_in_flight = 0
+        added = []
+
+        async def add_reaction(emoji_to_add):
+            nonlocal in_flight, most_in_flight
+            in_flight += 1
+            most_in_flight = max(most_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            added.append(emoji_to_add)
+            in_flight -= 1
+
+        first = MagicMock()
+        first.channel.id = 1
+        first.add_reaction = add_reaction
+        second = MagicMock()
+        second.channel.id = 1
+        second.add_reaction = add_reaction
+
+        seeder = ReactionSeeder(concurrency=2)
+
+        await asyncio.gather(
+            seeder.seed(first, ['A', 'B', 'C']),
+            seeder.seed(second, ['D', 'E'])
+        )
+
+        self.assertCountEqual(['A', 'B', 'C', 'D', 'E'], added)
+        self.assertEqual(2, most_in_flight)
+        self.assertDictEqual({}, seeder.semaphores)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for splitting shards between workers
+"""
+import random
+import unittest
+
+from bot_heard_round.sharding import ShardSet, assign_shards, parse_shard_ids, \
+    shard_for_guild, simulate_assignment, worker_environments
+
+
+class ShardingTestCase(unittest.TestCase):
+    """
+    Tests for splitting shards between workers
+    """
+
+    def test_shard_for_guild(self):
+        """
+        Test guilds go to the shard Discord sends their events to
+        """
+        self.assertEqual(0, shard_for_guild(81384788765712384, 1))
+        self.assertEqual(2, shard_for_guild(81384788765712384, 4))
+        self.assertEqual((175928847299117063 >> 22) % 7, shard_for_guild(175928847299117063, 7))
+
+    def test_assign_shards(self):
+        """
+        Test every shard goes to exactly one worker, and the workers are balanced
+        """
+        for shard_count in range(1, 20):
+            for worker_count in range(1, shard_count + 1):
+                with self.subTest(shard_count=shard_count, worker_count=worker_count):
+                    assignment = assign_shards(shard_count, worker_count)
+                    sizes = [len(x) for x in assignment]
+
+                    self.assertEqual(worker_count, len(assignment))
+                    self.assertEqual(list(range(shard_count)), sorted(sum(assignment, [])))
+                    self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+        for shard_count, worker_count in [(0, 1), (2, 0), (2, 3)]:
+            with self.subTest(shard_count=shard_count, worker_count=worker_count):
+                with self.assertRaises(ValueError):
+                    assign_shards(shard_count, worker_count)
+
+    def test_shard_set_from_env(self):
+        """
+        Test reading the shards from the environment
+        """
+        self.assertFalse(ShardSet.from_env({}).sharded)
+        self.assertTrue(ShardSet.from_env({}).owns_guild(81384788765712384))
+
+        shard_set = ShardSet.from_env({'SHARD_COUNT': '4', 'SHARD_IDS': '1, 3'})
+
+        self.assertTrue(shard_set.sharded)
+        self.assertEqual(4, shard_set.shard_count)
+        self.assertEqual([1, 3], shard_set.shard_ids)
+        self.assertFalse(shard_set.owns_guild(81384788765712384))
+
+        self.assertIsNone(ShardSet.from_env({'SHARD_COUNT': '4'}).shard_ids)
+        self.assertEqual([0, 2], parse_shard_ids('0,2,'))
+
+        for environ in [{'SHARD_COUNT': '4', 'SHARD_IDS': '4'},
+                        {'SHARD_COUNT': '4', 'SHARD_IDS': 'one'},
+                        {'SHARD_COUNT': 'four'}]:
+            with self.subTest(environ=environ):
+                with self.assertRaises(ValueError):
+                    ShardSet.from_env(environ)
+
+    def test_worker_environments(self):
+        """
+        Test each worker keeps the launcher's environment and gets its own shards
+        """
+        environments = worker_environments({'DISCORD_TOKEN': 'token'}, 5, 2)
+
+        self.assertEqual(
+            [
+                {'DISCORD_TOKEN': 'token', 'SHARD_COUNT': '5', 'SHARD_IDS': '0,2,4'},
+                {'DISCORD_TOKEN': 'token', 'SHARD_COUNT': '5', 'SHARD_IDS': '1,3'},
+            ],
+            environments
+        )
+
+    def test_every_guild_has_one_worker(self):
+        """
+        Simulate assigning many guilds, and check each one is run by exactly one worker, the
+        one with the guild's shard
+        """
+        rng = random.Random(1)
+        guild_ids = [rng.getrandbits(63) for _ in range(1000)]
+
+        for shard_count, worker_count in [(1, 1), (4, 2), (10, 3), (16, 16)]:
+            with self.subTest(shard_count=shard_count, worker_count=worker_count):
+                owners = simulate_assignment(guild_ids, shard_count, worker_count)
+                shards = assign_shards(shard_count, worker_count)
+
+                self.assertEqual(sorted(guild_ids), sorted(sum(owners.values(), [])))
+
+                for worker, owned in owners.items():
+                    for guild_id in owned:
+                        self.assertIn(shard_for_guild(guild_id, shard_count), shards[worker])
+
+
+if __name__ == '__main__':
+    unittest.main()
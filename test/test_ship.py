@@ -3,7 +3,7 @@ Unit tests for the Ship class
 """
 
 import unittest
-from unittest.mock import MagicMock, PropertyMock
+from unittest.mock import MagicMock, patch
 
 from bot_heard_round.ship import ShipType, Ship
 
@@ -27,22 +27,31 @@ class TestShip(unittest.TestCase):
                         Ship.from_str(str(expected))
                     )
 
-    def test_proxies_to_ship_type(self):
+    def test_takes_stats_from_ship_type(self):
         """
-        Test that we proxy the properties to the ship type
+        Test that the ship takes its stats from its type's entry in SHIP_STATS
         :return:
         """
-        props = ['max_health', 'attack', 'defence']
-        for prop in props:
-            with self.subTest(prop=prop):
-                proxy = MagicMock(ShipType)
-                property_mock = PropertyMock(return_value='MOCKED_VALUE')
-                setattr(type(proxy), prop, property_mock)
-                expected = Ship(1, proxy)
+        ship_type = MagicMock(ShipType)
 
-                self.assertEqual(getattr(expected, prop), 'MOCKED_VALUE')
+        with patch.dict('bot_heard_round.ship.SHIP_STATS', {ship_type: (5, 6, 7)}):
+            ship = Ship(1, ship_type)
 
-                property_mock.assert_called_once_with()
+        self.assertEqual((5, 6, 7), (ship.max_health, ship.attack, ship.defence))
+
+    def test_is_slotted_with_type_stats(self):
+        """
+        Test ships have no instance dict and carry their type's stats
+        :return:
+        """
+        for ship_type in ShipType:
+            with self.subTest(ship_type=ship_type):
+                ship = Ship(1, ship_type)
+
+                self.assertFalse(hasattr(ship, '__dict__'))
+                self.assertEqual(ship_type.max_health, ship.max_health)
+                self.assertEqual(ship_type.attack, ship.attack)
+                self.assertEqual(ship_type.defence, ship.defence)
 
 
 if __name__ == '__main__':
@@ -58,6 +58,36 @@ class TestShipType(unittest.TestCase):
             with self.subTest(ship_type=member):
                 self.assertEqual(SHIP_DEFENCES[member], member.defence)
 
+    def test_parse_char(self):
+        """
+        Test we can read the char from the start of a fleet-list entry
+        :return:
+        """
+        for member in ShipType:
+            with self.subTest(ship_type=member):
+                entry = f'{member.to_char()}12[1,0]'
+                self.assertEqual(
+                    (member, len(member.to_char())),
+                    ShipType.parse_char(entry)
+                )
+
+    def test_parse_char_from_offset(self):
+        """
+        Test we can read a char from part way through a string
+        :return:
+        """
+        self.assertEqual((ShipType.SURVEY_SHIP, 7), ShipType.parse_char('BS30|SS4', 5))
+
+    def test_parse_char_rejects_unknown_chars(self):
+        """
+        Test unknown chars raise a ValueError
+        :return:
+        """
+        for entry in ['XY12[1,0]', '12[1,0]', 'BSS12[1,0]', '']:
+            with self.subTest(entry=entry):
+                with self.assertRaises(ValueError):
+                    ShipType.parse_char(entry)
+
 
 if __name__ == '__main__':
     unittest.main()
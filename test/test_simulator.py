@@ -0,0 +1,133 @@
+"""
+Unit tests for the combat simulator
+"""
+import random
+import unittest
+
+from bot_heard_round.combat_status import Side
+from bot_heard_round.fleet import FleetList
+from bot_heard_round.simulator import simulate, random_deployment, deployment_to_str, \
+    RetreatPolicy, simulation_pool
+
+ATTACKER = '<C:WWWWW>BS30[1,0]|F10[2,0]|F10[2,1]|LC15[3,0]|C6[4,0]'
+DEFENDER = 'BC20[1,0]|BC20[2,0]|HC20[3,0]|D8[4,0]|D8[5,0]'
+
+
+class TestSimulator(unittest.TestCase):
+    """
+    Tests for the combat simulator
+    """
+
+    def test_same_seed_gives_same_result(self):
+        """
+        Test simulations can be repeated
+        """
+        first = simulate(ATTACKER, DEFENDER, trials=200, workers=1, seed=5)
+        second = simulate(ATTACKER, DEFENDER, trials=200, workers=1, seed=5)
+
+        self.assertEqual(str(first), str(second))
+        self.assertEqual(200, first.trials)
+        self.assertEqual(
+            200,
+            first.wins[Side.ATTACKER] + first.wins[Side.DEFENDER] + first.draws
+        )
+
+    def test_splits_trials_across_processes(self):
+        """
+        Test every trial is counted when the simulation is split across processes
+        """
+        result = simulate(ATTACKER, DEFENDER, trials=51, workers=2, seed=1)
+
+        self.assertEqual(51, result.trials)
+        self.assertEqual(
+            51,
+            sum(
+                totals[0] for (side, kind, _), totals in result.choices.items()
+                if side == Side.ATTACKER and kind == 'patrol'
+            )
+        )
+
+    def test_shared_pool(self):
+        """
+        Test simulations can share a pool, and get the same result as with their own pool
+        """
+        expected = simulate(ATTACKER, DEFENDER, trials=40, workers=2, seed=3)
+
+        with simulation_pool(2) as pool:
+            for _ in range(2):
+                actual = simulate(ATTACKER, DEFENDER, trials=40, workers=2, seed=3, pool=pool)
+
+                self.assertEqual(40, actual.trials)
+                self.assertEqual(expected.wins, actual.wins)
+                self.assertEqual(expected.choices, actual.choices)
+
+    def test_stronger_fleet_always_wins(self):
+        """
+        Test a fleet that destroys everything in the first round wins every combat
+        """
+        battleships = '|'.join(
+            f'BS30[{column},{position}]' for column in range(1, 6) for position in range(5)
+        )
+        result = simulate(
+            battleships,
+            'C6[1,0]|C6[2,0]|C6[3,0]',
+            trials=100,
+            patrol_options=(False,),
+            retreat_options=(RetreatPolicy.NEVER,),
+            workers=1,
+            seed=1
+        )
+
+        self.assertEqual(1.0, result.win_rate(Side.ATTACKER))
+        self.assertEqual(0.0, result.expected_health(Side.DEFENDER))
+        self.assertEqual(25 * 30, result.expected_health(Side.ATTACKER))
+
+    def test_random_deployment(self):
+        """
+        Test random deployments only use fleet columns with ships, as many as possible
+        """
+        rng = random.Random(1)
+
+        for fleet_str, deployed in [
+            ('F10[1,0]|F10[2,0]|F10[3,0]|F10[4,0]|F10[5,0]', 3),
+            ('F10[2,0]|F10[5,0]', 2),
+            ('', 0),
+        ]:
+            for _ in range(20):
+                with self.subTest(fleet_str=fleet_str):
+                    fleet = FleetList.from_str(fleet_str)
+                    deployment = random_deployment(fleet, rng)
+                    used = [x for x in deployment if x]
+
+                    self.assertEqual(deployed, len(used))
+                    self.assertEqual(len(used), len(set(used)))
+
+                    for column_number in used:
+                        self.assertTrue(fleet.where_number(column_number).ships)
+
+    def test_deployment_to_str(self):
+        """
+        Test describing a deployment
+        """
+        self.assertEqual('L1 M- R3', deployment_to_str((1, 0, 3)))
+
+    def test_retreat_policies(self):
+        """
+        Test when each retreat policy retreats
+        """
+        rng = random.Random(1)
+
+        self.assertFalse(RetreatPolicy.NEVER.retreats(1, 100, rng))
+        self.assertTrue(RetreatPolicy.WHEN_BEHIND.retreats(1, 100, rng))
+        self.assertFalse(RetreatPolicy.WHEN_BEHIND.retreats(100, 100, rng))
+
+    def test_bad_fleet(self):
+        """
+        Test a malformed fleet is rejected before simulating
+        """
+        with self.assertRaises(FleetList.ParseError):
+            simulate('XY10[1,0]', DEFENDER, trials=10, workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
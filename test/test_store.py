@@ -0,0 +1,105 @@
+"""
+Tests for the combat store
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from bot_heard_round.combat_status import CombatStatus, CombatRound, CombatStep
+from bot_heard_round.fleet import FleetList, CombatColumn
+from bot_heard_round.store import CombatCheckpoint, CombatStore, SqliteCombatStore
+
+
+class SqliteCombatStoreTest(unittest.TestCase):
+    """
+    Tests for the SQLite combat store
+    """
+
+    def setUp(self) -> None:
+        """
+        Set up an in memory store and a combat to save
+        """
+        self.store = SqliteCombatStore(':memory:')
+
+        attacker_fleet = FleetList.from_str('<P>BS30[1,0]|F8[1,1]|LC15[2,0]')
+        attacker_fleet.columns[0].combat_column = CombatColumn.LEFT
+
+        self.attacker = MagicMock()
+        self.attacker.id = 1
+        self.defender = MagicMock()
+        self.defender.id = 2
+
+        message = MagicMock()
+        message.id = 30
+        message.channel.id = 10
+        message.channel.guild.id = 20
+
+        self.combat_status = CombatStatus(
+            (self.attacker, attacker_fleet),
+            (self.defender, FleetList.from_str('D8[3,0]')),
+            combat_round=CombatRound.MISSILE_TWO,
+            message=message
+        )
+
+    def test_can_save_and_load_checkpoint(self):
+        """
+        Test a saved checkpoint comes back with the same combat
+        """
+        self.store.save(
+            CombatCheckpoint.from_combat(self.combat_status, CombatStep.DEPLOY, 3, True)
+        )
+
+        [loaded] = self.store.load_active()
+
+        self.assertEqual(10, loaded.channel_id)
+        self.assertEqual(20, loaded.guild_id)
+        self.assertEqual(30, loaded.message_id)
+        self.assertEqual(1, loaded.attacker_id)
+        self.assertEqual(2, loaded.defender_id)
+        self.assertEqual(CombatStep.DEPLOY, loaded.step)
+        self.assertEqual(3, loaded.step_index)
+        self.assertTrue(loaded.retreated)
+
+        restored = loaded.restore(self.attacker, self.defender)
+
+        self.assertEqual(CombatRound.MISSILE_TWO, restored.combat_round)
+        self.assertEqual(self.combat_status.attacker_fleet, restored.attacker_fleet)
+        self.assertEqual(self.combat_status.defender_fleet, restored.defender_fleet)
+
+    def test_saving_replaces_previous_checkpoint(self):
+        """
+        Test only the latest checkpoint for a combat is kept
+        """
+        self.store.save(CombatCheckpoint.from_combat(self.combat_status, CombatStep.ROUND_START))
+        self.store.save(CombatCheckpoint.from_combat(self.combat_status, CombatStep.RESOLVE))
+
+        [loaded] = self.store.load_active()
+
+        self.assertEqual(CombatStep.RESOLVE, loaded.step)
+
+    def test_deleted_combats_are_not_loaded(self):
+        """
+        Test finished combats are forgotten
+        """
+        self.store.save(CombatCheckpoint.from_combat(self.combat_status, CombatStep.ROUND_START))
+        self.store.delete(10)
+
+        self.assertListEqual([], self.store.load_active())
+
+    def test_unfinished_store_cannot_be_created(self):
+        """
+        Test a store missing any of the methods fails when it is created
+        """
+        class HalfFinishedStore(CombatStore):
+            """
+            Store that only saves
+            """
+
+            def save(self, checkpoint: CombatCheckpoint):
+                pass
+
+        with self.assertRaises(TypeError):
+            HalfFinishedStore()
+
+
+if __name__ == '__main__':
+    unittest.main()
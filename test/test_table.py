@@ -0,0 +1,68 @@
+"""
+Tests for the ship table renderer
+"""
+import random
+import unittest
+
+from bot_heard_round.ship import Ship, ShipType
+from bot_heard_round.table import render_table
+
+try:
+    import tabulate
+except ImportError:
+    tabulate = None
+
+
+class RenderTableTest(unittest.TestCase):
+    """
+    Tests for rendering the ship table
+    """
+
+    def test_renders_centred_github_table(self):
+        """
+        Test the table is centred and padded to the widest cell or header
+        """
+        self.assertEqual(
+            '|  Left   |  Middle  |  Right  |\n'
+            '|---------|----------|---------|\n'
+            '|   ab    |          |  -----  |\n'
+            '| abcdefg |    x     |         |',
+            render_table(['Left', 'Middle', 'Right'], [['ab', '', '-----'], ['abcdefg', 'x', '']])
+        )
+
+    @unittest.skipIf(tabulate is None, 'tabulate is not installed')
+    def test_matches_tabulate(self):
+        """
+        Test the output is identical to tabulate for random ship tables
+        """
+        generator = random.Random(1)
+        ship_types = list(ShipType)
+        headers = ['Left', 'Middle', 'Right']
+
+        for case in range(200):
+            rows = [
+                [
+                    generator.choice([
+                        '',
+                        '-----',
+                        str(Ship(generator.randint(1, 30), generator.choice(ship_types)))
+                    ])
+                    for _ in headers
+                ]
+                for _ in range(generator.randint(1, 8))
+            ]
+
+            with self.subTest(case=case):
+                self.assertEqual(
+                    tabulate.tabulate(
+                        [dict(zip(headers, row)) for row in rows],
+                        headers={header: header for header in headers},
+                        tablefmt='github',
+                        stralign='center'
+                    ),
+                    render_table(headers, rows)
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
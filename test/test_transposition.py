@@ -0,0 +1,150 @@
+"""
+Unit tests for the transposition table
+"""
+import random
+import unittest
+
+from bot_heard_round.combat_status import CombatStatus
+from bot_heard_round.fleet import FleetColumn, FleetList
+from bot_heard_round.ship import Ship, ShipType
+from bot_heard_round.simulator import ROUNDS, deploy, random_deployment
+from bot_heard_round.transposition import TranspositionTable, fight_combat_round, \
+    resolve_columns
+from test.fleets import random_fleet_str
+
+
+class TranspositionTableTestCase(unittest.TestCase):
+    """
+    Tests for the transposition table
+    """
+
+    def test_column_key(self):
+        """
+        Test the key follows the stats, the ships' health in position order and patrol mode
+        """
+        fleet = FleetList.from_str('BS30[1,0]|F4[1,1]')
+        column = fleet.where_number(1)
+
+        self.assertEqual(FleetList.from_str('BS30[1,0]|F4[1,1]').where_number(1).transposition_key,
+                         column.transposition_key)
+        self.assertNotEqual(FleetList.from_str('F4[1,0]|BS30[1,1]').where_number(1)
+                            .transposition_key, column.transposition_key)
+        self.assertNotEqual(FleetList.from_str('BS29[1,0]|F4[1,1]').where_number(1)
+                            .transposition_key, column.transposition_key)
+        self.assertNotEqual(FleetList.from_str('<P>BS30[1,0]|F4[1,1]').where_number(1)
+                            .transposition_key, column.transposition_key)
+        self.assertEqual((0, 0, (), False), FleetColumn(-1).transposition_key)
+
+    def test_outcome_matches_take_damage(self):
+        """
+        Test applying an outcome leaves the columns the same as taking the damage
+        """
+        rng = random.Random(1)
+
+        for _ in range(200):
+            ship_types = rng.choices(list(ShipType), k=rng.randint(0, 6))
+            ships = [
+                (ship_type, rng.randint(1, ship_type.max_health)) for ship_type in ship_types
+            ]
+            attacker = FleetColumn(1, ships=[
+                (Ship(health, ship_type), i) for i, (ship_type, health) in enumerate(ships)
+            ])
+            expected = FleetColumn(1, ships=[
+                (Ship(health, ship_type), i) for i, (ship_type, health) in enumerate(ships)
+            ])
+            defender = FleetColumn(2, ships=[(Ship(30, ShipType.BATTLESHIP), 0)])
+
+            rail_gun = rng.random() < 0.5
+            outcome = resolve_columns(
+                attacker.transposition_key,
+                defender.transposition_key,
+                rail_gun
+            )
+            damage = max(defender.attack - (0 if rail_gun else attacker.defence), 0)
+            carry_over, destroyed = expected.take_damage(damage, quiet=True)
+
+            attacker.apply_damage(outcome.destroyed[0], outcome.front_damage[0])
+
+            with self.subTest(ships=ships, rail_gun=rail_gun):
+                self.assertEqual(damage, outcome.damage[0])
+                self.assertEqual(carry_over, outcome.carry_over[0])
+                self.assertEqual(destroyed, outcome.destroyed[0])
+                self.assertEqual(expected, attacker)
+                attacker.check_totals()
+
+    def test_resolve_matches_without_table(self):
+        """
+        Test quiet combats give the same fleets with and without a table
+        """
+        rng = random.Random(2)
+        table = TranspositionTable()
+
+        for _ in range(50):
+            attacker_str = random_fleet_str(rng)
+            defender_str = random_fleet_str(rng)
+            seed = rng.random()
+            fleets = []
+
+            for use_table in [False, True]:
+                deploy_rng = random.Random(seed)
+                attacker = FleetList.from_str(attacker_str)
+                defender = FleetList.from_str(defender_str)
+                deploy(attacker, random_deployment(attacker, deploy_rng))
+                deploy(defender, random_deployment(defender, deploy_rng))
+
+                combat = CombatStatus((None, attacker), (None, defender))
+
+                for combat_round in ROUNDS:
+                    combat.combat_round = combat_round
+
+                    if use_table:
+                        fight_combat_round(combat, table)
+                    else:
+                        combat.resolve_combat_round(quiet=True)
+
+                fleets.append((attacker.to_str(), defender.to_str()))
+
+            with self.subTest(attacker=attacker_str, defender=defender_str):
+                self.assertEqual(fleets[0], fleets[1])
+
+        self.assertEqual(50 * 9, table.hits + table.misses)
+
+    def test_counts_hits_and_misses(self):
+        """
+        Test the counters and the least recently used outcome being dropped
+        """
+        table = TranspositionTable(max_size=2)
+        empty = (0, 0, (), False)
+        frigate = (4, 2, (4,), False)
+        battleship = (20, 15, (30,), False)
+
+        table.resolve(frigate, empty, False)
+        table.resolve(frigate, empty, False)
+        table.resolve(battleship, empty, False)
+        self.assertEqual((1, 2, 2), (table.hits, table.misses, len(table)))
+        self.assertEqual(0.0, TranspositionTable().hit_rate())
+
+        table.resolve(frigate, empty, False)
+        table.resolve(frigate, empty, True)
+        self.assertEqual((2, 3, 2), (table.hits, table.misses, len(table)))
+        self.assertIsNone(table.get((battleship, empty, False)))
+        self.assertIsNotNone(table.get((frigate, empty, False)))
+        self.assertEqual(3 / 7, table.hit_rate())
+
+        table.clear()
+        self.assertEqual((0, 0, 0), (table.hits, table.misses, len(table)))
+
+    def test_rail_gun_ignores_defence(self):
+        """
+        Test the rail gun round is part of the key
+        """
+        fleet = FleetList.from_str('BS30[1,0]').where_number(1)
+        key = fleet.transposition_key
+        damage = fleet.attack - fleet.defence
+
+        self.assertEqual((damage, damage), resolve_columns(key, key, False).damage)
+        self.assertEqual((fleet.attack, fleet.attack), resolve_columns(key, key, True).damage)
+
+
+if __name__ == '__main__':
+    unittest.main()